@@ -0,0 +1,234 @@
+"""
+Run BOSS iterations on data files without a browser, e.g. from scripts or schedulers:
+
+    python src/cli.py run data.csv other.parquet --workers 2
+
+Each file needs the metadata that the web app saves with downloaded data (bounds, noise, min and num-init).
+The next acquisitions are appended to the data, with empty outputs, and the file is written back in its format.
+With an objective, many iterations are run unattended and the evaluated rows are appended instead:
+
+    python src/cli.py run data.csv --objective "command:./simulate" --iterations 100 --concurrency 4
+"""
+import argparse
+import importlib
+import numpy as np
+import os
+import sys
+import tempfile
+from typing import BinaryIO
+from core.data_io import FORMATS, read_data_file, write_table
+from core.fit_cache import FitCache
+from core.jobs import DONE, JobQueue
+from core.objective import OBJECTIVE_KINDS, parse_objective
+from core.boss_run import KERNELS, BossRun
+
+
+def load_run(file: BinaryIO, file_name: str) -> BossRun:
+    """
+    Read a data file with metadata into a BossRun object, as the setup tab does.
+
+    :param file: BinaryIO
+        The CSV, Parquet or Arrow file, opened in binary mode.
+    :param file_name: str
+        Name of the file, whose extension gives the format.
+
+    :return: BossRun
+    """
+    data, metadata = read_data_file(file, file_name)
+    bo_run = BossRun(data=data)
+    bo_run.parse_params(metadata)
+    if bo_run.dim == 0 or bo_run.bounds_error(bo_run.bounds) is not None:
+        raise ValueError(f"{file_name} has no valid bounds in its metadata.")
+    bo_run.data = bo_run.data[bo_run.X_names + bo_run.Y_names]
+    bo_run.has_metadata = True
+    return bo_run
+
+
+def save_run(bo_run: BossRun, path: str) -> None:
+    """
+    Write the data with its metadata to a file, in the format given by the file extension, like a download.
+
+    :param bo_run: BossRun
+        The run.
+    :param path: str
+        Path of the file.
+
+    :return: None
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    file_format = next((name for name, (ext, _) in FORMATS.items() if ext == extension), "CSV")
+    if extension == "feather":
+        file_format = "Arrow"
+    if file_format == "CSV":
+        bo_run.add_metadata()
+        with open(path, "w", newline="") as f:
+            f.write(bo_run.dload_data)
+    else:
+        with open(path, "wb") as f:
+            f.write(write_table(bo_run.data, bo_run.get_metadata(), file_format))
+
+
+def run_file(path: str, out_path: str, options: dict) -> str:
+    """
+    Run one BOSS iteration on a data file and write the data with the next acquisitions appended.
+    With an objective, run auto-run iterations instead and write the data with the evaluated rows appended,
+    also if an evaluation failed.
+    Runs in the calling process, or in a job process when several files are run in parallel.
+
+    :param path: str
+        Path of the data file.
+    :param out_path: str
+        Path of the file to write, which may be the same as path.
+    :param options: dict
+        Run options: kernel, batch_size, allow_pending, max_rows and cache_dir, and for auto-run: objective,
+        iterations, concurrency and timeout.
+
+    :return:
+    summary: str
+        The predicted optimum and the next acquisitions.
+    """
+    with open(path, "rb") as f:
+        bo_run = load_run(f, path)
+    bo_run.kernel = options.get("kernel", bo_run.kernel)
+    bo_run.batch_size = options.get("batch_size", bo_run.batch_size)
+    bo_run.allow_pending = options.get("allow_pending", bo_run.allow_pending)
+    bo_run.max_rows = options.get("max_rows", bo_run.max_rows)
+    if options.get("cache_dir") is not None:
+        bo_run.fit_cache = FitCache(disk_dir=options["cache_dir"])
+    error = bo_run.data_error()
+    if error is not None:
+        hint = "" if bo_run.allow_pending else " Use --allow-pending for rows whose outputs are pending."
+        raise ValueError(f"{path} has missing values. {error}{hint}")
+    # the output files of BOSS are not kept, and files run in parallel must not share them
+    with tempfile.TemporaryDirectory() as out_dir:
+        bo_run.out_dir = out_dir
+        if options.get("objective"):
+            bo_run.objective = options["objective"]
+            bo_run.auto_iters = options.get("iterations", 10)
+            bo_run.auto_concurrency = options.get("concurrency", 1)
+            job_queue = JobQueue(max_workers=bo_run.auto_concurrency)
+            try:
+                num_done = bo_run.auto_run(job_queue, timeout=options.get("timeout"))
+            finally:
+                job_queue.shutdown()
+                save_run(bo_run, out_path)
+            if bo_run.auto_run_error is not None:
+                raise RuntimeError(f"{bo_run.auto_run_error} ({num_done} evaluations were saved)")
+        else:
+            bo_run.run_boss()
+            bo_run.concat_next_acq()
+            save_run(bo_run, out_path)
+
+    sign = 1 if bo_run.objective_min else -1
+    mu_glmin = sign * float(bo_run.results.select("mu_glmin", -1))
+    x_glmin = np.ravel(bo_run.results.select("x_glmin", -1))
+    optimum = ", ".join(f"{x} = {v:.4g}" for x, v in zip(bo_run.X_names, x_glmin))
+    lines = [f"evaluated {num_done} points"] if options.get("objective") else []
+    optimum = f"{bo_run.objective_name} = {mu_glmin:.4g} at {optimum}"
+    lines.append(f"predicted {'minimum' if sign == 1 else 'maximum'}: {optimum}")
+    for x_next in np.atleast_2d(bo_run.results.get_next_acq(-1)):
+        lines.append("next: " + ", ".join(f"{x} = {v:.4g}" for x, v in zip(bo_run.X_names, x_next)))
+    if bo_run.approximation is not None:
+        lines.append(bo_run.approximation)
+    return "\n  ".join(lines)
+
+
+def output_path(path: str, output_dir: str | None) -> str:
+    """
+    Return the path to write the results of a data file to: the file itself, or a file of the same name
+    in output_dir.
+    """
+    if output_dir is None:
+        return path
+    os.makedirs(output_dir, exist_ok=True)
+    return os.path.join(output_dir, os.path.basename(path))
+
+
+def parse_args(argv: list | None = None) -> argparse.Namespace:
+    parser = argparse.ArgumentParser(prog="cli.py", description="Run BOSS on data files without the web app.")
+    subparsers = parser.add_subparsers(dest="command", required=True)
+    run = subparsers.add_parser(
+        "run",
+        help="Run one iteration on each file and append the next acquisitions.",
+        description="Run one BOSS iteration on each file and append the next acquisitions to it.",
+    )
+    run.add_argument("files", nargs="+", help="CSV, Parquet or Arrow files with metadata, e.g. downloaded from the app")
+    run.add_argument("--output-dir", help="write the updated files here instead of overwriting the inputs")
+    run.add_argument("--kernel", choices=list(KERNELS), default="rbf")
+    run.add_argument("--batch-size", type=int, default=1, help="number of acquisitions per iteration")
+    run.add_argument("--allow-pending", action="store_true", help="treat rows without outputs as pending experiments")
+    run.add_argument("--max-rows", type=int, default=500, help="above this many rows, fit a subset of the data")
+    run.add_argument("--cache-dir", help="keep fits in this directory, so unchanged files are not refitted")
+    run.add_argument("--workers", type=int, default=1, help="number of files to run in parallel")
+    run.add_argument(
+        "--objective",
+        help="evaluate this objective instead of appending empty rows: "
+             + "; ".join(OBJECTIVE_KINDS.values()),
+    )
+    run.add_argument("--iterations", type=int, default=10, help="number of evaluations of the objective")
+    run.add_argument("--concurrency", type=int, default=1, help="number of evaluations running at the same time")
+    run.add_argument("--timeout", type=float, help="seconds to wait for each evaluation of a command or URL")
+    args = parser.parse_args(argv)
+    if args.objective is not None:
+        if args.workers > 1:
+            # the workers run in job processes, which cannot start the processes that evaluate the objective
+            parser.error("--workers cannot be combined with --objective, use --concurrency instead")
+        try:
+            parse_objective(args.objective)
+        except ValueError as err:
+            parser.error(str(err))
+    return args
+
+
+def main(argv: list | None = None) -> int:
+    """
+    Entry point of the command line interface.
+
+    :return:
+    status: int
+        0 if all files were run, 1 otherwise.
+    """
+    args = parse_args(argv)
+    options = {
+        "kernel": args.kernel,
+        "batch_size": args.batch_size,
+        "allow_pending": args.allow_pending,
+        "max_rows": args.max_rows,
+        "cache_dir": args.cache_dir,
+        "objective": args.objective,
+        "iterations": args.iterations,
+        "concurrency": args.concurrency,
+        "timeout": args.timeout,
+    }
+    failed = 0
+    if args.workers > 1 and len(args.files) > 1:
+        # jobs are pickled by reference, which does not work for functions of the __main__ module
+        job_fn = importlib.import_module("cli").run_file
+        job_queue = JobQueue(max_workers=min(args.workers, len(args.files)))
+        try:
+            job_ids = {
+                path: job_queue.submit(job_fn, path, output_path(path, args.output_dir), options)
+                for path in args.files
+            }
+            for path, job_id in job_ids.items():
+                job = job_queue.wait(job_id)
+                if job.state == DONE:
+                    print(f"{path}:\n  {job.result}")
+                else:
+                    failed += 1
+                    print(f"{path}: failed: {job.error}", file=sys.stderr)
+        finally:
+            job_queue.shutdown()
+    else:
+        for path in args.files:
+            try:
+                print(f"{path}:\n  {run_file(path, output_path(path, args.output_dir), options)}")
+            except Exception as err:
+                # as in the parallel path, a failing file does not stop the others
+                failed += 1
+                print(f"{path}: failed: {err}", file=sys.stderr)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,207 @@
+import numpy as np
+import os
+import tempfile
+from boss.bo.acq.factory import select_acq_manager
+from boss.bo.bo_main import BOMain
+from boss.bo.results import BOResults
+from core.candidates import CandidatePool
+from core.jobs import report_progress
+from core.pending import acquire_with_pending
+from core.results_io import dummy_func, snapshot_results
+
+
+def batch_keywords(batch_size: int) -> dict:
+    """
+    Return the BOSS keywords for acquiring batch_size points per iteration.
+    Batches are built with the Kriging Believer strategy.
+
+    :param batch_size: int
+        Number of acquisitions per iteration.
+
+    :return: dict
+    """
+    if batch_size > 1:
+        return {"batchtype": "kb", "batchpts": int(batch_size)}
+    return {"batchtype": "sequential", "batchpts": 1}
+
+
+def acquire(
+        bo: BOMain,
+        batch_size: int = 1,
+        X_pending: np.ndarray | None = None,
+        pool: CandidatePool | None = None,
+) -> np.ndarray:
+    """
+    Get the next acquisition(s) from a fitted BOMain object.
+
+    :param bo: BOMain
+        BOMain object with a fitted model.
+    :param batch_size: int
+        Number of acquisitions.
+    :param X_pending: ndarray or None
+        X values of pending experiments, one per row.
+    :param pool: CandidatePool or None
+        If given, the acquisitions are picked from the pool instead of the whole box of bounds.
+
+    :return:
+    X_next: ndarray
+        The next acquisitions, one per row.
+    """
+    if pool is not None:
+        return pool.acquire(bo.acq_manager, batch_size, X_pending)
+    keywords = batch_keywords(batch_size)
+    if any(bo.settings[k] != v for k, v in keywords.items()):
+        bo.settings.update(keywords)
+        bo.acq_manager = select_acq_manager(bo.settings)
+    if X_pending is not None and X_pending.shape[0] > 0:
+        return acquire_with_pending(bo.acq_manager, X_pending)
+    return bo.acquire()
+
+
+def fit_boss(
+        X: np.ndarray,
+        Y: np.ndarray,
+        bounds: np.ndarray,
+        kernel: str = "rbf",
+        noise: float = 0.0,
+        batch_size: int = 1,
+        X_pending: np.ndarray | None = None,
+        thetainit: np.ndarray | None = None,
+        out_dir: str | None = None,
+        pool: CandidatePool | None = None,
+        acq_bounds: np.ndarray | None = None,
+) -> BOMain:
+    """
+    Fit a new BOSS model on all data and get the next acquisition(s).
+
+    :param X: ndarray
+        X values.
+    :param Y: ndarray
+        Y values in minimization form.
+    :param bounds: ndarray
+        Bounds of the input variables.
+    :param kernel: str
+        Name of the kernel.
+    :param noise: float
+        Noise variance.
+    :param batch_size: int
+        Number of acquisitions.
+    :param X_pending: ndarray or None
+        X values of pending experiments, one per row.
+    :param thetainit: ndarray or None
+        Hyperparameters to start the hyperparameter optimization from, e.g. the ones of a previous fit.
+    :param out_dir: str or None
+        Directory for the output files of BOSS. If None, they are written to the working directory.
+    :param pool: CandidatePool or None
+        If given, the next acquisitions are picked from the pool instead of the whole box of bounds.
+    :param acq_bounds: ndarray or None
+        If given, the next acquisitions are restricted to these bounds, e.g. a trust region, while the model
+        is still fitted with the full bounds.
+
+    :return:
+    bo: BOMain
+        The fitted BOMain object, whose results contain the next acquisition(s) and the global minimum.
+    """
+    keywords = batch_keywords(batch_size)
+    if thetainit is not None:
+        keywords["thetainit"] = thetainit
+        # a single local optimization started from the previous optimum
+        keywords["updaterestarts"] = 1
+    if out_dir is not None:
+        keywords["outfile"] = os.path.join(out_dir, "boss.out")
+        keywords["rstfile"] = os.path.join(out_dir, "boss.rst")
+    bo = BOMain(
+        f=dummy_func,
+        bounds=bounds,
+        kernel=kernel,
+        noise=noise,
+        iterpts=0,
+        **keywords,
+    )
+    bo.run(X, Y)
+    if acq_bounds is not None:
+        bo.acq_manager.bounds = np.atleast_2d(acq_bounds)
+    if pool is not None or acq_bounds is not None or (X_pending is not None and X_pending.shape[0] > 0):
+        # BOSS knows neither about pending experiments, candidate pools nor trust regions,
+        # so the next acquisition is redone
+        bo.results["X_next"] = acquire(bo, batch_size, X_pending, pool)
+    return bo
+
+
+def rebuild_boss(results: BOResults, out_dir: str | None = None) -> BOMain:
+    """
+    Rebuild a BOMain object from the results of a fit made in another process, e.g. a job process, so that new
+    rows can be added to its model in this process. The model is rebuilt from the data and hyperparameters of the
+    latest iteration without refitting. The results may come from the fit cache and name the output files of
+    another session, so the output files are moved to out_dir.
+
+    :param results: BOResults
+        Results of the fit, e.g. restored from a snapshot. Its settings are changed to the new output files.
+    :param out_dir: str or None
+        Directory for the output files of BOSS. If None, they are written to the working directory.
+
+    :return:
+    bo: BOMain
+        BOMain object with the model and results of the fit.
+    """
+    results.settings["outfile"] = os.path.join(out_dir or "", "boss.out")
+    results.settings["rstfile"] = os.path.join(out_dir or "", "boss.rst")
+    bo = BOMain.from_settings(results.settings)
+    bo.model = results.reconstruct_model(results.num_iters - 1)
+    bo.acqfn.model = bo.model
+    bo.results = results
+    bo.itr_curr = results.num_iters
+    bo.main_output.curr_pts = bo.model.X.shape[0] + 1
+    return bo
+
+
+def fit_job(spec: dict) -> dict:
+    """
+    Fit BOSS in a job process of a JobQueue.
+
+    :param spec: dict
+        Keyword arguments of fit_boss.
+
+    :return:
+    snapshot: dict
+        Snapshot of the results, see core.results_io.
+    """
+    report_progress(f"Fitting the model to {spec['X'].shape[0]} data points")
+    bo = fit_boss(**spec)
+    report_progress("Collecting the results")
+    return snapshot_results(bo.results)
+
+
+def log_likelihood(results) -> float:
+    """
+    Return the log marginal likelihood of the model of the latest iteration, e.g. to compare kernels.
+
+    :param results: BOResults
+        Results of a fit.
+
+    :return: float
+    """
+    model = results.reconstruct_model(results.num_iters - 1)
+    return float(model._model.log_likelihood())
+
+
+def warm_up() -> None:
+    """
+    Import the BOSS stack and run a tiny fit, so that the first real job of a process is as fast as later ones.
+    Used as the initializer of the job processes.
+
+    :return: None
+    """
+    import core.plots  # noqa: F401
+
+    X = np.linspace(0.0, 1.0, 5)[:, None]
+    with tempfile.TemporaryDirectory() as tmp_dir:
+        bo = BOMain(
+            f=dummy_func,
+            bounds=np.array([[0.0, 1.0]]),
+            kernel="rbf",
+            iterpts=0,
+            outfile=os.path.join(tmp_dir, "boss.out"),
+            rstfile=os.path.join(tmp_dir, "boss.rst"),
+        )
+        bo.run(X, np.sin(3 * X))
@@ -0,0 +1,1165 @@
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import time
+import tomli_w
+import uuid
+from core.fit_cache import fit_key
+from core.jobs import DONE, QUEUED, Job, JobQueue
+
+# kernels that BOSS supports, with the names shown in the UI
+KERNELS = {"rbf": "RBF", "mat32": "Matérn 3/2", "mat52": "Matérn 5/2", "stdp": "Periodic"}
+
+
+class BossRun:
+    """
+    Class for running BOSS: the data, the settings and the fits of a run, without any user interface, so that
+    the command line and the HTTP server can use it without Streamlit. RunBOSS adds the widgets of the web app.
+    """
+
+    def __init__(
+            self,
+            run_help=None,
+            data=None,
+            bounds=None,
+            X_names=None,
+            noise=0.0,
+            res=None,
+    ):
+        self.dim = run_help.dim if run_help is not None else None
+        self.data = data
+        self.bounds = bounds
+        self.has_metadata = False
+        self.X_names = X_names or []
+        self.Y_names = None
+        self.kernel = "rbf"
+        self.auto_kernel = False  # fit all KERNELS in parallel and keep the one with the highest likelihood
+        self.kernel_comparison = None  # DataFrame comparing the kernels of the latest automatic kernel choice
+        self.min = True  # True if minimize, False if maximize
+        self.target_settings = {}  # output name -> (minimize, weight), for several outputs; default (min, 1.0)
+        self.target_ranges = {}  # output name -> [lower, upper] reference values that scale it in the objective
+        self.target_results = {}  # output name -> BOResults of the fit of that output alone, for several outputs
+        self.target_errors = {}  # output name -> error message, if the fit of that output failed
+        self._target_jobs = {}  # output name -> id of the running fit of that output
+        self.noise = noise
+        self.num_init = 0  # number of points that can be treated as initial points
+        self.results = res
+        self.has_run = False
+        self.results_id = None  # changes whenever the results change, to key caches of derived plots
+        self.lineage_id = None  # changes whenever the results are replaced rather than extended by new iterations
+        self.run_id = uuid.uuid4().hex  # id of this run, e.g. to name its scratch directory
+        self.out_dir = None  # directory for the output files of BOSS, the working directory if None
+        self.dload_data = None  # data format only for download, not displayed in UI
+        self.dload_version = 0  # incremented whenever the content of dload_data changes
+        self._dload_rows = None  # copy of the data serialized in _dload_csv
+        self._dload_csv = None  # data part of dload_data
+        self._dload_metadata = None  # metadata part of dload_data
+        self._dload_files = {}  # file format -> (dload_version, content) of the latest Parquet/Arrow download
+        self.warm_start = True  # reuse the previous fit instead of refitting from scratch
+        self._bo = None  # BOMain object of the latest fit, kept for warm-started refits
+        self._fit_X = None  # X values the latest fit was made on
+        self._fit_Y = None  # Y values (in minimization form) the latest fit was made on
+        self._fit_settings = None  # settings the latest fit was made with
+        self.fast_iter = False  # add single new observations without refitting the hyperparameters
+        self.refit_every = 10  # with fast iterations, refit the hyperparameters every k iterations
+        self._fast_iters = 0  # number of fast iterations since the latest hyperparameter fit
+        self._force_refit = False  # refit the hyperparameters on the next run, even with fast iterations
+        self.batch_size = 1  # number of acquisitions suggested per iteration
+        self.allow_pending = False  # treat rows with inputs but without outputs as pending experiments
+        self.fit_cache = None  # FitCache to look up fits of identical problems, e.g. after re-uploading a file
+        self.run_in_background = True  # fit in a worker process of the job queue instead of the script thread
+        self.job_id = None  # id of the running background fit
+        self.run_error = None  # error message of the latest background fit, if it failed
+        self._job_fit = None  # data of the running background fit or automatic kernel choice, see poll_run
+        self._kernel_jobs = {}  # kernel -> (job id, cache key) of the running fits of the automatic kernel choice
+        self._kernel_fits = {}  # kernel -> (snapshot or None, fit time, error) of the finished ones
+        self.candidate_pool = None  # CandidatePool to pick acquisitions from instead of the box of bounds
+        self.large_data = True  # above max_rows rows, fit a subset of the data and acquire in a trust region
+        self.max_rows = 500  # maximum number of rows fitted with an exact GP in large-data mode
+        self.approximation = None  # description of the approximation of the latest fit, None if it was exact
+        self._candidates_file = None  # file id of the uploaded file of the candidate pool
+        self.predict_job_id = None  # id of the running prediction job
+        self.predict_error = None  # error message of the latest prediction job, if it failed
+        self.predictions = None  # path of the CSV file with the predictions of the latest results
+        self._predict_path = None  # path of the CSV file the running prediction job writes to
+        self.objective = ""  # spec of the objective evaluated in auto-run mode, see core.objective
+        self.auto_iters = 10  # number of evaluations of an auto-run
+        self.auto_concurrency = 1  # maximum number of evaluations of the objective running at the same time
+        self.auto_run_error = None  # error message of the latest auto-run, if an evaluation failed
+
+    @property
+    def X_vals(self):
+        """
+        Return the input values.
+
+        :return:
+        X_vals: ndarray
+            Numpy array of the X values.
+        """
+        return self.data[self.X_names].to_numpy()
+
+    @property
+    def Y_vals(self):
+        """
+        Return the output values.
+
+        :return:
+        Y_vals: ndarray
+            Numpy array of the Y values.
+        """
+        return self.data[self.Y_names].to_numpy()
+
+    def strip_white_spaces(self) -> None:
+        """
+        Remove leading, trailing, and in-between whitespace in variable names (X_name and Y_name) if there is any.
+        """
+        for x in self.X_names:
+            x.strip().replace(" ", "")
+        for y in self.Y_names:
+            y.strip().replace(" ", "")
+
+    def parse_params(self, metadata) -> None:
+        """
+        Return the variable names and bounds to run with BOMain object.
+
+        :param metadata: dict
+            Metadata obtained from the uploaded file.
+
+        :return: None
+        """
+        # without num-init, all rows count as initial points, as for files without metadata
+        num_init = metadata.get('num-init')
+        self.num_init = self.data.shape[0] if num_init is None else num_init
+        self.noise = metadata.get('noise', 0)
+        self.min = metadata.get('min', True)
+        self.data.columns = [c.strip().replace(" ", "") for c in self.data.columns]
+        # Input vars are the ones that have bounds in the metadata
+        self.X_names = [c for c in self.data.columns if c in metadata.keys()]
+        # Output vars are the ones that do not have bounds in the metadata, as their [min, max] is used as default
+        self.Y_names = [c for c in self.data.columns if c not in metadata.keys()]
+        # settings of each output of a run with several outputs, see get_metadata
+        self.target_settings = {
+            name: (metadata[f"min-{name}"], metadata.get(f"weight-{name}", 1.0))
+            for name in self.Y_names if f"min-{name}" in metadata
+        }
+        self.target_ranges = {
+            name: list(metadata[f"range-{name}"]) for name in self.Y_names if f"range-{name}" in metadata
+        }
+        self.bounds = np.array([metadata.get(x, None) for x in self.X_names])
+        self.dim = self.bounds.shape[0]
+
+    @staticmethod
+    def bounds_error(bounds) -> str | None:
+        """
+        For each variable, check if the lower bound is smaller than the upper bound, without displaying anything,
+        e.g. for the command line and the API.
+
+        :return:
+        error: str or None
+            What is wrong with the bounds, or None if they are valid.
+        """
+        if bounds is None:
+            return "Please choose bounds for all variables."
+        if np.isnan(bounds).any():
+            return "Please set valid bounds for all variables."
+        if not np.all(bounds[:, 0] < bounds[:, 1]):
+            return "Lower bound has to be smaller than upper bound."
+        return None
+
+    def data_error(self) -> str | None:
+        """
+        Check that the data can be used to run BOSS, without displaying anything. If pending experiments are
+        allowed, rows may lack output values, but all input values have to be filled in.
+
+        :return:
+        error: str or None
+            What is wrong with the data, or None if it can be used.
+        """
+        if self.allow_pending and len(self.X_names) > 0:
+            if self.data[self.X_names].isnull().values.any():
+                return "Please fill in the input values of all rows. Only output values can be left empty " \
+                       "for pending experiments."
+            if self.data[self.Y_names].isnull().any(axis=1).all():
+                return "Please fill in the output value of at least one row."
+            return None
+        if self.data.isnull().values.any():
+            return "Please fill in the empty cells."
+        return None
+
+    def _target_minimize(self) -> list[bool]:
+        """
+        Return for each output whether it is minimized.
+        """
+        return [self.target_settings.get(name, (self.min, 1.0))[0] for name in self.Y_names]
+
+    @property
+    def is_multi_output(self) -> bool:
+        return self.Y_names is not None and len(self.Y_names) > 1
+
+    @property
+    def objective_name(self) -> str:
+        """
+        Name of the objective that the main model is fitted to: the output, or the combination of several outputs.
+        """
+        return "combined objective" if self.is_multi_output else self.Y_names[0]
+
+    @property
+    def objective_min(self) -> bool:
+        """
+        Whether the objective of the main model is minimized. The combination of several outputs always is.
+        """
+        return True if self.is_multi_output else self.min
+
+    def _objective(self, Y: np.ndarray) -> np.ndarray:
+        """
+        Return the objective to fit in minimization form, given the observed output values. Several outputs are
+        combined with the augmented Chebyshev scalarization, see core.multi_output. Each output is scaled by a
+        fixed range, taken from the data the first time it is combined, so that the objective of a row does not
+        change when rows with new extremes are added and the previous fit can be extended.
+
+        :param Y: ndarray
+            Output values, one column per output.
+
+        :return:
+        ndarray, shape (n, 1)
+        """
+        if not self.is_multi_output:
+            return Y if self.min else -Y
+        from core.multi_output import scalarize
+
+        Y = Y.astype(float)
+        for k, name in enumerate(self.Y_names):
+            if name not in self.target_ranges and Y.shape[0] > 0:
+                self.target_ranges[name] = [float(Y[:, k].min()), float(Y[:, k].max())]
+        return scalarize(
+            Y,
+            self._target_minimize(),
+            [self.target_settings.get(name, (self.min, 1.0))[1] for name in self.Y_names],
+            np.array([self.target_ranges[name] for name in self.Y_names]) if Y.shape[0] > 0 else None,
+        )
+
+    def _settings_key(self) -> tuple:
+        """
+        Return the settings that have to stay unchanged for a previous fit to be reused.
+
+        :return: tuple
+        """
+        return np.asarray(self.bounds, dtype=float).tobytes(), self.kernel, self.noise, self.min
+
+    def _is_appended(self, X: np.ndarray, Y: np.ndarray) -> bool:
+        """
+        Check if the data only differs from the data of the latest fit by rows appended to the end.
+
+        :param X: ndarray
+            Current X values.
+        :param Y: ndarray
+            Current Y values in minimization form.
+
+        :return: bool
+        """
+        if self._bo is None or self._fit_settings != self._settings_key():
+            return False
+        n = self._fit_X.shape[0]
+        return (
+                X.shape[0] >= n
+                and np.array_equal(X[:n], self._fit_X)
+                and np.array_equal(Y[:n], self._fit_Y)
+        )
+
+    def _use_subset(self, num_rows: int) -> bool:
+        """
+        Check if a fit of num_rows observations is done on a subset of the data.
+
+        :param num_rows: int
+            Number of observed rows.
+
+        :return: bool
+        """
+        return self.large_data and num_rows > self.max_rows
+
+    def _select_rows(self, X: np.ndarray, Y: np.ndarray) -> (np.ndarray, np.ndarray, np.ndarray | None):
+        """
+        Return the data to fit and the bounds to acquire in. In large-data mode, above max_rows rows, these are
+        a subset of the data and a trust region around the best observation, see core.subset.
+        Sets approximation to a description of the approximation, or None if the fit is exact.
+
+        :param X: ndarray
+            X values.
+        :param Y: ndarray
+            Y values in minimization form.
+
+        :return:
+        X_fit, Y_fit, acq_bounds: (ndarray, ndarray, ndarray or None)
+            The rows to fit, and the trust region, which is None if the acquisitions are not restricted.
+        """
+        if not self._use_subset(X.shape[0]):
+            self.approximation = None
+            return X, Y, None
+        from core.subset import select_subset
+
+        idx, acq_bounds, num_local = select_subset(X, Y, self.bounds, self.max_rows)
+        region = ", ".join(f"{x} in [{lo:.3g}, {hi:.3g}]" for x, (lo, hi) in zip(self.X_names, acq_bounds))
+        self.approximation = (
+            f"Large-data mode: the model was fitted to {len(idx)} of {X.shape[0]} rows ({num_local} nearest to the "
+            f"best observation, {len(idx) - num_local} sampled from the rest). The next acquisitions are restricted "
+            f"to the trust region {region}."
+        )
+        return X[idx], Y[idx], acq_bounds
+
+    def _previous_params(self) -> np.ndarray | None:
+        """
+        Return the model hyperparameters of the latest iteration, if they can be used to seed a new fit.
+
+        :return: ndarray or None
+        """
+        if self.results is None or self._fit_settings is None:
+            return None
+        if self._fit_settings[1:3] != self._settings_key()[1:3]:
+            return None
+        params = self.results.select("model_params", -1)
+        if params is None or len(params) != self.dim + 1:
+            return None
+        return np.asarray(params, dtype=float)
+
+    def _fit_key(self, X: np.ndarray, Y: np.ndarray, X_pending: np.ndarray, kernel: str | None = None) -> str:
+        """
+        Return the key of the fit of the given data with the current settings in the fit cache.
+
+        :param X: ndarray
+            X values.
+        :param Y: ndarray
+            Y values in minimization form.
+        :param X_pending: ndarray
+            X values of pending experiments, one per row.
+        :param kernel: str or None
+            Kernel of the fit, if not the current one.
+
+        :return: str
+        """
+        return fit_key(
+            X,
+            Y,
+            self.bounds,
+            kernel=kernel or self.kernel,
+            noise=self.noise,
+            min=self.min,
+            batch_size=self.batch_size,
+            X_pending=X_pending,
+            max_rows=self.max_rows if self._use_subset(X.shape[0]) else None,
+            candidates=None if self.candidate_pool is None else self.candidate_pool.key,
+        )
+
+    def _load_cached_fit(self, key: str) -> bool:
+        """
+        Load the results of a previous fit from the fit cache, if there is one.
+
+        :param key: str
+            Key of the fit in the cache.
+
+        :return: bool
+            True if the results were found in the cache.
+        """
+        snapshot = self.fit_cache.get(key)
+        if snapshot is None:
+            return False
+        from core.results_io import restore_results
+
+        self.results = restore_results(snapshot)
+        self.lineage_id = uuid.uuid4().hex
+        # the model itself is not cached, so the next run starts a new fit seeded from the results
+        self._bo = None
+        return True
+
+    def _cold_fit(
+            self,
+            X: np.ndarray,
+            Y: np.ndarray,
+            X_pending: np.ndarray,
+            acq_bounds: np.ndarray | None = None,
+    ) -> None:
+        """
+        Fit a new model on all data. If warm start is on, seed the hyperparameter optimization
+        with the hyperparameters of the previous fit.
+
+        :param X: ndarray
+            X values.
+        :param Y: ndarray
+            Y values in minimization form.
+        :param X_pending: ndarray
+            X values of pending experiments, one per row.
+        :param acq_bounds: ndarray or None
+            Trust region to restrict the next acquisitions to, if X and Y are a subset of the data.
+
+        :return: None
+        """
+        from core.boss_fit import fit_boss
+
+        params = self._previous_params() if self.warm_start else None
+        self._bo = fit_boss(
+            X,
+            Y,
+            self.bounds,
+            self.kernel,
+            self.noise,
+            self.batch_size,
+            X_pending,
+            thetainit=params,
+            out_dir=self.out_dir,
+            pool=self.candidate_pool,
+            acq_bounds=acq_bounds,
+        )
+        self.results = self._bo.results
+        self.lineage_id = uuid.uuid4().hex
+        if acq_bounds is not None:
+            # the model only has a subset of the data, so it cannot be updated with new rows
+            self._bo = None
+
+    def _adopt_results(self, results) -> None:
+        """
+        Take the results of a fit made in a job process, or found in the fit cache, as the latest results. The model
+        is rebuilt in this process, so rows appended later can be added to it, unless it was fitted to a subset of
+        the data. Its output files are in out_dir, even if another session made the fit.
+
+        :param results: BOResults
+            Results of the fit.
+
+        :return: None
+        """
+        from core.boss_fit import rebuild_boss
+
+        self.results = results
+        self.lineage_id = uuid.uuid4().hex
+        self._bo = rebuild_boss(results, self.out_dir) if self.approximation is None else None
+
+    def _warm_update(self, X_new: np.ndarray, Y_new: np.ndarray, X_pending: np.ndarray) -> None:
+        """
+        Add the appended rows to the model of the previous fit, as BOSS does within a run: the hyperparameter
+        optimization starts from the current hyperparameters, then the next acquisition and global minimum
+        are updated.
+
+        :param X_new: ndarray
+            X values of the appended rows.
+        :param Y_new: ndarray
+            Y values of the appended rows in minimization form.
+        :param X_pending: ndarray
+            X values of pending experiments, one per row.
+
+        :return: None
+        """
+        from core.boss_fit import acquire
+
+        bo = self._bo
+        num_new = X_new.shape[0]
+        for i in range(num_new):
+            # record the rows in boss.rst and boss.out, as BOSS does for the rows it evaluates itself
+            with bo.main_output.summarize_results(bo.results):
+                bo.rst_manager.new_data(X_new[i], Y_new[i])
+                bo.model.add_data(X_new[i: i + 1], Y_new[i: i + 1])
+                if i < num_new - 1:
+                    # as for initial points, only the data is recorded for all but the last new row
+                    bo.results.update({"X": bo.model.X, "Y": bo.model.Y})
+                else:
+                    # a single restart from the current hyperparameters, without changing the settings of bo
+                    bo.model.optimize(1)
+                    bo.rst_manager.new_model_params(bo.model.get_unfixed_params())
+                    X_next = acquire(bo, self.batch_size, X_pending, self.candidate_pool)
+                    bo._update_results(X_next)
+        self.results = bo.results
+
+    def _fast_update(self, X_new: np.ndarray, Y_new: np.ndarray, X_pending: np.ndarray) -> None:
+        """
+        Add one new row to the model of the previous fit with fixed hyperparameters, then only update
+        the next acquisition and global minimum.
+
+        :param X_new: ndarray
+            X values of the new row.
+        :param Y_new: ndarray
+            Y values of the new row in minimization form.
+        :param X_pending: ndarray
+            X values of pending experiments, one per row.
+
+        :return: None
+        """
+        from core.boss_fit import acquire
+        from core.gp_update import append_observations
+
+        bo = self._bo
+        with bo.main_output.summarize_results(bo.results):
+            bo.rst_manager.new_data(X_new[0], Y_new[0])
+            append_observations(bo.model, X_new, Y_new)
+            X_next = acquire(bo, self.batch_size, X_pending, self.candidate_pool)
+            bo._update_results(X_next)
+        self.results = bo.results
+
+    def _use_fast_update(self, num_new: int) -> bool:
+        """
+        Check if the next run can be a fast iteration, i.e. exactly one row was appended and
+        the hyperparameters are not due for a refit.
+
+        :param num_new: int
+            Number of rows appended since the previous run.
+
+        :return: bool
+        """
+        return (
+                self.fast_iter
+                and num_new == 1
+                and not self._force_refit
+                and self._fast_iters + 1 < self.refit_every
+        )
+
+    def _split_pending(self) -> (np.ndarray, np.ndarray, np.ndarray):
+        """
+        Return the data to fit. If pending experiments are allowed, rows without output values are split off.
+
+        :return:
+        X, Y, X_pending: (ndarray, ndarray, ndarray)
+            X values and the objective in minimization form of the observed rows, and X values of the pending rows.
+            With several outputs, rows count as pending if any output is missing.
+        """
+        X = self.X_vals
+        Y = self.Y_vals
+        X_pending = np.empty(shape=(0, X.shape[1]))
+        if self.allow_pending:
+            pending = np.isnan(Y.astype(float)).any(axis=1)
+            X_pending = X[pending]
+            X = X[~pending]
+            Y = Y[~pending]
+        return X, self._objective(Y), X_pending
+
+    def _finish_run(self, X: np.ndarray, Y: np.ndarray, key: str | None, store: bool) -> None:
+        """
+        Record the data and settings of a finished fit.
+
+        :param X: ndarray
+            X values of the fit.
+        :param Y: ndarray
+            Y values of the fit in minimization form.
+        :param key: str or None
+            Key of the fit in the fit cache.
+        :param store: bool
+            Whether to store the results in the fit cache.
+
+        :return: None
+        """
+        # tell BOSS how many of our batches/data points to treat as initial points
+        self.results.set_num_init_batches(min(self.num_init, self.results.select("X").shape[0]))
+        if store and key is not None:
+            from core.results_io import snapshot_results
+
+            self.fit_cache.put(key, snapshot_results(self.results))
+        self._fit_X = X
+        self._fit_Y = Y
+        self._fit_settings = self._settings_key()
+        self.results_id = uuid.uuid4().hex
+        # predictions of the previous results are out of date
+        self.predictions = None
+        self.has_run = True
+
+    def run_boss(self) -> None:
+        """
+        Run BOSS with the given parameters.
+        With warm start, rows that were only appended since the previous run are added to the existing model.
+        With fast iterations, a single appended row is added without refitting the hyperparameters.
+        If pending experiments are allowed, rows without output values are left out of the fit and only
+        taken into account in the acquisition.
+        If a fit cache is set, a fit of identical data and settings is loaded from the cache instead of refitted.
+        In large-data mode, above max_rows rows, a subset of the data is fitted from scratch every time.
+
+        :return: None
+        """
+        X, Y, X_pending = self._split_pending()
+        key = None if self.fit_cache is None else self._fit_key(X, Y, X_pending)
+        X_fit, Y_fit, acq_bounds = self._select_rows(X, Y)
+        self.run_error = None
+        store = True
+        if acq_bounds is None and self.warm_start and self._is_appended(X, Y):
+            num_fitted = self._fit_X.shape[0]
+            num_new = X.shape[0] - num_fitted
+            if self._use_fast_update(num_new):
+                self._fast_update(X[num_fitted:], Y[num_fitted:], X_pending)
+                self._fast_iters += 1
+            elif num_new > 0:
+                self._warm_update(X[num_fitted:], Y[num_fitted:], X_pending)
+                self._fast_iters = 0
+                self._force_refit = False
+            else:
+                from core.boss_fit import acquire
+
+                # no new observations, but the pending experiments may have changed
+                self.results["X_next"] = acquire(self._bo, self.batch_size, X_pending, self.candidate_pool)
+        elif key is not None and self._load_cached_fit(key):
+            store = False
+        else:
+            self._cold_fit(X_fit, Y_fit, X_pending, acq_bounds)
+            self._fast_iters = 0
+            self._force_refit = False
+        self._finish_run(X, Y, key, store)
+
+    def submit_run(self, job_queue: JobQueue) -> None:
+        """
+        Run BOSS like run_boss, but submit a new fit to the job queue instead of running it in the script thread.
+        Fast iterations and cached fits are cheap, so they are done right away. Otherwise, job_id is set
+        and poll_run has to be called until the job has finished.
+
+        :param job_queue: JobQueue
+            Queue to submit the fit to.
+
+        :return: None
+        """
+        X, Y, X_pending = self._split_pending()
+        key = None if self.fit_cache is None else self._fit_key(X, Y, X_pending)
+        X_fit, Y_fit, acq_bounds = self._select_rows(X, Y)
+        self.run_error = None
+        if (
+                acq_bounds is None
+                and self.warm_start
+                and self._is_appended(X, Y)
+                and self._use_fast_update(X.shape[0] - self._fit_X.shape[0])
+        ):
+            self.run_boss()
+        elif key is not None and self._load_cached_fit(key):
+            self._finish_run(X, Y, key, store=False)
+        else:
+            spec = {
+                "X": X_fit,
+                "Y": Y_fit,
+                "bounds": np.asarray(self.bounds, dtype=float),
+                "kernel": self.kernel,
+                "noise": self.noise,
+                "batch_size": self.batch_size,
+                "X_pending": X_pending,
+                # the model stays in the job process, so warm start can only seed the hyperparameters
+                "thetainit": self._previous_params() if self.warm_start else None,
+                "out_dir": self.out_dir,
+                "pool": self.candidate_pool,
+                "acq_bounds": acq_bounds,
+            }
+            from core.boss_fit import fit_job
+
+            self.job_id = job_queue.submit(fit_job, spec)
+            self._job_fit = (X, Y, key)
+
+    def submit_auto_kernel(self, job_queue: JobQueue) -> None:
+        """
+        Fit the data with every kernel in KERNELS at the same time in the worker processes of the job queue,
+        and keep the fit with the highest log marginal likelihood. Fits found in the fit cache are not redone, and
+        all new fits are stored there, so switching to a losing kernel later is instant. The comparison is kept in
+        kernel_comparison. If all fits are in the cache, the kernel is chosen right away; otherwise, poll_run has
+        to be called until the fits have finished.
+
+        :param job_queue: JobQueue
+            Queue to submit the fits to.
+
+        :return: None
+        """
+        from core.boss_fit import fit_job
+
+        X, Y, X_pending = self._split_pending()
+        X_fit, Y_fit, acq_bounds = self._select_rows(X, Y)
+        self.run_error = None
+        # only the previous kernel can be seeded with the previous hyperparameters
+        params = self._previous_params() if self.warm_start else None
+        self._kernel_fits = {}
+        self._kernel_jobs = {}
+        for kernel in KERNELS:
+            key = None if self.fit_cache is None else self._fit_key(X, Y, X_pending, kernel)
+            snapshot = None if key is None else self.fit_cache.get(key)
+            if snapshot is not None:
+                self._kernel_fits[kernel] = (snapshot, np.nan, "")
+                continue
+            spec = {
+                "X": X_fit,
+                "Y": Y_fit,
+                "bounds": np.asarray(self.bounds, dtype=float),
+                "kernel": kernel,
+                "noise": self.noise,
+                "batch_size": self.batch_size,
+                "X_pending": X_pending,
+                "thetainit": params if kernel == self.kernel else None,
+                "out_dir": None if self.out_dir is None else os.path.join(self.out_dir, kernel),
+                "pool": self.candidate_pool,
+                "acq_bounds": acq_bounds,
+            }
+            if spec["out_dir"] is not None:
+                os.makedirs(spec["out_dir"], exist_ok=True)
+            self._kernel_jobs[kernel] = (job_queue.submit(fit_job, spec), key)
+        self._job_fit = (X, Y, X_pending)
+        if not self._kernel_jobs:
+            self._choose_kernel()
+
+    def _poll_kernel_fits(self, job_queue: JobQueue) -> str | None:
+        """
+        Collect the finished fits of the automatic kernel choice, and choose the kernel once all have finished.
+
+        :param job_queue: JobQueue
+            Queue the fits were submitted to.
+
+        :return:
+        progress: str or None
+            Description of the progress, or None if all fits have finished.
+        """
+        elapsed = 0.0
+        for kernel, (job_id, key) in list(self._kernel_jobs.items()):
+            job = job_queue.status(job_id)
+            if not job.is_finished:
+                elapsed = max(elapsed, job.elapsed)
+                continue
+            job_queue.forget(job_id)
+            del self._kernel_jobs[kernel]
+            if job.state == DONE:
+                self._kernel_fits[kernel] = (job.result, job.elapsed, "")
+                if key is not None:
+                    self.fit_cache.put(key, job.result)
+            else:
+                self._kernel_fits[kernel] = (None, np.nan, job.error)
+        if self._kernel_jobs:
+            return f"Fitting {len(KERNELS)} kernels in parallel, {len(self._kernel_fits)} done ({elapsed:.0f} s)"
+        self._choose_kernel()
+        return None
+
+    def _choose_kernel(self) -> None:
+        """
+        Keep the fit of the kernel with the highest log marginal likelihood, once all fits of the automatic kernel
+        choice have finished. Sets run_error if all of them failed.
+
+        :return: None
+        """
+        from core.boss_fit import log_likelihood
+        from core.results_io import restore_results
+
+        fits, self._kernel_fits = self._kernel_fits, {}
+        X, Y, X_pending = self._job_fit
+        self._job_fit = None
+        errors = {kernel: error for kernel, (_, _, error) in fits.items() if error}
+        if len(errors) == len(fits):
+            self.run_error = "; ".join(f"{KERNELS[k]}: {e}" for k, e in errors.items())
+            return
+
+        results = {kernel: restore_results(snapshot) for kernel, (snapshot, _, _) in fits.items() if snapshot is not None}
+        sign = 1 if self.objective_min else -1
+        comparison = pd.DataFrame(
+            {
+                "kernel": [KERNELS[k] for k in KERNELS],
+                "log marginal likelihood": [log_likelihood(results[k]) if k in results else np.nan for k in KERNELS],
+                f"predicted {'minimum' if self.objective_min else 'maximum'}": [
+                    sign * float(results[k].select("mu_glmin", -1)) if k in results else np.nan for k in KERNELS
+                ],
+                "fit time (s)": [fits[k][1] for k in KERNELS],
+                "error": [errors.get(k, "") for k in KERNELS],
+            },
+            index=list(KERNELS),
+        ).sort_values("log marginal likelihood", ascending=False)
+        self.kernel = comparison.index[0]
+        self.kernel_comparison = comparison.reset_index(drop=True)
+
+        self._adopt_results(results[self.kernel])
+        self._fast_iters = 0
+        self._force_refit = False
+        key = None if self.fit_cache is None else self._fit_key(X, Y, X_pending)
+        self._finish_run(X, Y, key, store=False)
+
+    def submit_target_fits(self, job_queue: JobQueue) -> None:
+        """
+        With several outputs, submit a fit of each output alone to the job queue, so that they run at the same time
+        as the fit of the combined objective. Each output is fitted to the rows where it was observed. Fits found
+        in the fit cache are not redone. The fits are collected by poll_run.
+
+        :param job_queue: JobQueue
+            Queue to submit the fits to.
+
+        :return: None
+        """
+        self.target_results = {}
+        self.target_errors = {}
+        self._target_jobs = {}
+        if not self.is_multi_output:
+            return
+        from core.boss_fit import fit_job
+        from core.results_io import restore_results
+
+        X_all = self.X_vals
+        bounds = np.asarray(self.bounds, dtype=float)
+        for name, minimize in zip(self.Y_names, self._target_minimize()):
+            y = self.data[name].to_numpy(dtype=float)
+            observed = ~np.isnan(y)
+            X = X_all[observed]
+            Y = (y if minimize else -y)[observed][:, None]
+            if self._use_subset(X.shape[0]):
+                from core.subset import select_subset
+
+                idx = select_subset(X, Y, bounds, self.max_rows)[0]
+                X, Y = X[idx], Y[idx]
+            key = fit_key(X, Y, bounds, kernel=self.kernel, noise=self.noise, output=name)
+            snapshot = None if self.fit_cache is None else self.fit_cache.get(key)
+            if snapshot is not None:
+                self.target_results[name] = restore_results(snapshot)
+                continue
+            out_dir = None if self.out_dir is None else os.path.join(self.out_dir, f"output-{len(self._target_jobs)}")
+            if out_dir is not None:
+                os.makedirs(out_dir, exist_ok=True)
+            spec = {"X": X, "Y": Y, "bounds": bounds, "kernel": self.kernel, "noise": self.noise, "out_dir": out_dir}
+            self._target_jobs[name] = (job_queue.submit(fit_job, spec), key)
+
+    def _poll_target_fits(self, job_queue: JobQueue) -> str | None:
+        """
+        Keep the results of the finished fits of the single outputs in target_results.
+
+        :param job_queue: JobQueue
+            Queue the fits were submitted to.
+
+        :return:
+        progress: str or None
+            Description of the progress, or None if all fits have finished.
+        """
+        from core.results_io import restore_results
+
+        for name, (job_id, key) in list(self._target_jobs.items()):
+            job = job_queue.status(job_id)
+            if not job.is_finished:
+                continue
+            job_queue.forget(job_id)
+            del self._target_jobs[name]
+            if job.state == DONE:
+                self.target_results[name] = restore_results(job.result)
+                if self.fit_cache is not None:
+                    self.fit_cache.put(key, job.result)
+            else:
+                self.target_errors[name] = job.error
+        if self._target_jobs:
+            return f"Fitting each output alone, {len(self._target_jobs)} of {len(self.Y_names)} left"
+        return None
+
+    def cancel_target_fits(self, job_queue: JobQueue) -> None:
+        """
+        Cancel the fits of the single outputs.
+
+        :param job_queue: JobQueue
+            Queue the fits were submitted to.
+
+        :return: None
+        """
+        for job_id, _ in self._target_jobs.values():
+            job_queue.cancel(job_id)
+            job_queue.forget(job_id)
+        self._target_jobs = {}
+
+    @property
+    def is_running(self) -> bool:
+        """
+        Whether a background fit, the fits of the automatic kernel choice or the fits of the single outputs
+        are running.
+        """
+        return self.job_id is not None or bool(self._kernel_jobs) or bool(self._target_jobs)
+
+    def poll_run(self, job_queue: JobQueue) -> str | None:
+        """
+        Check the background fit, or the fits of the automatic kernel choice, and collect the results once they
+        have finished. If a fit failed, run_error is set. Then collect the fits of the single outputs.
+
+        :param job_queue: JobQueue
+            Queue the fits were submitted to.
+
+        :return:
+        progress: str or None
+            Description of the progress, or None if all fits have finished.
+        """
+        if self._kernel_jobs:
+            progress = self._poll_kernel_fits(job_queue)
+            if progress is not None:
+                return progress
+        elif self.job_id is not None:
+            job = job_queue.status(self.job_id)
+            if not job.is_finished:
+                if job.state == QUEUED:
+                    return "Waiting for a free worker..."
+                return f"{job.progress or 'Starting'}... ({job.elapsed:.0f} s)"
+            if job.state == DONE:
+                from core.results_io import restore_results
+
+                X, Y, key = self._job_fit
+                self._adopt_results(restore_results(job.result))
+                self._fast_iters = 0
+                self._force_refit = False
+                self._finish_run(X, Y, key, store=True)
+            else:
+                self.run_error = job.error
+            job_queue.forget(self.job_id)
+            self.job_id = None
+            self._job_fit = None
+        if self.run_error is not None:
+            self.cancel_target_fits(job_queue)
+        return self._poll_target_fits(job_queue)
+
+    def cancel_run(self, job_queue: JobQueue) -> None:
+        """
+        Cancel the background fit, or the fits of the automatic kernel choice.
+
+        :param job_queue: JobQueue
+            Queue the fits were submitted to.
+
+        :return: None
+        """
+        job_ids = [job_id for job_id, _ in self._kernel_jobs.values()]
+        if self.job_id is not None:
+            job_ids.append(self.job_id)
+        for job_id in job_ids:
+            job_queue.cancel(job_id)
+            job_queue.forget(job_id)
+        self.cancel_target_fits(job_queue)
+        self.job_id = None
+        self._job_fit = None
+        self._kernel_jobs = {}
+        self._kernel_fits = {}
+
+    def auto_run(
+            self,
+            job_queue: JobQueue,
+            on_row=None,
+            timeout: float | None = None,
+    ) -> int:
+        """
+        Run auto_iters iterations without a human in the loop: acquire a point, evaluate the objective there
+        in the job queue, and add the outputs to the data. Up to auto_concurrency evaluations run at the same
+        time; while they run, their rows are pending experiments, so the next points are acquired away from them.
+        Evaluated rows are moved to the end of the data in the order they finish, so every fit extends the
+        previous one and can be warm-started. If an evaluation fails, the running ones are cancelled, the rows
+        that were not evaluated are removed and auto_run_error is set.
+
+        :param job_queue: JobQueue
+            Queue to evaluate the objective in.
+        :param on_row: Callable or None
+            Called with the number of finished evaluations whenever a row has been added to the data.
+        :param timeout: float or None
+            Seconds to wait for each evaluation of a command or HTTP objective.
+
+        :return:
+        num_done: int
+            Number of evaluations added to the data.
+        """
+        from core.objective import evaluate_objective, parse_objective
+
+        parse_objective(self.objective)
+        allow_pending, batch_size = self.allow_pending, self.batch_size
+        self.allow_pending, self.batch_size = True, 1
+        self.auto_run_error = None
+        running = {}  # job id -> X values of the evaluated row
+        unevaluated = []  # X values of rows whose evaluation failed
+        num_submitted = num_done = 0
+        try:
+            while num_done < self.auto_iters and self.auto_run_error is None:
+                while num_submitted < self.auto_iters and len(running) < self.auto_concurrency:
+                    self.run_boss()
+                    self.concat_next_acq()
+                    x = self.data[self.X_names].iloc[-1].to_numpy(dtype=float)
+                    job_id = job_queue.submit(
+                        evaluate_objective, self.objective, x.tolist(), self.X_names, len(self.Y_names), timeout
+                    )
+                    running[job_id] = x
+                    num_submitted += 1
+                time.sleep(job_queue.poll_interval)
+                for job_id in list(running):
+                    job = job_queue.status(job_id)
+                    if not job.is_finished:
+                        continue
+                    job_queue.forget(job_id)
+                    x = running.pop(job_id)
+                    if job.state != DONE:
+                        self.auto_run_error = f"The evaluation at {x.tolist()} failed: {job.error}"
+                        unevaluated.append(x)
+                        break
+                    self.add_observation(x, job.result)
+                    num_done += 1
+                    if on_row is not None:
+                        on_row(num_done)
+        finally:
+            for job_id in running:
+                job_queue.cancel(job_id)
+                job_queue.forget(job_id)
+            self._remove_pending(list(running.values()) + unevaluated)
+            self.allow_pending, self.batch_size = allow_pending, batch_size
+        if num_done > 0 and self.auto_run_error is None:
+            # the results include all evaluations
+            self.run_boss()
+        return num_done
+
+    def _pending_row(self, x: np.ndarray) -> int | None:
+        """
+        Return the position of the first pending row with the X values x, or None if there is none.
+        """
+        X = self.data[self.X_names].to_numpy(dtype=float)
+        pending = self.data[self.Y_names].isnull().any(axis=1).to_numpy()
+        match = np.flatnonzero(pending & (X == x).all(axis=1))
+        return match[0] if len(match) > 0 else None
+
+    def _remove_pending(self, xs: list) -> None:
+        """
+        Remove the pending rows with the given X values.
+
+        :param xs: list
+            X values of the rows, each an ndarray.
+
+        :return: None
+        """
+        for x in xs:
+            i = self._pending_row(x)
+            if i is not None:
+                self.data = self.data.drop(index=self.data.index[i]).reset_index(drop=True)
+
+    def add_observation(self, x: np.ndarray, y: list) -> None:
+        """
+        Add an observation to the end of the data. If it belongs to a pending row with the same X values, that row
+        is filled in and moved to the end, so the data stays an extension of the latest fit.
+
+        :param x: ndarray
+            X values of the observation.
+        :param y: list
+            Output values, in the order of Y_names.
+
+        :return: None
+        """
+        i = self._pending_row(x)
+        row = pd.DataFrame([list(x) + list(y)], columns=self.X_names + self.Y_names)
+        data = self.data if i is None else self.data.drop(index=self.data.index[i])
+        self.data = pd.concat([data, row], ignore_index=True)
+
+    def submit_predictions(self, file, job_queue: JobQueue) -> None:
+        """
+        Save an uploaded file of points and submit a job that predicts the mean and variance of the model
+        of the latest iteration at each of them. Poll the job with poll_predictions.
+
+        :param file: UploadedFile
+            CSV, Parquet or Arrow file with a column for each input variable.
+        :param job_queue: JobQueue
+            Queue to submit the job to.
+
+        :return: None
+        """
+        from core.predict import predict_job
+        from core.results_io import snapshot_results
+
+        out_dir = self.out_dir or tempfile.gettempdir()
+        in_path = os.path.join(out_dir, f"points-{self.run_id}{os.path.splitext(file.name)[1].lower()}")
+        file.seek(0)
+        with open(in_path, "wb") as f:
+            shutil.copyfileobj(file, f)
+        out_path = os.path.join(out_dir, f"predictions-{self.run_id}.csv")
+        self.predict_error = None
+        self.predictions = None
+        self._predict_path = out_path
+        self.predict_job_id = job_queue.submit(
+            predict_job,
+            snapshot_results(self.results),
+            in_path,
+            self.X_names,
+            out_path,
+            self.objective_name,
+            self.objective_min,
+        )
+
+    def poll_predictions(self, job_queue: JobQueue) -> Job:
+        """
+        Check the prediction job and record the path of the predictions once it has finished.
+
+        :param job_queue: JobQueue
+            Queue the job was submitted to.
+
+        :return:
+        job: Job
+            The state of the job.
+        """
+        job = job_queue.status(self.predict_job_id)
+        if job.state == DONE:
+            self.predictions = self._predict_path
+        elif job.is_finished:
+            self.predict_error = job.error
+        if job.is_finished:
+            job_queue.forget(self.predict_job_id)
+            self.predict_job_id = None
+        return job
+
+    def concat_next_acq(self) -> None:
+        """
+        Concatenate the next acquisition location to the data table.
+
+        :return: None
+        """
+        if self.results is not None:
+            X_next = self.results.get_next_acq(-1)
+            if X_next is not None:
+                XY_next = np.concatenate((X_next, np.full((X_next.shape[0], len(self.Y_names)), np.nan)), axis=1)
+                acq = pd.DataFrame(data=XY_next, columns=self.X_names + self.Y_names)
+                self.data = pd.concat([self.data, acq], ignore_index=True)
+
+    def get_metadata(self) -> dict:
+        """
+        Return the metadata that is saved with the data: the BOSS parameters, the bounds of each input variable
+        and, with several outputs, the direction, weight and range of each output.
+
+        :return: dict
+        """
+        metadata = {
+            'noise': self.noise,
+            'min': self.min,
+            'num-init': self.num_init,
+        }
+        for d in range(0, self.dim):
+            metadata[self.X_names[d]] = self.bounds[d].tolist()
+        if self.is_multi_output:
+            for name, minimize in zip(self.Y_names, self._target_minimize()):
+                metadata[f"min-{name}"] = minimize
+                metadata[f"weight-{name}"] = self.target_settings.get(name, (self.min, 1.0))[1]
+                if name in self.target_ranges:
+                    metadata[f"range-{name}"] = self.target_ranges[name]
+        return metadata
+
+    def add_metadata(self) -> None:
+        """
+        Add the metadata as comment lines (indicated by a hash '#' at the beginning of a line) to the CSV of
+        the data in dload_data, which the download button offers.
+
+        :return: None
+        """
+        metadata = self.get_metadata()
+        for key, value in metadata.items():
+            if isinstance(value, list):
+                metadata[key] = str(value)
+        metadata_str = tomli_w.dumps(metadata)
+
+        # remove double quotes
+        metadata_str = metadata_str.replace('"', "")
+        # remove any whitespaces (leading, trailing, in-between words)
+        self.strip_white_spaces()
+
+        # add hash at the beginning of each line
+        metadata_str = "\n".join(["#" + line for line in metadata_str[:-1].split("\n")])
+        csv_changed = self._update_dload_csv()
+        if csv_changed or metadata_str != self._dload_metadata:
+            self._dload_metadata = metadata_str
+            self.dload_data = metadata_str + "\n" + self._dload_csv
+            self.dload_version += 1
+
+    def _update_dload_csv(self) -> bool:
+        """
+        Bring the CSV of the data up to date. This runs on every rerun, so the CSV is only rebuilt if the data
+        has changed; if rows were only appended, just the new rows are serialized.
+
+        :return: bool
+            True if the CSV has changed.
+        """
+        rows = self._dload_rows
+        if rows is not None and self.data.equals(rows):
+            return False
+        num_rows = 0 if rows is None else rows.shape[0]
+        if (
+                0 < num_rows < self.data.shape[0]
+                and self.data.columns.equals(rows.columns)
+                and self.data.iloc[:num_rows].equals(rows)
+        ):
+            self._dload_csv += self.data.iloc[num_rows:].to_csv(index=False, header=False)
+        else:
+            self._dload_csv = self.data.to_csv(index=False)
+        self._dload_rows = self.data.copy()
+        return True
@@ -0,0 +1,128 @@
+import copy
+import hashlib
+import numpy as np
+from boss.bo.acq.manager import BaseAcquisitionManager
+from core.data_io import iter_table_chunks
+from core.gp_update import append_observations
+
+
+def _row_keys(X: np.ndarray) -> np.ndarray:
+    """
+    Return one hashable value per row of X, to compare rows with np.isin.
+    """
+    X = np.ascontiguousarray(X, dtype=float)
+    return X.view(np.dtype((np.void, X.dtype.itemsize * X.shape[1]))).ravel()
+
+
+def file_digest(path: str, block_size: int = 2**20) -> str:
+    """
+    Return the SHA-256 digest of a file, read block by block.
+
+    :param path: str
+        Path of the file.
+    :param block_size: int
+        Number of bytes read at a time.
+
+    :return: str
+    """
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for block in iter(lambda: f.read(block_size), b""):
+            h.update(block)
+    return h.hexdigest()
+
+
+class CandidatePool:
+    """
+    Finite set of feasible input points, stored in a CSV, Parquet or Arrow file, from which acquisitions are
+    picked instead of optimizing the acquisition function over the bounds. The file is read in chunks, so pools
+    of millions of candidates never have to be held in memory. A pool only holds the path of the file, so it can
+    be sent to a job process.
+    """
+
+    def __init__(self, path: str, columns: list, chunk_size: int = 65536, shortlist_factor: int = 20):
+        self.path = path
+        self.columns = list(columns)
+        self.chunk_size = chunk_size
+        # batches are built from the shortlist_factor * batch_size best candidates of the first pass
+        self.shortlist_factor = shortlist_factor
+        self.key = file_digest(path)  # identifies the content of the pool, e.g. in fit cache keys
+
+    def chunks(self):
+        """
+        Iterate over the candidates in chunks of at most chunk_size rows.
+
+        :return: Iterator[ndarray]
+        """
+        return iter_table_chunks(self.path, self.columns, self.chunk_size)
+
+    def best(self, acqfn, num: int, X_exclude: np.ndarray) -> (np.ndarray, np.ndarray):
+        """
+        Score all candidates with the acquisition function in vectorized chunks and keep the num best ones.
+
+        :param acqfn: BaseAcquisition
+            Acquisition function, which is minimized.
+        :param num: int
+            Number of candidates to keep.
+        :param X_exclude: ndarray
+            Points that are never picked, e.g. the data the model was fitted on.
+
+        :return:
+        X_best, acq_best: (ndarray, ndarray)
+            The best candidates, one per row, and their acquisition values, best first.
+        """
+        exclude = _row_keys(X_exclude)
+        X_best = np.empty(shape=(0, len(self.columns)))
+        acq_best = np.empty(shape=(0,))
+        for X in self.chunks():
+            X = X[~np.isin(_row_keys(X), exclude)]
+            if X.shape[0] == 0:
+                continue
+            acq = np.ravel(acqfn.evaluate(X))
+            X_best = np.vstack((X_best, X))
+            acq_best = np.concatenate((acq_best, acq))
+            if acq_best.shape[0] > num:
+                keep = np.argpartition(acq_best, num)[:num]
+                X_best, acq_best = X_best[keep], acq_best[keep]
+        order = np.argsort(acq_best, kind="stable")
+        return X_best[order], acq_best[order]
+
+    def acquire(
+            self,
+            acq_manager: BaseAcquisitionManager,
+            batch_size: int = 1,
+            X_pending: np.ndarray | None = None,
+    ) -> np.ndarray:
+        """
+        Pick the next acquisition(s) from the pool. Candidates that were already observed or are pending are
+        skipped. Pending points are added to a temporary copy of the model with their predicted mean as
+        observation, as in core.pending. Batches are built with the Kriging Believer strategy, like the batches
+        over the bounds: after each pick, the candidate is added to the temporary model and the shortlist from
+        the full pass is scored again.
+
+        :param acq_manager: BaseAcquisitionManager
+            Acquisition manager of a fitted BOMain object.
+        :param batch_size: int
+            Number of acquisitions.
+        :param X_pending: ndarray or None
+            X values of pending experiments, one per row.
+
+        :return:
+        X_next: ndarray
+            The next acquisitions, one per row. Fewer than batch_size if the pool runs out of candidates.
+        """
+        acqfn = copy.deepcopy(acq_manager.acqfn)
+        model = acqfn.model
+        if X_pending is not None and X_pending.shape[0] > 0:
+            append_observations(model, X_pending, model.predict(X_pending)[0])
+        num = batch_size if batch_size == 1 else batch_size * self.shortlist_factor
+        X_short, acq_short = self.best(acqfn, num, model.X)
+        if X_short.shape[0] == 0:
+            raise ValueError("All candidates in the pool have already been observed or are pending.")
+        X_next = X_short[:1]
+        for _ in range(1, min(batch_size, X_short.shape[0])):
+            append_observations(model, X_next[-1:], model.predict(X_next[-1:])[0])
+            X_short = X_short[~np.isin(_row_keys(X_short), _row_keys(X_next))]
+            acq_short = np.ravel(acqfn.evaluate(X_short))
+            X_next = np.vstack((X_next, X_short[np.argmin(acq_short)]))
+        return X_next
@@ -0,0 +1,81 @@
+import numpy as np
+import pandas as pd
+from boss.bo.results import BOResults
+
+
+def _trace(results: BOResults, name: str) -> list:
+    """
+    Return a result of every iteration, None where it was not recorded, e.g. for the iterations
+    of a fit from scratch, for which BOSS only stores the results of the latest iteration.
+    """
+    values = results.data[name]
+    return [values[itr] if itr < len(values) else None for itr in range(results.num_iters)]
+
+
+def convergence_table(results: BOResults, x_names: list, minimize: bool = True) -> pd.DataFrame:
+    """
+    Return the convergence measures of every iteration, read from the results arrays.
+
+    :param results: BOResults
+        Results of the run.
+    :param x_names: list
+        Names of the input variables.
+    :param minimize: bool
+        False if the output was maximized, so the minima are shown as maxima of the original output.
+
+    :return:
+    table: pd.DataFrame
+        Indexed by iteration, with the columns
+        observed optimum: best output value observed so far,
+        predicted optimum: model prediction at the predicted global optimum (NaN where not recorded),
+        variance: model variance at the predicted global optimum,
+        acquisition distance: distance between the latest acquisitions of the iteration and of the previous one,
+        and the location of the predicted global optimum, one column per input variable.
+    """
+    num_iters = results.num_iters
+    sign = 1.0 if minimize else -1.0
+    Y_min = np.array([np.min(results.select("Y", itr)) for itr in range(num_iters)])
+    X_last = np.array([np.atleast_2d(results.select("X", itr))[-1] for itr in range(num_iters)])
+    distance = np.full(num_iters, np.nan)
+    distance[1:] = np.linalg.norm(np.diff(X_last, axis=0), axis=1)
+
+    table = pd.DataFrame(
+        {
+            "observed optimum": sign * np.minimum.accumulate(Y_min),
+            "predicted optimum": [np.nan if v is None else sign * float(v) for v in _trace(results, "mu_glmin")],
+            "variance": [np.nan if v is None else float(v) for v in _trace(results, "nu_glmin")],
+            "acquisition distance": distance,
+        },
+        index=pd.RangeIndex(num_iters, name="iteration"),
+    )
+    x_glmin = _trace(results, "x_glmin")
+    for d, name in enumerate(x_names):
+        table[name] = [np.nan if x is None else float(np.ravel(x)[d]) for x in x_glmin]
+    return table
+
+
+def hyperparameter_table(results: BOResults, x_names: list) -> pd.DataFrame:
+    """
+    Return the model hyperparameters of every iteration, read from the results arrays.
+
+    :param results: BOResults
+        Results of the run.
+    :param x_names: list
+        Names of the input variables.
+
+    :return:
+    table: pd.DataFrame
+        Indexed by iteration, with the kernel variance and one lengthscale per input variable,
+        NaN for iterations whose hyperparameters were not recorded.
+    """
+    params = _trace(results, "model_params")
+    num_params = max((len(p) for p in params if p is not None), default=0)
+    if num_params == len(x_names) + 1:
+        names = ["variance"] + [f"lengthscale {x}" for x in x_names]
+    else:
+        names = [f"parameter {k}" for k in range(num_params)]
+    values = np.full((len(params), num_params), np.nan)
+    for itr, p in enumerate(params):
+        if p is not None:
+            values[itr, : len(p)] = np.ravel(p)
+    return pd.DataFrame(values, columns=names, index=pd.RangeIndex(len(params), name="iteration"))
@@ -0,0 +1,235 @@
+import json
+import numpy as np
+import os
+import pandas as pd
+import tomli
+from typing import BinaryIO
+
+# file formats for up- and downloads: name -> (file extension, mime type)
+FORMATS = {
+    "CSV": ("csv", "text/csv"),
+    "Parquet": ("parquet", "application/vnd.apache.parquet"),
+    "Arrow": ("arrow", "application/vnd.apache.arrow.file"),
+}
+# extensions accepted for uploads; feather v2 files are Arrow IPC files
+UPLOAD_EXTENSIONS = ["csv", "parquet", "arrow", "feather"]
+# key of the BOSS metadata in the schema metadata of Parquet and Arrow files
+METADATA_KEY = b"boss-web"
+# delimiters accepted in uploaded CSV files, in order of preference if a header contains several
+DELIMITERS = (",", ";", "\t")
+
+
+def detect_delimiter(header: str) -> str:
+    """
+    Return the delimiter used in a CSV header line: the one of DELIMITERS that occurs most often.
+
+    :param header: str
+        The header line of the file.
+
+    :return:
+    delimiter: str
+        The detected delimiter, a comma if the header contains none of them.
+    """
+    counts = [header.count(d) for d in DELIMITERS]
+    return DELIMITERS[counts.index(max(counts))]
+
+
+def read_csv_with_metadata(file: BinaryIO) -> (pd.DataFrame, dict):
+    """
+    Read a CSV file whose leading lines may contain BOSS metadata in TOML format, each line starting with '#'.
+    Only the leading comment block is read line by line. The delimiter is detected from the header line and
+    the rest of the file is parsed by pandas' C engine, so large files are read quickly. Blank lines are skipped.
+
+    :param file: BinaryIO
+        The file, opened in binary mode, e.g. an UploadedFile.
+
+    :return:
+    data, metadata: (pd.DataFrame, dict)
+        The data, and the metadata, which is empty if the file has none.
+    """
+    file.seek(0)
+    metadata_lines = []
+    while True:
+        pos = file.tell()
+        raw = file.readline()
+        if not raw:
+            # the file has no header line
+            return pd.DataFrame(), tomli.loads("\n".join(metadata_lines))
+        line = raw.decode("utf-8-sig").strip()
+        if line.startswith("#"):
+            metadata_lines.append(line[1:])
+        elif line:
+            break
+    file.seek(pos)
+    data = pd.read_csv(file, sep=detect_delimiter(line), comment="#", engine="c", encoding="utf-8-sig")
+    return data, tomli.loads("\n".join(metadata_lines))
+
+
+def _to_builtin(obj):
+    """
+    Convert numpy scalars and arrays in the metadata to Python objects for JSON.
+    """
+    if isinstance(obj, (np.generic, np.ndarray)):
+        return obj.tolist()
+    raise TypeError(f"Cannot store {type(obj).__name__} in the metadata")
+
+
+def write_table(data: pd.DataFrame, metadata: dict, file_format: str) -> bytes:
+    """
+    Write data to a Parquet or Arrow IPC file, with the BOSS metadata in the key-value metadata of the schema.
+    Values are stored in binary, so they round-trip without loss of precision.
+
+    :param data: pd.DataFrame
+        The data.
+    :param metadata: dict
+        The metadata, e.g. noise, min, num-init and the bounds of each input variable.
+    :param file_format: str
+        "Parquet" or "Arrow".
+
+    :return:
+    content: bytes
+        Content of the file.
+    """
+    import pyarrow as pa
+
+    table = pa.Table.from_pandas(data, preserve_index=False)
+    schema_metadata = dict(table.schema.metadata or {})
+    schema_metadata[METADATA_KEY] = json.dumps(metadata, default=_to_builtin).encode("utf-8")
+    table = table.replace_schema_metadata(schema_metadata)
+
+    sink = pa.BufferOutputStream()
+    if file_format == "Parquet":
+        import pyarrow.parquet as pq
+
+        pq.write_table(table, sink)
+    elif file_format == "Arrow":
+        with pa.ipc.new_file(sink, table.schema) as writer:
+            writer.write_table(table)
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+    return sink.getvalue().to_pybytes()
+
+
+def read_table(file: BinaryIO, file_format: str) -> (pd.DataFrame, dict):
+    """
+    Read a Parquet or Arrow IPC (Feather v2) file written with write_table, or by any other tool.
+
+    :param file: BinaryIO
+        The file, opened in binary mode, e.g. an UploadedFile.
+    :param file_format: str
+        "Parquet" or "Arrow".
+
+    :return:
+    data, metadata: (pd.DataFrame, dict)
+        The data, and the metadata, which is empty if the file has none.
+    """
+    import pyarrow as pa
+
+    file.seek(0)
+    if file_format == "Parquet":
+        import pyarrow.parquet as pq
+
+        table = pq.read_table(file)
+    elif file_format == "Arrow":
+        table = pa.ipc.open_file(file).read_all()
+    else:
+        raise ValueError(f"Unknown file format: {file_format}")
+    raw = (table.schema.metadata or {}).get(METADATA_KEY)
+    metadata = json.loads(raw) if raw is not None else {}
+    return table.to_pandas(), metadata
+
+
+def read_data_file(file: BinaryIO, file_name: str) -> (pd.DataFrame, dict):
+    """
+    Read an uploaded CSV, Parquet or Arrow file. The format is chosen by the file extension.
+
+    :param file: BinaryIO
+        The file, opened in binary mode, e.g. an UploadedFile.
+    :param file_name: str
+        Name of the file.
+
+    :return:
+    data, metadata: (pd.DataFrame, dict)
+        The data, and the metadata, which is empty if the file has none.
+    """
+    extension = os.path.splitext(file_name)[1].lower().lstrip(".")
+    if extension == "parquet":
+        return read_table(file, "Parquet")
+    if extension in ("arrow", "feather"):
+        return read_table(file, "Arrow")
+    return read_csv_with_metadata(file)
+
+
+def iter_table_chunks(path: str, columns: list, chunk_size: int = 65536):
+    """
+    Read the given columns of a CSV, Parquet or Arrow file in chunks, so the whole table is never held
+    in memory at once. Arrow files are memory-mapped; Parquet files are read batch by batch.
+
+    :param path: str
+        Path of the file. The format is chosen by the file extension.
+    :param columns: list
+        Names of the columns to read.
+    :param chunk_size: int
+        Maximum number of rows per chunk.
+
+    :return:
+    chunks: Iterator[ndarray]
+        The values of the columns, one row per table row, as floats.
+    """
+    extension = os.path.splitext(path)[1].lower().lstrip(".")
+    if extension == "parquet":
+        import pyarrow.parquet as pq
+
+        parquet_file = pq.ParquetFile(path)
+        _check_columns(parquet_file.schema_arrow.names, columns)
+        for batch in parquet_file.iter_batches(batch_size=chunk_size, columns=columns):
+            yield _batch_values(batch, columns)
+    elif extension in ("arrow", "feather"):
+        import pyarrow as pa
+
+        with pa.memory_map(path) as source:
+            reader = pa.ipc.open_file(source)
+            _check_columns(reader.schema.names, columns)
+            for i in range(reader.num_record_batches):
+                batch = reader.get_batch(i)
+                for start in range(0, batch.num_rows, chunk_size):
+                    yield _batch_values(batch.slice(start, chunk_size), columns)
+    else:
+        with open(path, "rb") as file:
+            header = ""
+            for raw in file:
+                header = raw.decode("utf-8-sig").strip()
+                if header and not header.startswith("#"):
+                    break
+        delimiter = detect_delimiter(header)
+        _check_columns(header.split(delimiter), columns)
+        reader = pd.read_csv(
+            path,
+            sep=delimiter,
+            comment="#",
+            engine="c",
+            encoding="utf-8-sig",
+            usecols=columns,
+            chunksize=chunk_size,
+        )
+        with reader:
+            for chunk in reader:
+                yield chunk[columns].to_numpy(dtype=float)
+
+
+def _check_columns(names: list, columns: list) -> None:
+    """
+    Raise a ValueError if any of the columns is not among the column names of a file.
+    """
+    missing = [c for c in columns if c not in names]
+    if missing:
+        raise ValueError(f"The file has no column {', '.join(missing)}.")
+
+
+def _batch_values(batch, columns: list) -> np.ndarray:
+    """
+    Return the given columns of a pyarrow RecordBatch as a float array, one row per record.
+    """
+    return np.column_stack(
+        [batch.column(batch.schema.get_field_index(c)).to_numpy(zero_copy_only=False) for c in columns]
+    ).astype(float)
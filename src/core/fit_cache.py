@@ -0,0 +1,141 @@
+import hashlib
+import os
+import pickle
+import threading
+from collections import OrderedDict
+import numpy as np
+
+
+def fit_key(X: np.ndarray, Y: np.ndarray, bounds: np.ndarray, **settings) -> str:
+    """
+    Return a key that identifies a BOSS fit by its data, bounds and settings.
+
+    :param X: ndarray
+        X values of the fit.
+    :param Y: ndarray
+        Y values of the fit.
+    :param bounds: ndarray
+        Bounds of the input variables.
+    :param settings:
+        Any other settings that change the result of the fit, e.g. kernel, noise and min.
+
+    :return:
+    key: str
+        Hex digest of the SHA-256 hash of all inputs.
+    """
+    h = hashlib.sha256()
+    for arr in (X, Y, bounds):
+        arr = np.ascontiguousarray(arr, dtype=float)
+        h.update(str(arr.shape).encode())
+        h.update(arr.tobytes())
+    for name in sorted(settings):
+        val = settings[name]
+        if isinstance(val, np.ndarray):
+            val = (val.shape, val.tolist())
+        h.update(f"{name}={val!r};".encode())
+    return h.hexdigest()
+
+
+class FitCache:
+    """
+    Cache of BOSS fit results, keyed by fit_key. Values are kept pickled in memory with LRU eviction
+    once max_bytes is exceeded. If disk_dir is given, values are also written there, so they survive
+    server restarts; the oldest files are removed once max_disk_bytes is exceeded.
+    The cache is thread-safe, so one instance can be shared by all sessions of the server.
+    """
+
+    def __init__(self, max_bytes: int = 256 * 2**20, disk_dir: str | None = None, max_disk_bytes: int = 2**30):
+        self.max_bytes = max_bytes
+        self.disk_dir = disk_dir
+        self.max_disk_bytes = max_disk_bytes
+        self._entries = OrderedDict()  # key -> pickled value, least recently used first
+        self._num_bytes = 0
+        self._lock = threading.Lock()
+        if self.disk_dir is not None:
+            os.makedirs(self.disk_dir, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def __contains__(self, key: str) -> bool:
+        return key in self._entries or (self.disk_dir is not None and os.path.isfile(self._path(key)))
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.disk_dir, key + ".pkl")
+
+    def get(self, key: str):
+        """
+        Return the value stored for key, or None if there is none.
+        Every call returns a new copy, so callers can modify it freely.
+
+        :param key: str
+            Key made with fit_key.
+        """
+        with self._lock:
+            blob = self._entries.get(key)
+            if blob is not None:
+                self._entries.move_to_end(key)
+        if blob is None and self.disk_dir is not None:
+            try:
+                with open(self._path(key), "rb") as f:
+                    blob = f.read()
+            except OSError:
+                return None
+            os.utime(self._path(key))
+            with self._lock:
+                self._store(key, blob)
+        return None if blob is None else pickle.loads(blob)
+
+    def put(self, key: str, value) -> None:
+        """
+        Store a picklable value for key.
+
+        :param key: str
+            Key made with fit_key.
+        :param value:
+            Value to store. It must not contain GPy models, see core.results_io.
+        """
+        blob = pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL)
+        with self._lock:
+            self._store(key, blob)
+        if self.disk_dir is not None:
+            self._write_to_disk(key, blob)
+
+    def clear(self) -> None:
+        """
+        Remove all values from memory, but not from disk.
+        """
+        with self._lock:
+            self._entries.clear()
+            self._num_bytes = 0
+
+    def _store(self, key: str, blob: bytes) -> None:
+        if key in self._entries:
+            self._num_bytes -= len(self._entries.pop(key))
+        self._entries[key] = blob
+        self._num_bytes += len(blob)
+        while self._num_bytes > self.max_bytes and len(self._entries) > 1:
+            _, evicted = self._entries.popitem(last=False)
+            self._num_bytes -= len(evicted)
+
+    def _write_to_disk(self, key: str, blob: bytes) -> None:
+        # write to a temporary file first, so other processes never read a partial file
+        tmp_path = f"{self._path(key)}.{os.getpid()}.{threading.get_ident()}.tmp"
+        with open(tmp_path, "wb") as f:
+            f.write(blob)
+        os.replace(tmp_path, self._path(key))
+
+        files = []
+        for entry in os.scandir(self.disk_dir):
+            if entry.name.endswith(".pkl"):
+                stat = entry.stat()
+                files.append((stat.st_mtime, stat.st_size, entry.path))
+        total = sum(size for _, size, _ in files)
+        for _, size, path in sorted(files):
+            if total <= self.max_disk_bytes:
+                break
+            try:
+                os.remove(path)
+            except OSError:
+                pass
+            total -= size
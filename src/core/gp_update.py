@@ -0,0 +1,77 @@
+import numpy as np
+from GPy.inference.latent_function_inference.posterior import Posterior
+from paramz.core.observable_array import ObsAr
+from scipy.linalg import cho_solve, solve_triangular
+
+# Same jitter that GPy's exact Gaussian inference adds to the diagonal of the covariance matrix
+JITTER = 1e-8
+
+
+def cholesky_append(L: np.ndarray, K_cross: np.ndarray, K_new: np.ndarray) -> np.ndarray:
+    """
+    Return the lower Cholesky factor of the block matrix [[A, K_cross], [K_cross.T, K_new]],
+    given the lower Cholesky factor L of A. Costs O(n^2) per added row instead of O(n^3) for a new factorization.
+
+    :param L: ndarray
+        Lower Cholesky factor of A, shape (n, n).
+    :param K_cross: ndarray
+        Covariance between the old and the new points, shape (n, m).
+    :param K_new: ndarray
+        Covariance of the new points, shape (m, m).
+
+    :return:
+    L_new: ndarray
+        Lower Cholesky factor of the extended matrix, shape (n + m, n + m).
+        Raises np.linalg.LinAlgError if the extended matrix is not positive definite.
+    """
+    n, m = K_cross.shape
+    C = solve_triangular(L, K_cross, lower=True)
+    D = np.linalg.cholesky(K_new - C.T @ C)
+    L_new = np.zeros(shape=(n + m, n + m))
+    L_new[:n, :n] = L
+    L_new[n:, :n] = C.T
+    L_new[n:, n:] = D
+    # GPy's triangular solvers expect Fortran-ordered arrays
+    return np.asfortranarray(L_new)
+
+
+def append_observations(model, X_new: np.ndarray, Y_new: np.ndarray) -> None:
+    """
+    Add observations to a fitted BOSS model without refitting it. The hyperparameters are kept fixed
+    and the GP posterior is updated with a low-rank Cholesky update.
+    Falls back to a full recomputation of the posterior if the update is numerically unstable.
+
+    :param model: STModel
+        Fitted single-task BOSS model.
+    :param X_new: ndarray
+        New input points, shape (m, dim).
+    :param Y_new: ndarray
+        New observations, shape (m, 1).
+
+    :return: None
+    """
+    gp = model._model
+    X_new = np.atleast_2d(X_new)
+    Y_new = np.atleast_2d(Y_new).reshape(-1, 1)
+    X = np.vstack([gp.X, X_new])
+    Y = np.vstack([model.Y, Y_new])
+    try:
+        noise = gp.likelihood.variance.item() + JITTER
+        K_cross = gp.kern.K(gp.X, X_new)
+        K_new = gp.kern.K(X_new) + noise * np.eye(X_new.shape[0])
+        L = cholesky_append(gp.posterior.woodbury_chol, K_cross, K_new)
+    except np.linalg.LinAlgError:
+        model.redefine_data(X, Y)
+        return
+
+    # same normalisation of the observations as in STModel.redefine_data
+    model.normmean = np.mean(Y)
+    if model.use_norm:
+        model.normsd = np.ptp(Y)
+    Y_norm = (Y - model.normmean) / model.normsd
+
+    K = np.block([[gp.posterior._K, K_cross], [K_cross.T, K_new - noise * np.eye(X_new.shape[0])]])
+    gp.X = ObsAr(X)
+    gp.Y = ObsAr(Y_norm)
+    gp.Y_normalized = gp.Y
+    gp.posterior = Posterior(woodbury_chol=L, woodbury_vector=cho_solve((L, True), Y_norm), K=K)
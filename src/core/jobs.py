@@ -0,0 +1,424 @@
+import importlib
+import itertools
+import multiprocessing as mp
+import sys
+import threading
+import time
+import traceback
+import types
+from collections import deque
+from contextlib import contextmanager
+from dataclasses import dataclass, field
+from typing import Any, Callable
+
+QUEUED = "queued"
+RUNNING = "running"
+DONE = "done"
+FAILED = "failed"
+CANCELLED = "cancelled"
+
+# connection to the parent process, only set inside a job process
+_progress_conn = None
+# serializes the swaps of sys.modules["__main__"] while worker processes are started from several threads
+_main_module_lock = threading.Lock()
+
+
+def report_progress(message: str) -> None:
+    """
+    Report the progress of the current job, e.g. the current step. Does nothing outside a job process.
+
+    :param message: str
+        Short description of what the job is doing.
+    """
+    if _progress_conn is not None:
+        _progress_conn.send(("progress", message))
+
+
+def _resolve(path: str) -> Callable:
+    """
+    Import a function given by its dotted path, e.g. "core.boss_fit.warm_up".
+    """
+    module_name, _, name = path.rpartition(".")
+    return getattr(importlib.import_module(module_name), name)
+
+
+def _worker_main(conn, initializer: str | None) -> None:
+    """
+    Entry point of a worker process: run the initializer once, then run jobs received from the parent
+    one after the other and send back their results or errors, until None is received.
+    """
+    global _progress_conn
+    _progress_conn = conn
+    if initializer is not None:
+        try:
+            _resolve(initializer)()
+        except Exception:
+            # the worker can still run jobs, they just won't be faster
+            traceback.print_exc()
+    while True:
+        try:
+            task = conn.recv()
+        except EOFError:
+            return
+        if task is None:
+            return
+        fn, args, kwargs = task
+        try:
+            result = fn(*args, **kwargs)
+            conn.send(("result", result))
+        except Exception as err:
+            conn.send(("error", f"{type(err).__name__}: {err}", traceback.format_exc()))
+
+
+@contextmanager
+def _hidden_main_module():
+    """
+    Hide the __main__ module while starting a worker process.
+    Streamlit installs the page script as __main__, and spawned processes would run the whole script again
+    to recreate it. The workers only run functions of regular modules, so they don't need it.
+    The swap is held for as short as possible and serialized, so that concurrent starts cannot leave the
+    placeholder installed.
+    """
+    with _main_module_lock:
+        main_module = sys.modules["__main__"]
+        sys.modules["__main__"] = types.ModuleType("__main__")
+        try:
+            yield
+        finally:
+            sys.modules["__main__"] = main_module
+
+
+class _Worker:
+    """
+    A worker process of a JobQueue and the connection to it.
+    """
+
+    def __init__(self, ctx, initializer: str | None):
+        self.conn, child_conn = ctx.Pipe()
+        self.process = ctx.Process(target=_worker_main, args=(child_conn, initializer), daemon=True)
+        with _hidden_main_module():
+            self.process.start()
+        child_conn.close()
+        self.job = None  # the running job, None if the worker is idle
+        # held while sending a task, so the connection is not closed in the middle of a send
+        self.send_lock = threading.Lock()
+
+    def send(self, task) -> None:
+        with self.send_lock:
+            self.conn.send(task)
+
+    def stop(self, terminate: bool = False) -> None:
+        if terminate:
+            # a send blocked on a full pipe fails once the process is gone, which releases send_lock
+            self.process.terminate()
+        else:
+            try:
+                self.send(None)
+            except OSError:
+                pass
+        self.process.join()
+        with self.send_lock:
+            self.conn.close()
+
+
+@dataclass
+class Job:
+    """
+    State of a job submitted to a JobQueue.
+    """
+    job_id: str
+    fn: Callable
+    args: tuple
+    kwargs: dict
+    state: str = QUEUED
+    progress: str = ""
+    result: Any = None
+    error: str | None = None
+    submitted: float = field(default_factory=time.time)
+    started: float | None = None
+    finished: float | None = None
+    process: Any = None
+
+    @property
+    def is_finished(self) -> bool:
+        return self.state in (DONE, FAILED, CANCELLED)
+
+    @property
+    def elapsed(self) -> float:
+        """
+        Seconds the job has been running, or ran for if it is finished.
+        """
+        if self.started is None:
+            return 0.0
+        return (self.finished or time.time()) - self.started
+
+
+class JobQueue:
+    """
+    Queue that runs jobs in a pool of worker processes, so long computations neither block the streamlit
+    script thread nor each other. At most max_workers jobs run at the same time, the others wait in
+    first-in-first-out order. Running jobs can be cancelled, which terminates their worker; a new worker
+    is started in its place.
+    The workers live as long as the queue and run jobs one after the other. The initializer runs once in
+    every worker before its first job, e.g. to import and warm up expensive modules, so that jobs don't pay
+    for it. It is given as a dotted path, so the server process does not need to import it.
+    One instance is meant to be shared by all sessions of the server.
+    Job functions and their arguments and results have to be picklable.
+    The lock of the queue is only held for bookkeeping. Tasks are sent to the workers and new workers are
+    started by the dispatcher thread without it, so a worker that is still initializing and not yet reading
+    its pipe never blocks the status queries of other sessions.
+    """
+
+    def __init__(
+            self,
+            max_workers: int = 2,
+            poll_interval: float = 0.05,
+            initializer: str | None = None,
+            prestart: bool = False,
+    ):
+        self.max_workers = max_workers
+        self.poll_interval = poll_interval
+        self.initializer = initializer
+        # spawn instead of fork, as forking the multi-threaded server process is not safe
+        self._ctx = mp.get_context("spawn")
+        self._jobs = {}
+        self._queue = deque()
+        self._ids = itertools.count()
+        self._workers = []
+        self._num_starting = 0  # workers being started outside the lock
+        self._lock = threading.Lock()
+        self._dispatcher = None
+        if prestart:
+            self.start_workers()
+
+    def start_workers(self) -> None:
+        """
+        Start all workers now instead of when the first jobs are submitted, so they are warm when needed.
+        """
+        with self._lock:
+            num = self._reserve_workers(self.max_workers)
+        self._spawn_workers(num)
+
+    def shutdown(self) -> None:
+        """
+        Cancel all jobs and stop the workers.
+        """
+        with self._lock:
+            for job_id in list(self._queue):
+                self._finish(self._jobs[job_id], CANCELLED)
+            self._queue.clear()
+            workers, self._workers = self._workers, []
+            busy = [worker.job is not None for worker in workers]
+            for worker in workers:
+                if worker.job is not None:
+                    self._finish(worker.job, CANCELLED)
+        for worker, terminate in zip(workers, busy):
+            worker.stop(terminate=terminate)
+
+    def submit(self, fn: Callable, *args, **kwargs) -> str:
+        """
+        Add a job to the queue.
+
+        :param fn: Callable
+            Module-level function to run in the worker process.
+        :param args:
+            Positional arguments for fn.
+        :param kwargs:
+            Keyword arguments for fn.
+
+        :return:
+        job_id: str
+            Id of the job, to query its status or cancel it.
+        """
+        with self._lock:
+            job_id = str(next(self._ids))
+            self._jobs[job_id] = Job(job_id=job_id, fn=fn, args=args, kwargs=kwargs)
+            self._queue.append(job_id)
+            if self._dispatcher is None or not self._dispatcher.is_alive():
+                self._dispatcher = threading.Thread(target=self._dispatch, daemon=True)
+                self._dispatcher.start()
+        return job_id
+
+    def status(self, job_id: str) -> Job:
+        """
+        Return the job with the given id.
+
+        :param job_id: str
+            Id returned by submit.
+
+        :return: Job
+        """
+        with self._lock:
+            self._collect()
+            return self._jobs[job_id]
+
+    def wait(self, job_id: str) -> Job:
+        """
+        Block until a job has finished.
+
+        :param job_id: str
+            Id returned by submit.
+
+        :return: Job
+        """
+        job = self.status(job_id)
+        while not job.is_finished:
+            time.sleep(self.poll_interval)
+            job = self.status(job_id)
+        return job
+
+    def cancel(self, job_id: str) -> None:
+        """
+        Cancel a job. A queued job is removed from the queue, the worker of a running job is terminated
+        and replaced.
+
+        :param job_id: str
+            Id returned by submit.
+        """
+        with self._lock:
+            job = self._jobs[job_id]
+            if job.state == QUEUED:
+                self._queue.remove(job_id)
+                self._finish(job, CANCELLED)
+                return
+            if job.state != RUNNING:
+                return
+            worker = self._worker_of(job)
+            self._workers.remove(worker)
+            self._finish(job, CANCELLED)
+            num = self._reserve_workers(1)
+        worker.stop(terminate=True)
+        self._spawn_workers(num)
+
+    def forget(self, job_id: str) -> None:
+        """
+        Remove a finished job, once its result has been collected.
+
+        :param job_id: str
+            Id returned by submit.
+        """
+        with self._lock:
+            if job_id in self._jobs and self._jobs[job_id].is_finished:
+                del self._jobs[job_id]
+
+    @property
+    def num_running(self) -> int:
+        return sum(1 for worker in self._workers if worker.job is not None)
+
+    def _dispatch(self) -> None:
+        """
+        Background thread that collects results and starts queued jobs while there are unfinished jobs.
+        Jobs are assigned to idle workers under the lock, but sent to them, and missing workers started,
+        after releasing it.
+        """
+        while True:
+            with self._lock:
+                self._collect()
+                if not self._queue and self.num_running == 0:
+                    self._dispatcher = None
+                    return
+                starts = self._assign()
+                num = self._reserve_workers(len(self._queue))
+            for worker, job in starts:
+                self._start(worker, job)
+            self._spawn_workers(num)
+            time.sleep(self.poll_interval)
+
+    def _collect(self) -> None:
+        """
+        Collect messages from running jobs. Must be called with the lock held.
+        """
+        for worker in list(self._workers):
+            if worker.job is not None:
+                self._receive(worker)
+
+    def _assign(self) -> list:
+        """
+        Assign queued jobs to idle workers and mark them as running. Must be called with the lock held.
+
+        :return:
+        starts: list
+            (worker, job) pairs whose tasks still have to be sent with _start.
+        """
+        starts = []
+        for worker in self._workers:
+            if not self._queue:
+                break
+            if worker.job is None:
+                job = self._jobs[self._queue.popleft()]
+                worker.job = job
+                job.process = worker.process
+                job.state = RUNNING
+                job.started = time.time()
+                starts.append((worker, job))
+        return starts
+
+    def _reserve_workers(self, num: int) -> int:
+        """
+        Reserve up to num new workers within max_workers, to be started with _spawn_workers.
+        Must be called with the lock held.
+
+        :return: int
+            Number of workers to start.
+        """
+        num = max(0, min(num, self.max_workers - len(self._workers) - self._num_starting))
+        self._num_starting += num
+        return num
+
+    def _spawn_workers(self, num: int) -> None:
+        """
+        Start workers reserved with _reserve_workers. Must be called without the lock.
+        """
+        for _ in range(num):
+            worker = _Worker(self._ctx, self.initializer)
+            with self._lock:
+                self._num_starting -= 1
+                self._workers.append(worker)
+
+    def _worker_of(self, job: Job) -> _Worker:
+        return next(w for w in self._workers if w.job is job)
+
+    def _start(self, worker: _Worker, job: Job) -> None:
+        """
+        Send a job assigned with _assign to its worker. Must be called without the lock, as the send blocks
+        until the worker reads the task if it does not fit into the pipe.
+        """
+        try:
+            worker.send((job.fn, job.args, job.kwargs))
+        except Exception as err:
+            # e.g. the arguments cannot be pickled, or the job was cancelled during the send
+            with self._lock:
+                if not job.is_finished:
+                    job.error = f"{type(err).__name__}: {err}"
+                    self._finish(job, FAILED)
+                if worker.job is job:
+                    worker.job = None
+                if not worker.process.is_alive() and worker in self._workers:
+                    self._workers.remove(worker)
+
+    def _finish(self, job: Job, state: str) -> None:
+        job.state = state
+        job.finished = time.time()
+
+    def _receive(self, worker: _Worker) -> None:
+        job = worker.job
+        try:
+            while not job.is_finished and worker.conn.poll():
+                message = worker.conn.recv()
+                if message[0] == "progress":
+                    job.progress = message[1]
+                elif message[0] == "result":
+                    job.result = message[1]
+                    self._finish(job, DONE)
+                else:
+                    job.error = message[1]
+                    self._finish(job, FAILED)
+        except (EOFError, OSError):
+            # the worker died; the dispatcher starts a new one when jobs are waiting for it
+            worker.process.join()
+            job.error = f"Worker process exited with code {worker.process.exitcode}"
+            self._finish(job, FAILED)
+            self._workers.remove(worker)
+            return
+        if job.is_finished:
+            worker.job = None
@@ -0,0 +1,75 @@
+import numpy as np
+
+# weight of the sum term of the augmented Chebyshev scalarization, as in ParEGO
+RHO = 0.05
+
+
+def to_minimization(Y: np.ndarray, minimize: list) -> np.ndarray:
+    """
+    Return the outputs in minimization form, i.e. with the outputs that are maximized negated.
+
+    :param Y: ndarray
+        Output values, one column per target.
+    :param minimize: list
+        For each target, True if it is minimized, False if it is maximized.
+
+    :return: ndarray
+    """
+    return Y * np.where(minimize, 1.0, -1.0)
+
+
+def scalarize(Y: np.ndarray, minimize: list, weights: list, ranges: np.ndarray | None = None) -> np.ndarray:
+    """
+    Combine several targets into one objective to minimize with the augmented Chebyshev scalarization of ParEGO.
+    Each target is scaled by its range, so that the range maps to [0, 1], then the objective is the largest weighted
+    target plus RHO times the sum of the weighted targets. Unlike a weighted sum, it can reach optima on non-convex
+    parts of the Pareto front.
+
+    :param Y: ndarray
+        Output values, one column per target, without missing values.
+    :param minimize: list
+        For each target, True if it is minimized, False if it is maximized.
+    :param weights: list
+        Non-negative weight of each target; they are normalized to sum to one.
+    :param ranges: ndarray or None
+        Lower and upper reference value of each target, shape (num_targets, 2). Fixed ranges keep the objective
+        of a row the same when rows are added. If None, the range of the values in Y is used.
+
+    :return:
+    objective: ndarray
+        The scalarized objective, shape (n, 1).
+    """
+    Y = np.asarray(Y, dtype=float)
+    if ranges is None:
+        ranges = np.stack([Y.min(axis=0), Y.max(axis=0)], axis=1)
+    ranges = np.asarray(ranges, dtype=float)
+    F = to_minimization(Y, minimize)
+    # in minimization form, the upper reference value of a maximized target becomes the lower one
+    lo = np.where(minimize, ranges[:, 0], -ranges[:, 1])
+    width = ranges[:, 1] - ranges[:, 0]
+    F = (F - lo) / np.where(width > 0, width, 1.0)
+    w = np.asarray(weights, dtype=float)
+    w = w / w.sum() if w.sum() > 0 else np.full(len(w), 1.0 / len(w))
+    return ((F * w).max(axis=1) + RHO * (F * w).sum(axis=1))[:, None]
+
+
+def pareto_mask(Y: np.ndarray, minimize: list) -> np.ndarray:
+    """
+    Return which rows are Pareto optimal, i.e. not dominated by any other row.
+
+    :param Y: ndarray
+        Output values, one column per target, without missing values.
+    :param minimize: list
+        For each target, True if it is minimized, False if it is maximized.
+
+    :return:
+    mask: ndarray
+        Boolean array, True for the Pareto-optimal rows.
+    """
+    F = to_minimization(np.asarray(Y, dtype=float), minimize)
+    mask = np.ones(F.shape[0], dtype=bool)
+    for i in range(F.shape[0]):
+        if mask[i]:
+            dominated = np.all(F[i] <= F, axis=1) & np.any(F[i] < F, axis=1)
+            mask[dominated] = False
+    return mask
@@ -0,0 +1,102 @@
+import importlib
+import json
+import math
+import numpy as np
+import shlex
+import subprocess
+import urllib.request
+
+# kinds of objectives and the form of their spec, e.g. for help texts
+OBJECTIVE_KINDS = {
+    "python": "python:package.module.function, called with the input values as a 1D array",
+    "command": "command:program --option, run with the input values appended as arguments",
+    "http": "http://host:port/path, which receives the input values as a JSON POST request",
+}
+
+
+def parse_objective(spec: str) -> (str, str):
+    """
+    Split the spec of an objective into its kind and target.
+
+    :param spec: str
+        "python:<dotted path of a function>", "command:<command line>" or an http(s) URL.
+
+    :return:
+    kind, target: (str, str)
+        One of OBJECTIVE_KINDS, and the function path, command line or URL.
+    """
+    spec = spec.strip()
+    if spec.startswith(("http://", "https://")):
+        return "http", spec
+    kind, _, target = spec.partition(":")
+    target = target.strip()
+    if kind == "python" and "." in target:
+        return kind, target
+    if kind == "command" and shlex.split(target):
+        return kind, target
+    raise ValueError(f"Invalid objective '{spec}'. Use one of: {'; '.join(OBJECTIVE_KINDS.values())}.")
+
+
+def _to_outputs(value, num_outputs: int) -> list[float]:
+    """
+    Convert the value returned by an objective to a list of num_outputs finite floats.
+    """
+    if isinstance(value, dict):
+        value = value.get("y")
+    values = [float(v) for v in (value if isinstance(value, (list, tuple)) else [value])] if value is not None else []
+    if len(values) != num_outputs:
+        raise ValueError(f"The objective returned {len(values)} values instead of {num_outputs}.")
+    if not all(math.isfinite(v) for v in values):
+        raise ValueError(f"The objective returned non-finite values: {values}")
+    return values
+
+
+def evaluate_objective(spec: str, x: list, X_names: list, num_outputs: int = 1, timeout: float | None = None) -> list:
+    """
+    Evaluate the objective at one point. Meant to run in a job process of a JobQueue, so several points
+    can be evaluated at the same time.
+
+    A Python function gets the input values as a 1D array and returns a number or a sequence of numbers.
+    A command gets the input values as extra arguments and prints the output values, separated by
+    white space or commas. An HTTP endpoint gets {"x": [...], "names": [...]} and answers with a number,
+    a list of numbers or {"y": ...}.
+
+    :param spec: str
+        Objective, see parse_objective.
+    :param x: list
+        Input values, in the order of X_names.
+    :param X_names: list
+        Names of the input variables.
+    :param num_outputs: int
+        Number of output values the objective has to return.
+    :param timeout: float or None
+        Seconds to wait for a command or HTTP request, None to wait forever.
+
+    :return:
+    y: list
+        The output values.
+    """
+    kind, target = parse_objective(spec)
+    if kind == "python":
+        module_name, _, name = target.rpartition(".")
+        fn = getattr(importlib.import_module(module_name), name)
+        value = np.ravel(fn(np.asarray(x, dtype=float))).tolist()
+    elif kind == "command":
+        proc = subprocess.run(
+            shlex.split(target) + [repr(float(v)) for v in x],
+            capture_output=True,
+            text=True,
+            timeout=timeout,
+        )
+        if proc.returncode != 0:
+            raise RuntimeError(f"The command exited with code {proc.returncode}: {proc.stderr.strip()[-500:]}")
+        value = proc.stdout.replace(",", " ").split()
+    else:
+        request = urllib.request.Request(
+            target,
+            data=json.dumps({"x": [float(v) for v in x], "names": list(X_names)}).encode(),
+            headers={"Content-Type": "application/json"},
+        )
+        with urllib.request.urlopen(request, timeout=timeout) as response:
+            value = json.loads(response.read())
+    return _to_outputs(value, num_outputs)
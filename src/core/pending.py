@@ -0,0 +1,29 @@
+import copy
+import numpy as np
+from boss.bo.acq.manager import BaseAcquisitionManager
+from core.gp_update import append_observations
+
+
+def acquire_with_pending(acq_manager: BaseAcquisitionManager, X_pending: np.ndarray) -> np.ndarray:
+    """
+    Get the next acquisition(s) while experiments at X_pending are still running.
+    The pending points are added to a temporary copy of the model with their predicted mean as
+    observation (Kriging Believer), so that the acquisition function is not drawn towards them again.
+    The hyperparameters of the model are kept fixed.
+
+    :param acq_manager: BaseAcquisitionManager
+        Acquisition manager of a fitted BOMain object.
+    :param X_pending: ndarray
+        Input points of the pending evaluations, one per row.
+
+    :return:
+    X_next: ndarray
+        The next acquisitions, one per row.
+    """
+    X_pending = np.atleast_2d(X_pending)
+    manager = copy.deepcopy(acq_manager)
+    if X_pending.shape[0] > 0:
+        model = manager.acqfn.model
+        Y_pending = model.predict(X_pending)[0]
+        append_observations(model, X_pending, Y_pending)
+    return manager.acquire()
@@ -0,0 +1,181 @@
+import io
+import numpy as np
+from boss.bo.results import BOResults
+from core.jobs import report_progress
+from core.results_io import restore_results
+from matplotlib.figure import Figure
+
+
+def slice_axes(pp_slice: list, dim: int) -> (int, int, int):
+    """
+    Return the 0-based indices of the variables on the axes of a model slice and the number of points per axis.
+
+    :param pp_slice: list
+        Cross-section [x axis, y axis, points per axis], with 1-based variable indices as in BOSS post-processing.
+        The slice is 1D if both axes are the same variable or the model has only one variable.
+    :param dim: int
+        Number of input variables.
+
+    :return:
+    i, j, num_pts: (int, int, int)
+    """
+    i = int(pp_slice[0]) - 1
+    j = int(pp_slice[1]) - 1 if dim > 1 else i
+    return i, j, int(pp_slice[2])
+
+
+def slice_points(bounds: np.ndarray, pp_slice: list, x_fixed: np.ndarray) -> np.ndarray:
+    """
+    Return a grid of points on a 1D or 2D cross-section of the domain. The variables that are not on
+    the axes of the slice are fixed to their values in x_fixed.
+
+    :param bounds: ndarray
+        Bounds of the input variables.
+    :param pp_slice: list
+        Cross-section, see slice_axes.
+    :param x_fixed: ndarray
+        Values of all variables, e.g. the location of the global minimum.
+
+    :return:
+    X: ndarray
+        The grid points, one per row. For a 2D slice, the first axis varies fastest.
+    """
+    i, j, num_pts = slice_axes(pp_slice, bounds.shape[0])
+    x_i = np.linspace(bounds[i, 0], bounds[i, 1], num_pts)
+    if i == j:
+        X = np.tile(x_fixed, (num_pts, 1))
+        X[:, i] = x_i
+        return X
+    x_j = np.linspace(bounds[j, 0], bounds[j, 1], num_pts)
+    X = np.tile(x_fixed, (num_pts * num_pts, 1))
+    grid_i, grid_j = np.meshgrid(x_i, x_j)
+    X[:, i] = grid_i.ravel()
+    X[:, j] = grid_j.ravel()
+    return X
+
+
+def predict_slice(
+        model,
+        bounds: np.ndarray,
+        pp_slice: list,
+        x_fixed: np.ndarray,
+) -> (np.ndarray, np.ndarray, np.ndarray):
+    """
+    Predict the model mean and uncertainty on a cross-section of the domain, in one batched call.
+
+    :param model:
+        BOSS model, e.g. from results.reconstruct_model.
+    :param bounds: ndarray
+        Bounds of the input variables.
+    :param pp_slice: list
+        Cross-section, see slice_axes.
+    :param x_fixed: ndarray
+        Values of the variables that are not on the axes of the slice.
+
+    :return:
+    X, mu, nu: (ndarray, ndarray, ndarray)
+        The grid points, one per row, and the predicted mean and standard deviation at each of them.
+    """
+    X = slice_points(bounds, pp_slice, x_fixed)
+    mu, var = model.predict(X)
+    return X, mu.ravel(), np.sqrt(np.clip(var, 0, None)).ravel()
+
+
+def _to_png(fig: Figure) -> bytes:
+    buf = io.BytesIO()
+    fig.savefig(buf, format="png", dpi=100, bbox_inches="tight")
+    return buf.getvalue()
+
+
+def render_model_plots(
+        results: BOResults,
+        itr: int,
+        pp_slice: list,
+        x_names: list,
+        y_name: str = "y",
+) -> (bytes, bytes):
+    """
+    Plot a cross-section of the model mean and of its uncertainty at an iteration, like BOSS post-processing,
+    but in memory instead of to files. Variables that are not on the slice are fixed to the global minimum.
+
+    :param results: BOResults
+        Results of the run.
+    :param itr: int
+        Iteration to plot.
+    :param pp_slice: list
+        Cross-section, see slice_axes.
+    :param x_names: list
+        Names of the input variables.
+    :param y_name: str
+        Name of the output variable.
+
+    :return:
+    model_png, uncert_png: (bytes, bytes)
+        PNG images of the model mean and of the model uncertainty.
+    """
+    model = results.reconstruct_model(itr)
+    bounds = np.asarray(results.settings["bounds"], dtype=float)
+    x_glmin = results.select("x_glmin", itr)
+    x_fixed = np.asarray(x_glmin if x_glmin is not None else bounds.mean(axis=1), dtype=float).ravel()
+    x_next = results.get_next_acq(itr)
+    i, j, num_pts = slice_axes(pp_slice, bounds.shape[0])
+
+    X, mu, nu = predict_slice(model, bounds, pp_slice, x_fixed)
+    X_data = model.X
+
+    figs = []
+    for values, label in ((mu, f"{y_name} (mean)"), (nu, f"{y_name} (uncertainty)")):
+        fig = Figure(figsize=(5, 4))
+        ax = fig.add_subplot()
+        if i == j:
+            ax.plot(X[:, i], values, color="tab:blue")
+            if values is mu:
+                ax.fill_between(X[:, i], mu - nu, mu + nu, color="tab:blue", alpha=0.2)
+                ax.scatter(X_data[:, i], model.Y.ravel(), color="k", s=12, label="data")
+            ax.set_ylabel(label)
+            ax.axvline(x_fixed[i], color="tab:red", linestyle="--", label="global min")
+            if x_next is not None:
+                for x in np.atleast_2d(x_next):
+                    ax.axvline(x[i], color="tab:green", linestyle=":")
+        else:
+            shape = (num_pts, num_pts)
+            cs = ax.contourf(X[:, i].reshape(shape), X[:, j].reshape(shape), values.reshape(shape), levels=25)
+            fig.colorbar(cs, ax=ax, label=label)
+            ax.scatter(X_data[:, i], X_data[:, j], color="k", s=12, label="data")
+            ax.scatter(x_fixed[i], x_fixed[j], color="tab:red", marker="*", s=120, label="global min")
+            if x_next is not None:
+                x_next = np.atleast_2d(x_next)
+                ax.scatter(x_next[:, i], x_next[:, j], color="tab:green", marker="x", s=60, label="next")
+            ax.set_ylabel(x_names[j])
+        ax.set_xlabel(x_names[i])
+        ax.set_title(f"Iteration {itr}, {X_data.shape[0]} data points")
+        ax.legend(loc="best", fontsize="small")
+        figs.append(_to_png(fig))
+    return figs[0], figs[1]
+
+
+def render_job(snapshot: dict, itrs: list, pp_slice: list, x_names: list, y_name: str = "y") -> dict:
+    """
+    Render the model plots of several iterations in a job process of a JobQueue.
+
+    :param snapshot: dict
+        Snapshot of the results, see core.results_io.
+    :param itrs: list
+        Iterations to plot.
+    :param pp_slice: list
+        Cross-section, see slice_axes.
+    :param x_names: list
+        Names of the input variables.
+    :param y_name: str
+        Name of the output variable.
+
+    :return:
+    plots: dict
+        Iteration -> (model_png, uncert_png), see render_model_plots.
+    """
+    results = restore_results(snapshot)
+    plots = {}
+    for n, itr in enumerate(itrs):
+        report_progress(f"Plotting iteration {itr} ({n + 1} of {len(itrs)})")
+        plots[itr] = render_model_plots(results, itr, pp_slice, x_names, y_name)
+    return plots
@@ -0,0 +1,80 @@
+import numpy as np
+import pandas as pd
+from core.data_io import iter_table_chunks
+from core.jobs import report_progress
+from core.results_io import restore_results
+
+
+def predict_file(
+        model,
+        in_path: str,
+        columns: list,
+        out_path: str,
+        y_name: str = "y",
+        minimize: bool = True,
+        chunk_size: int = 65536,
+) -> int:
+    """
+    Predict the model mean and variance at every row of a CSV, Parquet or Arrow file and write them to a CSV file.
+    The input is read and the output written chunk by chunk, so files of any size fit in memory.
+
+    :param model:
+        BOSS model, e.g. from results.reconstruct_model.
+    :param in_path: str
+        Path of the file with the points, one per row.
+    :param columns: list
+        Names of the input variables, in the order of the model.
+    :param out_path: str
+        Path of the CSV file to write, with the input variables and the predicted mean and variance.
+    :param y_name: str
+        Name of the output variable.
+    :param minimize: bool
+        False if the output was maximized, so the model was fitted to the negated output.
+    :param chunk_size: int
+        Number of points predicted at a time.
+
+    :return:
+    num_rows: int
+        Number of points predicted.
+    """
+    sign = 1.0 if minimize else -1.0
+    num_rows = 0
+    with open(out_path, "w", newline="") as f:
+        for X in iter_table_chunks(in_path, columns, chunk_size):
+            mu, var = model.predict(X)
+            chunk = pd.DataFrame(X, columns=columns)
+            chunk[f"{y_name} mean"] = sign * mu.ravel()
+            chunk[f"{y_name} variance"] = np.clip(var.ravel(), 0, None)
+            chunk.to_csv(f, header=num_rows == 0, index=False)
+            num_rows += X.shape[0]
+            report_progress(f"Predicted {num_rows} points")
+        if num_rows == 0:
+            pd.DataFrame(columns=list(columns) + [f"{y_name} mean", f"{y_name} variance"]).to_csv(f, index=False)
+    return num_rows
+
+
+def predict_job(snapshot: dict, in_path: str, columns: list, out_path: str, y_name: str, minimize: bool) -> int:
+    """
+    Predict at the points of a file with the model of the latest iteration, in a job process of a JobQueue.
+
+    :param snapshot: dict
+        Snapshot of the results, see core.results_io.
+    :param in_path: str
+        Path of the file with the points, see predict_file.
+    :param columns: list
+        Names of the input variables.
+    :param out_path: str
+        Path of the CSV file to write.
+    :param y_name: str
+        Name of the output variable.
+    :param minimize: bool
+        False if the output was maximized.
+
+    :return:
+    num_rows: int
+        Number of points predicted.
+    """
+    report_progress("Rebuilding the model")
+    results = restore_results(snapshot)
+    model = results.reconstruct_model(results.num_iters - 1)
+    return predict_file(model, in_path, columns, out_path, y_name, minimize)
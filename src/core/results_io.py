@@ -0,0 +1,58 @@
+import numpy as np
+from boss.bo.results import BatchTracker, BOResults
+from boss.settings import Settings
+from boss.utils.sparselist import SparseList
+
+
+def dummy_func(_):
+    pass
+
+
+def snapshot_results(results: BOResults) -> dict:
+    """
+    Return the content of BOSS results as a dictionary of plain Python and numpy objects.
+    GPy models cannot be unpickled reliably, so the snapshot keeps no model objects: models are
+    reconstructed from the data and the stored hyperparameters when needed.
+
+    :param results: BOResults
+        Results returned by BOMain.run.
+
+    :return:
+    snapshot: dict
+        Picklable snapshot of the results.
+    """
+    data = {}
+    for name, val in results.data.items():
+        if isinstance(val, SparseList):
+            data[name] = ("sparse", dict(val.items()), val.default)
+        elif val is None:
+            data[name] = ("value", None, None)
+        else:
+            data[name] = ("value", np.array(val), None)
+    return {
+        "keywords": dict(results.settings.data),
+        "data": data,
+        "extendable_names": list(results.extendable_names),
+        "ind_lims": list(results.batch_tracker._ind_lims),
+        "num_init_batches": results.batch_tracker.num_init_batches,
+    }
+
+
+def restore_results(snapshot: dict) -> BOResults:
+    """
+    Rebuild BOSS results from a snapshot made with snapshot_results.
+
+    :param snapshot: dict
+        Snapshot of the results.
+
+    :return:
+    results: BOResults
+        Results that can be used like the ones returned by BOMain.run.
+    """
+    results = BOResults(settings=Settings(dict(snapshot["keywords"]), f=dummy_func))
+    for name, (kind, val, default) in snapshot["data"].items():
+        results.data[name] = SparseList(val, default=default) if kind == "sparse" else val
+    results.extendable_names = list(snapshot["extendable_names"])
+    results.batch_tracker = BatchTracker(num_init_batches=snapshot["num_init_batches"])
+    results.batch_tracker._ind_lims = list(snapshot["ind_lims"])
+    return results
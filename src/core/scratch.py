@@ -0,0 +1,109 @@
+import os
+import shutil
+import tempfile
+import threading
+import time
+
+
+class ScratchSpace:
+    """
+    Scratch directories for files that BOSS writes, e.g. boss.out and boss.rst, one per session,
+    so that concurrent sessions never write to the same files.
+    Directories that have not been used for ttl seconds are removed, and if all directories together
+    take more than max_bytes, the least recently used ones are removed as well.
+    Directories of active sessions, which requested their directory less than lease seconds ago, are never
+    removed, as they may hold files that are still in use, e.g. a candidate pool or a running prediction.
+    The garbage collection runs at most every gc_interval seconds, when a directory is requested.
+    """
+
+    def __init__(
+            self,
+            root: str | None = None,
+            ttl: float = 24 * 3600,
+            max_bytes: int = 2**30,
+            gc_interval: float = 60,
+            lease: float = 3600,
+    ):
+        self.root = root or os.path.join(tempfile.gettempdir(), "boss-web")
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        self.gc_interval = gc_interval
+        self.lease = lease
+        self._last_gc = 0.0
+        self._leases = {}  # session id -> time its directory was last requested
+        self._lock = threading.Lock()
+        os.makedirs(self.root, exist_ok=True)
+
+    def session_dir(self, session_id: str) -> str:
+        """
+        Return the scratch directory of a session and mark it as used. The directory is created if needed.
+
+        :param session_id: str
+            Id of the session, used as the name of the directory.
+
+        :return:
+        path: str
+            Path of the directory.
+        """
+        path = os.path.join(self.root, session_id)
+        with self._lock:
+            self._leases[session_id] = time.time()
+            os.makedirs(path, exist_ok=True)
+            os.utime(path)
+        if time.time() - self._last_gc > self.gc_interval:
+            self.collect_garbage(keep=session_id)
+        return path
+
+    def renew(self, session_id: str) -> None:
+        """
+        Mark the directory of a session as used, e.g. while a background job of the session writes to it.
+
+        :param session_id: str
+            Id of the session.
+        """
+        with self._lock:
+            self._leases[session_id] = time.time()
+
+    def collect_garbage(self, keep: str | None = None) -> list[str]:
+        """
+        Remove expired directories, then the least recently used ones until the quota is met.
+        The directories of active sessions are kept, even if they exceed the quota.
+
+        :param keep: str or None
+            Id of another session whose directory is not removed, e.g. the one that is being requested.
+
+        :return:
+        removed: list[str]
+            Ids of the sessions whose directories were removed.
+        """
+        with self._lock:
+            self._last_gc = time.time()
+            self._leases = {name: t for name, t in self._leases.items() if self._last_gc - t <= self.lease}
+            active = set(self._leases) | ({keep} if keep is not None else set())
+            dirs = []
+            total = 0
+            for entry in os.scandir(self.root):
+                if entry.is_dir():
+                    size = _dir_size(entry.path)
+                    total += size
+                    if entry.name not in active:
+                        dirs.append((entry.stat().st_mtime, size, entry.name))
+            removed = []
+            for mtime, size, name in sorted(dirs):
+                if self._last_gc - mtime <= self.ttl and total <= self.max_bytes:
+                    break
+                shutil.rmtree(os.path.join(self.root, name), ignore_errors=True)
+                total -= size
+                removed.append(name)
+            return removed
+
+
+def _dir_size(path: str) -> int:
+    size = 0
+    for root, _, files in os.walk(path):
+        for name in files:
+            try:
+                size += os.path.getsize(os.path.join(root, name))
+            except OSError:
+                pass
+    return size
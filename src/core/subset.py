@@ -0,0 +1,54 @@
+import numpy as np
+
+
+def select_subset(
+        X: np.ndarray,
+        Y: np.ndarray,
+        bounds: np.ndarray,
+        max_rows: int,
+        local_fraction: float = 0.5,
+        seed: int = 0,
+) -> (np.ndarray, np.ndarray, int):
+    """
+    Select the rows to fit when there are too many for an exact GP, and a trust region to acquire in.
+    Part of the rows are the ones nearest to the best observation, the rest are sampled at random from the
+    other rows, so the model stays accurate around the best observation and still knows the rest of the domain.
+    The trust region is the box around the nearest rows, widened by 5% of the range of each variable on
+    either side and clipped to the bounds.
+
+    :param X: ndarray
+        X values.
+    :param Y: ndarray
+        Y values in minimization form.
+    :param bounds: ndarray
+        Bounds of the input variables.
+    :param max_rows: int
+        Number of rows to select.
+    :param local_fraction: float
+        Fraction of the selected rows that are nearest to the best observation.
+    :param seed: int
+        Seed of the random sample, so the same data always gives the same subset.
+
+    :return:
+    idx, tr_bounds, num_local: (ndarray, ndarray, int)
+        Sorted indices of the selected rows, bounds of the trust region, and number of rows nearest to the best
+        observation.
+    """
+    bounds = np.asarray(bounds, dtype=float)
+    width = bounds[:, 1] - bounds[:, 0]
+    num_rows = X.shape[0]
+    if num_rows <= max_rows:
+        return np.arange(num_rows), bounds.copy(), num_rows
+
+    best = np.argmin(Y.ravel())
+    distance = np.linalg.norm((X - X[best]) / width, axis=1)
+    num_local = max(1, int(max_rows * local_fraction))
+    local = np.argpartition(distance, num_local - 1)[:num_local]
+    rest = np.setdiff1d(np.arange(num_rows), local)
+    sample = np.random.default_rng(seed).choice(rest, size=max_rows - num_local, replace=False)
+    idx = np.sort(np.concatenate((local, sample)))
+
+    X_local = X[local]
+    tr_bounds = np.column_stack((X_local.min(axis=0) - 0.05 * width, X_local.max(axis=0) + 0.05 * width))
+    tr_bounds = np.clip(tr_bounds, bounds[:, :1], bounds[:, 1:])
+    return idx, tr_bounds, num_local
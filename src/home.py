@@ -1,5 +1,6 @@
 import streamlit as st
 from ui.page_config import PageConfig, customize_footer
+from ui.resources import get_job_queue
 
 page_config = PageConfig(
     main_title="BOSS web app",
@@ -8,6 +9,8 @@ page_config = PageConfig(
     icon="🏠",
 )
 page_config.set_page()
+# start the worker processes while the user is still reading this page
+get_job_queue()
 st.info("Start using the web app by choosing ‘run’ from the left side bar.")
 header_img = "doc/img/boss_main_page.png"
 st.image(header_img)
@@ -1,11 +1,13 @@
 import numpy as np
+import os
 import streamlit as st
-from boss.pp.pp_main import PPMain
+from core.jobs import JobQueue
 from tabs.init_manager import InitPointsSetUp
 from tabs.postprocessing_tab import PostprocessingTab
 from tabs.run_boss import RunBOSS
 from tabs.setup import SetUp
 from ui.page_config import PageConfig, customize_footer
+from ui.resources import get_fit_cache, get_job_queue, get_objective_queue, get_plot_cache, get_scratch_space
 
 # Set page layout and settings
 config = PageConfig(
@@ -16,6 +18,8 @@ config = PageConfig(
 )
 config.set_page()
 config.init_states()
+# tells fragments whether they run as part of the whole page or on their own
+st.session_state["full_run"] = True
 customize_footer()
 setup = SetUp()
 
@@ -25,16 +29,100 @@ if st.session_state["bo_run"] is None:
 
 # Initialize a session state for RunHelper if there isn't one
 bo_run: RunBOSS = st.session_state["bo_run"]
+bo_run.fit_cache = get_fit_cache()
+# keep the output files of BOSS apart from other sessions
+bo_run.out_dir = get_scratch_space().session_dir(bo_run.run_id)
+job_queue = get_job_queue()
+# auto-run evaluates objectives on the server, e.g. runs commands, so it has to be enabled by whoever runs it
+AUTO_RUN = os.environ.get("BOSS_WEB_AUTO_RUN") == "1"
 
-if st.button("Restart", help="Clear all data of the current run and start over.", type="primary"):
-    setup.clear_data()
 
-# Define tabs
-setup_tab, run_tab, postprocess_tab = st.tabs(
-    ["Set up BOSS", "Run BOSS", "Post-processing"]
-)
+@st.fragment(run_every=1)
+def show_run_progress(bo_run: RunBOSS, job_queue: JobQueue) -> None:
+    """
+    Display the state of the background fits, and redraw the page with the results once they are done.
+    Only this fragment is rerun while polling, so the rest of the page stays usable.
+    """
+    # the fits write to the scratch directory, which must not expire while the page only reruns this fragment
+    get_scratch_space().renew(bo_run.run_id)
+    progress = bo_run.poll_run(job_queue)
+    if progress is not None:
+        st.info(progress)
+        if st.button("Cancel", help="Stop the fit. The data and the previous results are kept."):
+            bo_run.cancel_run(job_queue)
+            st.rerun()
+    else:
+        if bo_run.run_error is None:
+            bo_run.concat_next_acq()
+        # redraw the whole page so the results and the next acquisitions are visible
+        st.rerun(scope="app")
+
+
+@st.fragment(run_every=1)
+def show_predict_progress(bo_run: RunBOSS, job_queue: JobQueue) -> None:
+    """
+    Display the progress of the prediction job, and redraw the page with the download button once it is done.
+    """
+    get_scratch_space().renew(bo_run.run_id)
+    job = bo_run.poll_predictions(job_queue)
+    if not job.is_finished:
+        st.info(f"{job.progress or 'Waiting for a free worker'}... ({job.elapsed:.0f} s)")
+        if st.button("Cancel prediction"):
+            job_queue.cancel(bo_run.predict_job_id)
+            bo_run.poll_predictions(job_queue)
+            st.rerun()
+    else:
+        st.rerun(scope="app")
+
 
-with setup_tab:
+@st.fragment(run_every=1)
+def show_render_progress(pp: PostprocessingTab, job_queue: JobQueue) -> None:
+    """
+    Display the progress of the jobs that plot all iterations, and redraw the page once they are done.
+    """
+    jobs = st.session_state["render_jobs"]
+    error = pp.collect_rendered(jobs, job_queue)
+    if error is not None:
+        st.session_state["render_error"] = error
+    if jobs:
+        total = st.session_state["render_total"]
+        num_left = sum(len(keys) for keys in jobs.values())
+        st.progress((total - num_left) / total, text=f"Plotting {total} iterations...")
+        if st.button("Cancel plotting"):
+            pp.cancel_rendering(jobs, job_queue)
+            st.rerun(scope="app")
+    else:
+        st.rerun(scope="app")
+
+
+def setup_inputs(bo_run: RunBOSS) -> tuple:
+    """
+    Return the state set in the setup tab that the other tabs depend on. The content of the data is not compared,
+    as it only changes with a new upload, or with edits of created points, which add_metadata counts in
+    dload_version.
+    """
+    data = bo_run.data
+    return (
+        None if data is None else (data.shape, tuple(data.columns)),
+        None if setup.file is None else setup.file.file_id,
+        bo_run.dload_version,
+        tuple(bo_run.X_names),
+        tuple(bo_run.Y_names or ()),
+        None if bo_run.bounds is None else np.asarray(bo_run.bounds, dtype=float).tobytes(),
+        bo_run.noise,
+        bo_run.min,
+        bo_run.num_init,
+        bo_run.kernel,
+    )
+
+
+@st.fragment
+def setup_section() -> None:
+    """
+    Tab to set up the data and parameters. Widgets in this tab only rerun the tab, unless they change
+    the data or parameters, which are shown in the other tabs as well.
+    """
+    inputs = setup_inputs(bo_run)
     st.write("#### Set up input data and parameters for BOSS here.")
     col1, col2 = st.columns([2, 1])
     with col1:
@@ -113,52 +201,119 @@ with setup_tab:
                 bo_run.input_X_bounds(bo_run.bounds)
                 bo_run.set_opt_params()
 
-with run_tab:
+    if not st.session_state["full_run"] and setup_inputs(bo_run) != inputs:
+        st.rerun(scope="app")
+
+
+@st.fragment
+def run_section() -> None:
+    """
+    Tab to edit the data and run BOSS. Editing the data only reruns this tab; running BOSS reruns the whole page.
+    """
     st.write("#### Run BOSS iterations here.")
     # BO has been run: disable input widgets and only display results
     if bo_run.has_run:
         bo_run.display_result()
         bo_run.display_next_acq()
+        bo_run.display_kernel_comparison()
 
     # TODO: check if this needs to be refactored because there's new data format
     # Display an editable dataframe for existing data
-    if len(bo_run.X_names) > 0 and len(bo_run.Y_names) == 1 and bo_run.data is not None:
+    if len(bo_run.X_names) > 0 and len(bo_run.Y_names) >= 1 and bo_run.data is not None:
         bo_run.data = st.data_editor(bo_run.data, key="edit_data")
         bo_run.add_metadata()
         bo_run.download_data(widget_key="run_tab")
 
+    bo_run.set_run_options()
+    if len(bo_run.X_names) > 0:
+        bo_run.upload_candidates()
+
     # TODO: if possible, clean up the if conditions
     # Regardless of whether BO has been run, we want to display the run button.
-    if st.button("Run BO iteration", type="primary"):
+    if st.button("Run BO iteration", type="primary", disabled=bo_run.is_running):
         if bo_run.verify_bounds(bo_run.bounds) and bo_run.verify_data():
             try:
-                bo_run.run_boss()
-                bo_run.has_run = True
-                bo_run.concat_next_acq()
+                # with several outputs, each one is fitted alone at the same time as the combined objective
+                bo_run.submit_target_fits(job_queue)
+                if bo_run.auto_kernel:
+                    bo_run.submit_auto_kernel(job_queue)
+                elif bo_run.run_in_background:
+                    bo_run.submit_run(job_queue)
+                else:
+                    bo_run.run_boss()
+                # if fits are still running, show_run_progress collects them and adds the next acquisitions
+                if not bo_run.is_running and bo_run.run_error is None:
+                    bo_run.has_run = True
+                    bo_run.concat_next_acq()
                 # call rerun to redraw everything so next acq is visible in data_editor
                 st.rerun()
             except TypeError:
                 st.error("Please make sure that all data points are of valid format. "
                          "Fill in the empty cells or download the data if you want to continue later.")
+    if bo_run.is_running:
+        show_run_progress(bo_run, job_queue)
+    if bo_run.run_error is not None:
+        st.error(f"The fit failed: {bo_run.run_error}")
+    if AUTO_RUN and len(bo_run.X_names) > 0 and len(bo_run.Y_names) >= 1 and bo_run.data is not None:
+        with st.expander("Auto-run with an objective"):
+            auto_run_section()
+    if bo_run.has_run:
+        with st.expander("Predict at given points"):
+            bo_run.predict_points(job_queue)
+            if bo_run.predict_job_id is not None:
+                show_predict_progress(bo_run, job_queue)
+
+
+def auto_run_section() -> None:
+    """
+    Run iterations with an objective that is evaluated on the server, showing each new row as it is added.
+    The evaluations run in their own queue, so the workers of the shared job queue stay free for other sessions.
+    """
+    objective_queue = get_objective_queue()
+    bo_run.set_auto_run_options(objective_queue.max_workers)
+    if st.button("Start auto-run", disabled=bo_run.is_running or not bo_run.objective):
+        if bo_run.verify_bounds(bo_run.bounds) and bo_run.verify_data():
+            progress = st.progress(0.0, text="Starting")
+            table = st.empty()
+
+            def show_row(num_done: int) -> None:
+                progress.progress(
+                    num_done / bo_run.auto_iters, text=f"Evaluated {num_done} of {bo_run.auto_iters} points"
+                )
+                table.dataframe(bo_run.data.tail(10))
+
+            try:
+                bo_run.auto_run(objective_queue, on_row=show_row)
+            except ValueError as err:
+                st.error(str(err))
+            else:
+                # redraw the whole page with the new data and results
+                st.rerun(scope="app")
+    if bo_run.auto_run_error is not None:
+        st.error(f"The auto-run stopped: {bo_run.auto_run_error}")
 
-with postprocess_tab:
+
+@st.fragment
+def postprocess_section() -> None:
+    """
+    Tab to plot the results. Its widgets only rerun this tab, as the other tabs do not depend on them.
+    """
     st.write("#### Plot the results of the optimization.")
     if bo_run.results is not None:
         bo_run.display_result()
-        pp = PostprocessingTab(bo_run.results, bo_run.X_names)
+        pp = PostprocessingTab(
+            bo_run.results,
+            bo_run.X_names,
+            bo_run.results_id,
+            bo_run.lineage_id,
+            get_plot_cache(),
+            y_name=bo_run.objective_name,
+        )
         pp_slice = pp.plot_acqfn_or_slice()
-        if st.button("Run post-processing", type="primary"):
-            post = PPMain(
-                bo_run.results,
-                pp_models=True,
-                pp_model_slice=pp_slice,
-            )
-            post.run()
-
-        # Load images of models and uncertainty
-        pp.load_plots()
-
-        if len(pp.model_plots) > 1:
+        # the number of iterations may have decreased if the data was edited and refitted
+        st.session_state.cur_iter = min(st.session_state.cur_iter, pp.num_plots - 1)
+
+        if pp.num_plots > 1:
             col1, col2, col3 = st.columns([1, 2, 1], gap="large")
             with col1:
                 if st.button("Previous"):
@@ -167,28 +322,76 @@ with postprocess_tab:
                 if st.button("Next"):
                     pp.next_image()
 
-        img1, img2 = st.columns(2)
-        # Display one model plot on the left and one uncertainty plot on the right
-        with img1:
-            st.image(pp.model_plots[st.session_state.cur_iter], width=500)
-        with img2:
-            st.write("")  # temp fix: add a blank line to align 2 plots horizontally
-            st.image(pp.uncert_plots[st.session_state.cur_iter], width=500)
+        interactive = st.toggle(
+            "Interactive plots",
+            value=True,
+            help="Zoom, pan and hover over the model, and choose the values of the variables off the slice. "
+                 "Switch off for static images.",
+        )
+        if interactive:
+            x_fixed = pp.input_fixed_values(st.session_state.cur_iter, pp_slice)
+            pp.plot_interactive(st.session_state.cur_iter, pp_slice, x_fixed)
+        else:
+            # Only the plots of the current iteration are rendered, and each one only once per lineage
+            render_jobs = st.session_state["render_jobs"]
+            if len(pp.missing_iters(pp_slice)) > 1 and st.button(
+                "Plot all iterations",
+                help="Render the plots of all iterations that have not been plotted yet, in parallel, "
+                     "so that browsing through them is instant.",
+                disabled=bool(render_jobs),
+            ):
+                render_jobs.update(pp.submit_missing(pp_slice, job_queue))
+                st.session_state["render_total"] = sum(len(keys) for keys in render_jobs.values())
+                st.session_state["render_error"] = None
+            if render_jobs:
+                show_render_progress(pp, job_queue)
+            if st.session_state["render_error"] is not None:
+                st.error(f"Plotting failed: {st.session_state['render_error']}")
+            model_plot, uncert_plot = pp.get_plots(st.session_state.cur_iter, pp_slice)
+            img1, img2 = st.columns(2)
+            # Display one model plot on the left and one uncertainty plot on the right
+            with img1:
+                st.image(model_plot, width=500)
+            with img2:
+                st.write("")  # temp fix: add a blank line to align 2 plots horizontally
+                st.image(uncert_plot, width=500)
         st.write("test index before slider: ", st.session_state["cur_iter"])
 
         # TODO: only display buttons and sliders if there's more than 1 iteration?
-        if len(pp.model_plots) > 1:
+        if pp.num_plots > 1:
             # Slider
             st.session_state.cur_iter = st.slider(label="Select iteration",
                                                   min_value=0,
-                                                  max_value=len(pp.model_plots) - 1,
+                                                  max_value=pp.num_plots - 1,
                                                   key="iter",
                                                   value=st.session_state.cur_iter,
                                                   )
         st.write("test index after slider: ", st.session_state["cur_iter"])
 
+        with st.expander("Convergence and hyperparameters"):
+            pp.conv_hyperparams_plots(minimize=bo_run.objective_min)
+
     else:
 
         st.warning(
             "⚠️ No optimization results available. Please set up in 'Set up BOSS' tab and run in 'Run BOSS' tab."
         )
+
+
+if st.button("Restart", help="Clear all data of the current run and start over.", type="primary"):
+    setup.clear_data()
+
+# Define tabs
+setup_tab, run_tab, postprocess_tab = st.tabs(
+    ["Set up BOSS", "Run BOSS", "Post-processing"]
+)
+
+try:
+    with setup_tab:
+        setup_section()
+    with run_tab:
+        run_section()
+    with postprocess_tab:
+        postprocess_section()
+finally:
+    st.session_state["full_run"] = False
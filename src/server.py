@@ -0,0 +1,368 @@
+"""
+Serve BOSS as a local JSON API, so scripts and lab automation can ask for the next points and report
+observations without the web app:
+
+    python src/server.py --port 8000
+
+Endpoints, all with JSON bodies unless noted:
+
+    POST   /campaigns                 create a campaign from a spec or a CSV file with metadata (text/csv)
+    GET    /campaigns                 list the campaigns
+    GET    /campaigns/<id>            state of a campaign
+    DELETE /campaigns/<id>            remove a campaign
+    POST   /campaigns/<id>/suggest    next points to evaluate, {"batch_size": n} is optional
+    POST   /campaigns/<id>/observe    add observations, {"points": [{"x1": ..., "y": ...}, ...]}
+    POST   /campaigns/<id>/predict    model mean and variance, {"points": [{"x1": ..., "x2": ...}, ...]}
+    GET    /campaigns/<id>/data       the data as CSV with metadata, like a download from the web app
+
+Suggested points are pending until they are observed, so further suggestions are acquired away from them.
+Campaigns are kept in memory. Connections are kept alive between requests, and requests to different
+campaigns are served in parallel.
+"""
+import argparse
+import io
+import json
+import numpy as np
+import os
+import pandas as pd
+import shutil
+import tempfile
+import threading
+import uuid
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from cli import load_run
+from core.fit_cache import FitCache
+from core.boss_run import KERNELS, BossRun
+
+
+class NotFound(Exception):
+    """
+    Raised for requests to unknown campaigns or endpoints, answered with status 404.
+    """
+
+
+def new_run(spec: dict) -> BossRun:
+    """
+    Create the BossRun object of a campaign from its spec, e.g.
+    {"inputs": {"x1": [0, 1], "x2": [0, 1]}, "outputs": ["y"], "minimize": true, "data": [{"x1": 0.5, ...}]}.
+    Optional keys are "noise", "kernel", "batch_size", "fast_iter" and "refit_every"; "data" may be left out.
+
+    :param spec: dict
+        The campaign spec.
+
+    :return: BossRun
+    """
+    inputs = spec["inputs"]
+    X_names = list(inputs)
+    Y_names = list(spec.get("outputs", ["y"]))
+    if len(X_names) == 0 or len(Y_names) == 0 or set(X_names) & set(Y_names):
+        raise ValueError("A campaign needs at least one input and one output, with distinct names.")
+    data = pd.DataFrame(spec.get("data", []), columns=X_names + Y_names, dtype=float)
+    bo_run = BossRun(data=data, bounds=np.array([inputs[x] for x in X_names], dtype=float), X_names=X_names)
+    if bo_run.bounds_error(bo_run.bounds) is not None:
+        raise ValueError("Each input needs bounds [lower, upper] with lower < upper.")
+    bo_run.Y_names = Y_names
+    bo_run.dim = len(X_names)
+    bo_run.num_init = data.shape[0]
+    bo_run.min = bool(spec.get("minimize", True))
+    bo_run.noise = float(spec.get("noise", 0.0))
+    bo_run.has_metadata = True
+    set_options(bo_run, spec)
+    return bo_run
+
+
+def set_options(bo_run: BossRun, spec: dict) -> None:
+    """
+    Set the run options of a campaign that are given in its spec.
+    """
+    kernel = spec.get("kernel", bo_run.kernel)
+    if kernel not in KERNELS:
+        raise ValueError(f"Unknown kernel '{kernel}', use one of {', '.join(KERNELS)}.")
+    bo_run.kernel = kernel
+    bo_run.batch_size = int(spec.get("batch_size", bo_run.batch_size))
+    bo_run.fast_iter = bool(spec.get("fast_iter", bo_run.fast_iter))
+    bo_run.refit_every = int(spec.get("refit_every", bo_run.refit_every))
+    bo_run.allow_pending = True
+
+
+class Campaign:
+    """
+    State of one optimization campaign on the server. Requests to the same campaign are served one at a time,
+    as they change its BossRun object.
+    """
+
+    def __init__(self, bo_run: BossRun):
+        self.bo_run = bo_run
+        self.lock = threading.Lock()
+        self._model = None  # model of the latest results, rebuilt once per results for predictions
+        self._model_id = None  # results_id of the results the model was rebuilt from
+
+    def _rows(self, X: np.ndarray) -> list[dict]:
+        return [dict(zip(self.bo_run.X_names, map(float, x))) for x in X]
+
+    def _points(self, points: list, names: list) -> np.ndarray:
+        """
+        Return the values of the given variables of a list of points, one row per point.
+        """
+        try:
+            X = [[float(p[name]) for name in names] for p in points]
+            return np.array(X, dtype=float).reshape(-1, len(names))
+        except KeyError as err:
+            raise ValueError(f"Each point needs a value of {err}.") from None
+
+    def summary(self) -> dict:
+        """
+        Return the state of the campaign.
+        """
+        bo_run = self.bo_run
+        pending = bo_run.data[bo_run.Y_names].isnull().any(axis=1)
+        summary = {
+            "inputs": {x: list(map(float, b)) for x, b in zip(bo_run.X_names, bo_run.bounds)},
+            "outputs": bo_run.Y_names,
+            "observed": int((~pending).sum()),
+            "pending": self._rows(bo_run.data.loc[pending, bo_run.X_names].to_numpy(dtype=float)),
+        }
+        if bo_run.results is not None:
+            sign = 1 if bo_run.objective_min else -1
+            x_glmin = np.ravel(bo_run.results.select("x_glmin", -1))
+            summary["predicted_optimum"] = {
+                "x": self._rows([x_glmin])[0],
+                bo_run.objective_name: sign * float(bo_run.results.select("mu_glmin", -1)),
+            }
+        return summary
+
+    def suggest(self, batch_size: int | None = None) -> list[dict]:
+        """
+        Acquire the next points and add them to the data as pending rows. Until the first observation,
+        the points are taken from a Sobol sequence over the bounds.
+
+        :param batch_size: int or None
+            Number of points of this suggestion, the batch size of the campaign if None.
+
+        :return:
+        points: list
+            The points, each a dict of input values.
+        """
+        bo_run = self.bo_run
+        campaign_batch_size = bo_run.batch_size
+        if batch_size is not None:
+            bo_run.batch_size = int(batch_size)
+        num_rows = bo_run.data.shape[0]
+        try:
+            if bo_run.data[bo_run.Y_names].notnull().all(axis=1).sum() == 0:
+                # imported here, as it pulls in scipy.stats, which is slow to import
+                from boss.bo.initmanager import InitManager
+
+                X_next = InitManager(
+                    inittype="sobol", bounds=bo_run.bounds, initpts=num_rows + bo_run.batch_size
+                ).get_all()[num_rows:]
+                empty = np.full((X_next.shape[0], len(bo_run.Y_names)), np.nan)
+                new = pd.DataFrame(np.hstack((X_next, empty)), columns=bo_run.X_names + bo_run.Y_names)
+                bo_run.data = pd.concat([bo_run.data, new], ignore_index=True)
+                bo_run.num_init = bo_run.data.shape[0]
+            else:
+                bo_run.run_boss()
+                bo_run.concat_next_acq()
+        finally:
+            bo_run.batch_size = campaign_batch_size
+        return self._rows(bo_run.data[bo_run.X_names].iloc[num_rows:].to_numpy(dtype=float))
+
+    def observe(self, points: list) -> int:
+        """
+        Add observations. Observations of pending points fill in their rows.
+
+        :param points: list
+            The observations, each a dict of input and output values.
+
+        :return:
+        num_observed: int
+            Number of observed rows of the campaign.
+        """
+        bo_run = self.bo_run
+        X = self._points(points, bo_run.X_names)
+        Y = self._points(points, bo_run.Y_names)
+        if np.isnan(Y).any():
+            raise ValueError("Observations need values of all outputs.")
+        for x, y in zip(X, Y):
+            bo_run.add_observation(x, list(y))
+        return int(bo_run.data[bo_run.Y_names].notnull().all(axis=1).sum())
+
+    def predict(self, points: list) -> list[dict]:
+        """
+        Predict the objective at the given points with the model of the latest results.
+
+        :param points: list
+            The points, each a dict of input values.
+
+        :return:
+        predictions: list
+            For each point, its input values and the predicted mean and variance of the objective.
+        """
+        bo_run = self.bo_run
+        if bo_run.results is None:
+            raise ValueError("There is no model yet. Observe some points and ask for a suggestion first.")
+        if self._model_id != bo_run.results_id:
+            self._model = bo_run.results.reconstruct_model(bo_run.results.num_iters - 1)
+            self._model_id = bo_run.results_id
+        X = self._points(points, bo_run.X_names)
+        mu, var = self._model.predict(X)
+        sign = 1 if bo_run.objective_min else -1
+        return [
+            {**row, "mean": sign * float(m), "variance": max(float(v), 0.0)}
+            for row, m, v in zip(self._rows(X), np.ravel(mu), np.ravel(var))
+        ]
+
+    def data_csv(self) -> str:
+        """
+        Return the data with the metadata, in the format of downloads from the web app.
+        """
+        self.bo_run.add_metadata()
+        return self.bo_run.dload_data
+
+
+class ApiServer(ThreadingHTTPServer):
+    """
+    HTTP server of the JSON API, with one thread per connection. Holds the campaigns and the fit cache they share.
+    Each campaign gets its own directory for the output files of BOSS, which is removed with the server.
+    """
+    daemon_threads = True
+
+    def __init__(self, address: tuple, fit_cache: FitCache | None = None, verbose: bool = False):
+        super().__init__(address, ApiHandler)
+        self.verbose = verbose  # log every request
+        self.campaigns = {}
+        self.campaigns_lock = threading.Lock()
+        self.fit_cache = fit_cache if fit_cache is not None else FitCache()
+        self._scratch = tempfile.TemporaryDirectory(prefix="boss-web-api-")
+
+    def server_close(self) -> None:
+        super().server_close()
+        self._scratch.cleanup()
+
+    def add(self, bo_run: BossRun) -> str:
+        bo_run.fit_cache = self.fit_cache
+        campaign_id = uuid.uuid4().hex
+        bo_run.out_dir = os.path.join(self._scratch.name, campaign_id)
+        os.makedirs(bo_run.out_dir)
+        with self.campaigns_lock:
+            self.campaigns[campaign_id] = Campaign(bo_run)
+        return campaign_id
+
+    def get(self, campaign_id: str) -> Campaign:
+        with self.campaigns_lock:
+            if campaign_id not in self.campaigns:
+                raise NotFound(f"No campaign '{campaign_id}'.")
+            return self.campaigns[campaign_id]
+
+    def remove(self, campaign_id: str) -> None:
+        with self.campaigns_lock:
+            campaign = self.campaigns.pop(campaign_id, None)
+        if campaign is None:
+            raise NotFound(f"No campaign '{campaign_id}'.")
+        with campaign.lock:
+            shutil.rmtree(campaign.bo_run.out_dir, ignore_errors=True)
+
+
+class ApiHandler(BaseHTTPRequestHandler):
+    """
+    Handler of the requests to the JSON API, see the module docstring.
+    """
+    protocol_version = "HTTP/1.1"  # keep connections alive between requests
+    server: ApiServer
+
+    def log_message(self, format: str, *args) -> None:
+        if self.server.verbose:
+            super().log_message(format, *args)
+
+    def _send(self, status: int, body: str, content_type: str = "application/json") -> None:
+        payload = body.encode()
+        self.send_response(status)
+        self.send_header("Content-Type", content_type)
+        self.send_header("Content-Length", str(len(payload)))
+        self.end_headers()
+        self.wfile.write(payload)
+
+    def _json(self) -> dict:
+        return json.loads(self.body) if self.body else {}
+
+    def _handle(self, method: str) -> None:
+        # read the whole body first, so the connection can be reused even if the request fails
+        self.body = self.rfile.read(int(self.headers.get("Content-Length", 0)))
+        parts = [p for p in self.path.split("?")[0].split("/") if p]
+        try:
+            if not parts or parts[0] != "campaigns" or len(parts) > 3:
+                raise NotFound(f"No endpoint {method} {self.path}.")
+            if len(parts) == 1:
+                if method == "GET":
+                    with self.server.campaigns_lock:
+                        return self._send(200, json.dumps({"campaigns": list(self.server.campaigns)}))
+                if method == "POST":
+                    return self._send(201, json.dumps({"id": self._create()}))
+                raise NotFound(f"No endpoint {method} {self.path}.")
+            if len(parts) == 2 and method == "DELETE":
+                self.server.remove(parts[1])
+                return self._send(200, json.dumps({"id": parts[1]}))
+            campaign = self.server.get(parts[1])
+            action = (method, parts[2] if len(parts) == 3 else None)
+            with campaign.lock:
+                if action == ("GET", None):
+                    result = campaign.summary()
+                elif action == ("POST", "suggest"):
+                    result = {"points": campaign.suggest(self._json().get("batch_size"))}
+                elif action == ("POST", "observe"):
+                    result = {"observed": campaign.observe(self._json()["points"])}
+                elif action == ("POST", "predict"):
+                    result = {"predictions": campaign.predict(self._json()["points"])}
+                elif action == ("GET", "data"):
+                    return self._send(200, campaign.data_csv(), "text/csv")
+                else:
+                    raise NotFound(f"No endpoint {method} {self.path}.")
+            self._send(200, json.dumps(result))
+        except NotFound as err:
+            self._send(404, json.dumps({"error": str(err)}))
+        except (KeyError, TypeError, ValueError) as err:
+            message = f"Missing key {err}." if isinstance(err, KeyError) else str(err)
+            self._send(400, json.dumps({"error": message}))
+        except Exception as err:
+            self._send(500, json.dumps({"error": f"{type(err).__name__}: {err}"}))
+
+    def _create(self) -> str:
+        """
+        Create a campaign from the request body: a JSON spec, see new_run, or a CSV file with metadata.
+        """
+        if self.headers.get("Content-Type", "").startswith("text/csv"):
+            bo_run = load_run(io.BytesIO(self.body), "data.csv")
+            set_options(bo_run, {})
+        else:
+            bo_run = new_run(self._json())
+        return self.server.add(bo_run)
+
+    def do_GET(self) -> None:
+        self._handle("GET")
+
+    def do_POST(self) -> None:
+        self._handle("POST")
+
+    def do_DELETE(self) -> None:
+        self._handle("DELETE")
+
+
+def main(argv: list | None = None) -> None:
+    parser = argparse.ArgumentParser(prog="server.py", description="Serve BOSS as a local JSON API.")
+    parser.add_argument("--host", default="127.0.0.1", help="address to listen on, only this machine by default")
+    parser.add_argument("--port", type=int, default=8000)
+    parser.add_argument("--cache-dir", help="keep fits in this directory, so they survive a restart of the server")
+    parser.add_argument("--verbose", action="store_true", help="log every request")
+    args = parser.parse_args(argv)
+    server = ApiServer((args.host, args.port), FitCache(disk_dir=args.cache_dir), args.verbose)
+    print(f"Serving the BOSS API on http://{args.host}:{server.server_port}/campaigns")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        pass
+    finally:
+        server.server_close()
+
+
+if __name__ == "__main__":
+    main()
@@ -1,7 +1,10 @@
 import numpy as np
 import pandas as pd
 import streamlit as st
-from boss.bo.initmanager import InitManager
+from typing import TYPE_CHECKING
+
+if TYPE_CHECKING:
+    from boss.bo.initmanager import InitManager
 
 
 class InitPointsSetUp:
@@ -51,7 +54,7 @@ class InitPointsSetUp:
             )
         return init_type
 
-    def set_init_manager(self, init_type: str, bounds) -> InitManager:
+    def set_init_manager(self, init_type: str, bounds) -> "InitManager":
         """
         Return an InitManager instance of the InitManager class (from BOSS library).
 
@@ -70,6 +73,9 @@ class InitPointsSetUp:
             if np.isnan(bounds).any():
                 st.error("⚠️ Please set bounds for all variables.")
             else:
+                # imported here, as it pulls in scipy.stats, which is slow to import
+                from boss.bo.initmanager import InitManager
+
                 return InitManager(inittype=init_type,
                                    initpts=self.num_init,
                                    bounds=bounds,
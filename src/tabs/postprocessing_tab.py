@@ -1,17 +1,47 @@
 import numpy as np
-import os
+import pandas as pd
 import streamlit as st
-from PIL import Image
+from core.jobs import DONE, JobQueue
+
+
+@st.cache_data(max_entries=64, show_spinner=False)
+def get_slice_grid(results_id: str, itr: int, pp_slice: tuple, x_fixed: tuple, _results) -> pd.DataFrame:
+    """
+    Return the model mean and uncertainty on the grid of a cross-section, predicted in one batched call.
+    The grids are cached by results_id, slice, resolution and the values of the variables off the slice.
+
+    :return:
+    grid: pd.DataFrame
+        Columns x (first axis), y (second axis, equal to x for 1D slices), mean and uncertainty.
+    """
+    from core.plots import predict_slice, slice_axes
+
+    bounds = np.asarray(_results.settings["bounds"], dtype=float)
+    model = _results.reconstruct_model(itr)
+    X, mu, nu = predict_slice(model, bounds, list(pp_slice), np.array(x_fixed))
+    i, j, _ = slice_axes(pp_slice, bounds.shape[0])
+    return pd.DataFrame({"x": X[:, i], "y": X[:, j], "mean": mu, "uncertainty": nu})
 
 
 class PostprocessingTab:
-    def __init__(self, bo_results, x_names) -> None:
+    def __init__(
+            self,
+            bo_results,
+            x_names,
+            results_id: str = None,
+            lineage_id: str = None,
+            plot_cache=None,
+            y_name: str = "y",
+    ) -> None:
         self.bo_results = bo_results
         self.x_names = x_names
+        self.results_id = results_id
+        self.lineage_id = lineage_id  # stays the same while iterations are only appended to the results
+        self.plot_cache = plot_cache  # FitCache of rendered plots, shared by all sessions
+        self.y_name = y_name  # label of the model plots
         self.expander = None
-        self.model_plots = []
-        self.uncert_plots = []
-        self.pp_acq_funcs = True
+        # acquisition functions are not plotted, the user chooses the slice of the model instead
+        self.pp_acq_funcs = False
 
     def plot_acqfn_or_slice(self):
         """
@@ -40,63 +70,267 @@ class PostprocessingTab:
         with col1:
             x = st.selectbox("First axis of cross-section", options=self.x_names)
         with col2:
-            y = st.selectbox("Second axis of cross-section", options=self.x_names)
+            y = st.selectbox(
+                "Second axis of cross-section",
+                options=self.x_names,
+                index=min(1, len(self.x_names) - 1),
+                help="Choose the same variable as the first axis for a 1D cross-section.",
+            )
         with col3:
             z = st.number_input(
-                "Number of points per axis in the grid", value=50, step=1, min_value=1
+                "Number of points per axis in the grid", value=50, step=1, min_value=2, max_value=500
             )
         return x, y, z
 
-    # TODO: refactor this to display model plots of n-interations and make it cleaner
-    def _show_plots(self, path, warning: str = None) -> None:
-        """
-        Internal function used to display plots.
-
-        :param path: str
-            The path of the plots.
-        :param warning: str
-            The warning text if no plots are found.
-        """
-        if os.path.isdir(path):
-            for path, directories, files in os.walk(path):
-                for i, file in enumerate(files):
-                    img_path = os.path.join(path, file)
-                    # Load image from path and append to list of either model or uncertainty plots
-                    img = Image.open(img_path)
-                    if "uncert" not in img_path:
-                        self.model_plots.append(img)
-                    else:
-                        self.uncert_plots.append(img)
+    @property
+    def num_plots(self) -> int:
+        """
+        Number of iterations that can be plotted.
+        """
+        return self.bo_results.num_iters
+
+    def _plot_key(self, itr: int, pp_slice: list) -> str:
+        """
+        Return the key of the plots of an iteration in the plot cache. The earlier iterations of a lineage
+        never change, so their plots are reused after new iterations were added. The latest iteration is keyed
+        by the results, as its next acquisition changes e.g. if pending experiments were added.
+        """
+        if self.lineage_id is not None and itr < self.num_plots - 1:
+            run = self.lineage_id
         else:
-            st.warning(warning)
+            run = f"{self.lineage_id}-{self.results_id}"
+        return f"{run}-{itr}-{'-'.join(str(int(v)) for v in pp_slice)}-{self.y_name}"
+
+    def get_plots(self, itr: int, pp_slice: list) -> (bytes, bytes):
+        """
+        Return the model and uncertainty plots of an iteration. Only the requested iteration is rendered,
+        and only if it is not in the plot cache yet.
+
+        :param itr: int
+            The iteration.
+        :param pp_slice: list
+            Cross-section to plot, see plot_acqfn_or_slice.
+
+        :return:
+        model_png, uncert_png: (bytes, bytes)
+        """
+        key = self._plot_key(itr, pp_slice)
+        plots = self.plot_cache.get(key) if self.plot_cache is not None else None
+        if plots is None:
+            from core.plots import render_model_plots
+
+            with st.spinner("Plotting the model..."):
+                plots = render_model_plots(self.bo_results, itr, list(pp_slice), list(self.x_names), self.y_name)
+            if self.plot_cache is not None:
+                self.plot_cache.put(key, plots)
+        return plots
+
+    def missing_iters(self, pp_slice: list) -> list[int]:
+        """
+        Return the iterations whose plots of the slice are not in the plot cache yet.
+
+        :param pp_slice: list
+            Cross-section to plot, see plot_acqfn_or_slice.
+
+        :return: list[int]
+        """
+        if self.plot_cache is None:
+            return list(range(self.num_plots))
+        return [itr for itr in range(self.num_plots) if self._plot_key(itr, pp_slice) not in self.plot_cache]
+
+    def submit_missing(self, pp_slice: list, job_queue: JobQueue) -> dict:
+        """
+        Submit jobs that render the plots of all iterations that are not in the plot cache yet, in parallel in the
+        worker processes of the job queue. Iterations are split into several small jobs per worker, so the workers
+        stay busy and the progress moves steadily. Collect the plots with collect_rendered.
+
+        :param pp_slice: list
+            Cross-section to plot, see plot_acqfn_or_slice.
+        :param job_queue: JobQueue
+            Queue to submit the render jobs to.
+
+        :return:
+        jobs: dict
+            Job id -> {iteration: key of its plots in the plot cache}, for the iterations the job renders.
+        """
+        from core.plots import render_job
+        from core.results_io import snapshot_results
+
+        missing = self.missing_iters(pp_slice)
+        if not missing or self.plot_cache is None:
+            return {}
+        snapshot = snapshot_results(self.bo_results)
+        chunk_size = -(-len(missing) // (4 * job_queue.max_workers))
+        jobs = {}
+        for k in range(0, len(missing), chunk_size):
+            itrs = missing[k: k + chunk_size]
+            job_id = job_queue.submit(render_job, snapshot, itrs, list(pp_slice), list(self.x_names), self.y_name)
+            # the keys are fixed now, as the results may have changed by the time the job has finished
+            jobs[job_id] = {itr: self._plot_key(itr, pp_slice) for itr in itrs}
+        return jobs
+
+    def collect_rendered(self, jobs: dict, job_queue: JobQueue) -> str | None:
+        """
+        Store the plots of the finished render jobs in the plot cache and remove the jobs from jobs. If a job
+        failed, the other jobs are cancelled.
+
+        :param jobs: dict
+            Running render jobs, see submit_missing.
+        :param job_queue: JobQueue
+            Queue the jobs were submitted to.
+
+        :return:
+        error: str or None
+            Error message of a failed job, or None.
+        """
+        for job_id in list(jobs):
+            job = job_queue.status(job_id)
+            if not job.is_finished:
+                continue
+            job_queue.forget(job_id)
+            keys = jobs.pop(job_id)
+            if job.state != DONE:
+                self.cancel_rendering(jobs, job_queue)
+                return job.error
+            for itr, plots in job.result.items():
+                self.plot_cache.put(keys[itr], plots)
+        return None
+
+    @staticmethod
+    def cancel_rendering(jobs: dict, job_queue: JobQueue) -> None:
+        """
+        Cancel the running render jobs and remove them from jobs.
+
+        :param jobs: dict
+            Running render jobs, see submit_missing.
+        :param job_queue: JobQueue
+            Queue the jobs were submitted to.
+
+        :return: None
+        """
+        for job_id in jobs:
+            job_queue.cancel(job_id)
+            job_queue.forget(job_id)
+        jobs.clear()
+
+    def input_fixed_values(self, itr: int, pp_slice: list) -> np.ndarray:
+        """
+        Display widgets for the values of the variables that are not on the axes of the slice.
+        They default to the location of the global minimum at the iteration.
+
+        :param itr: int
+            The iteration.
+        :param pp_slice: list
+            Cross-section to plot, see plot_acqfn_or_slice.
+
+        :return:
+        x_fixed: ndarray
+            Values of all variables; the ones on the axes are not used.
+        """
+        bounds = np.asarray(self.bo_results.settings["bounds"], dtype=float)
+        x_glmin = self.bo_results.select("x_glmin", itr)
+        x_fixed = np.asarray(x_glmin if x_glmin is not None else bounds.mean(axis=1), dtype=float).ravel()
+        off_slice = [d for d in range(len(self.x_names)) if d not in (pp_slice[0] - 1, pp_slice[1] - 1)]
+        if off_slice:
+            with st.expander("Values of the other variables (default: global minimum)"):
+                for d in off_slice:
+                    x_fixed[d] = st.slider(
+                        self.x_names[d],
+                        min_value=float(bounds[d, 0]),
+                        max_value=float(bounds[d, 1]),
+                        value=float(x_fixed[d]),
+                        key=f"fixed_{self.x_names[d]}",
+                    )
+        return x_fixed
+
+    def plot_interactive(self, itr: int, pp_slice: list, x_fixed: np.ndarray) -> None:
+        """
+        Display interactive charts of the model mean and uncertainty on the slice, computed directly from the GP.
+
+        :param itr: int
+            The iteration.
+        :param pp_slice: list
+            Cross-section to plot, see plot_acqfn_or_slice.
+        :param x_fixed: ndarray
+            Values of the variables that are not on the axes of the slice.
+
+        :return: None
+        """
+        import altair as alt
+
+        grid = get_slice_grid(self.results_id, itr, tuple(pp_slice), tuple(x_fixed), self.bo_results)
+        i, j = pp_slice[0] - 1, pp_slice[1] - 1
+        is_1d = i == j or len(self.x_names) == 1
+        itrs = np.arange(itr + 1)
+        X_data = self.bo_results.select("X", itrs)
+        points = pd.DataFrame({"x": X_data[:, i], "y": X_data[:, j], "mean": self.bo_results.select("Y", itrs)[:, 0]})
+        x_axis = alt.X("x:Q", title=self.x_names[i])
+
+        col1, col2 = st.columns(2)
+        for col, value in ((col1, "mean"), (col2, "uncertainty")):
+            if is_1d:
+                chart = alt.Chart(grid).mark_line().encode(x=x_axis, y=alt.Y(f"{value}:Q"), tooltip=["x", value])
+                if value == "mean":
+                    band = alt.Chart(grid).transform_calculate(
+                        lower="datum.mean - datum.uncertainty",
+                        upper="datum.mean + datum.uncertainty",
+                    ).mark_area(opacity=0.3).encode(x="x:Q", y="lower:Q", y2="upper:Q")
+                    data = alt.Chart(points).mark_circle(color="black", size=30).encode(x="x:Q", y="mean:Q")
+                    chart = band + chart + data
+            else:
+                # each grid point is drawn as a cell centered on it
+                dx = (grid["x"].max() - grid["x"].min()) / (pp_slice[2] - 1) / 2
+                dy = (grid["y"].max() - grid["y"].min()) / (pp_slice[2] - 1) / 2
+                cells = grid.assign(x0=grid["x"] - dx, x1=grid["x"] + dx, y0=grid["y"] - dy, y1=grid["y"] + dy)
+                heatmap = alt.Chart(cells).mark_rect().encode(
+                    x=alt.X("x0:Q", title=self.x_names[i]),
+                    x2="x1:Q",
+                    y=alt.Y("y0:Q", title=self.x_names[j]),
+                    y2="y1:Q",
+                    color=alt.Color(f"{value}:Q", scale=alt.Scale(scheme="viridis")),
+                    tooltip=["x", "y", value],
+                )
+                data = alt.Chart(points).mark_circle(color="black", size=30).encode(x="x:Q", y="y:Q")
+                chart = heatmap + data
+            with col:
+                st.altair_chart(chart.properties(title=value).interactive(), use_container_width=True)
 
     def next_image(self):
         """
         Move to the next image.
         """
-        if st.session_state.cur_iter < len(self.model_plots) - 1:
+        if st.session_state.cur_iter < self.num_plots - 1:
             st.session_state.cur_iter += 1
 
     def prev_image(self):
         if st.session_state.cur_iter > 0:
             st.session_state.cur_iter -= 1
 
-    def load_plots(self) -> None:
-        model_dir = "./postprocessing/graphs_models"
-        if os.path.isdir(model_dir):
-            self._show_plots(path=model_dir, warning=None)
-
-    # TODO: implement this to display convergence and hyperparams plots
-    def conv_hyperparams_plots(self) -> None:
+    def conv_hyperparams_plots(self, minimize: bool = True) -> None:
         """
-        Display plots of the convergence measures and hyperparameters.
+        Display charts of the convergence measures and hyperparameters of all iterations. They are read straight
+        from the results, so they are available right after every run. Gaps are iterations for which BOSS did not
+        record the value, e.g. the earlier iterations of a fit from scratch.
+
+        :param minimize: bool
+            False if the output was maximized.
         """
+        from core.convergence import convergence_table, hyperparameter_table
+
+        conv = convergence_table(self.bo_results, self.x_names, minimize)
+        params = hyperparameter_table(self.bo_results, self.x_names)
+        optimum = "minimum" if minimize else "maximum"
         col1, col2 = st.columns(2)
         with col1:
-            st.image("./postprocessing/graphs_convergence/convergence.png", width=500)
+            st.write(f"Observed and predicted global {optimum}")
+            st.line_chart(conv[["observed optimum", "predicted optimum"]])
+            st.write(f"Location of the predicted global {optimum}")
+            st.line_chart(conv[list(self.x_names)])
         with col2:
-            st.image("./postprocessing/graphs_convergence/hyperparameters.png", width=500)
-        pass
+            st.write("Distance between consecutive acquisitions")
+            st.line_chart(conv["acquisition distance"])
+            st.write("Model hyperparameters")
+            st.line_chart(params)
 
     # TODO: ensure that this function works with num_iters
     def input_pp_iters(self):
@@ -1,73 +1,19 @@
 import numpy as np
+import os
 import pandas as pd
-import tomli_w
+import shutil
 import streamlit as st
-from boss.bo.bo_main import BOMain
+import tempfile
+from core.boss_run import KERNELS, BossRun  # KERNELS is also imported from here
+from core.data_io import FORMATS, UPLOAD_EXTENSIONS, write_table
+from core.jobs import JobQueue
 
 
-def dummy_func(_):
-    pass
-
-
-class RunBOSS:
+class RunBOSS(BossRun):
     """
-    Class for running BOSS.
+    Class for running BOSS in the web app: the widgets and displays of a BossRun.
     """
 
-    def __init__(
-            self,
-            run_help=None,
-            data=None,
-            bounds=None,
-            X_names=None,
-            noise=0.0,
-            res=None,
-    ):
-        self.dim = run_help.dim if run_help is not None else None
-        self.data = data
-        self.bounds = bounds
-        self.has_metadata = False
-        self.X_names = X_names or []
-        self.Y_names = None
-        self.kernel = "rbf"
-        self.min = True  # True if minimize, False if maximize
-        self.noise = noise
-        self.num_init = 0  # number of points that can be treated as initial points
-        self.results = res
-        self.has_run = False
-        self.dload_data = None  # data format only for download, not displayed in UI
-
-    @property
-    def X_vals(self):
-        """
-        Return the input values.
-
-        :return:
-        X_vals: ndarray
-            Numpy array of the X values.
-        """
-        return self.data[self.X_names].to_numpy()
-
-    @property
-    def Y_vals(self):
-        """
-        Return the output values.
-
-        :return:
-        Y_vals: ndarray
-            Numpy array of the Y values.
-        """
-        return self.data[self.Y_names].to_numpy()
-
-    def strip_white_spaces(self) -> None:
-        """
-        Remove leading, trailing, and in-between whitespace in variable names (X_name and Y_name) if there is any.
-        """
-        for x in self.X_names:
-            x.strip().replace(" ", "")
-        for y in self.Y_names:
-            y.strip().replace(" ", "")
-
     def choose_inputs_and_outputs(self) -> None:
         """
         If there is no bounds in the uploaded file, display widgets that let users choose at least one column
@@ -85,35 +31,16 @@ class RunBOSS:
             )
         with out_col:
             self.Y_names = st.multiselect(
-                "Choose one output variable *",
+                "Choose output variable(s) *",
                 options=list(self.data.columns),
                 default=None,
-                max_selections=1,
-                help="Do not use empty space in variable names."
+                help="Do not use empty space in variable names. With several outputs, the next acquisition "
+                     "optimizes a combination of them and each output gets its own model.",
             )
         self.strip_white_spaces()
         self.dim = len(self.X_names)
         self.data = self.data[self.X_names + self.Y_names]
-
-    def parse_params(self, metadata) -> None:
-        """
-        Return the variable names and bounds to run with BOMain object.
-
-        :param metadata: dict
-            Metadata obtained from the uploaded file.
-
-        :return: None
-        """
-        self.num_init = metadata.get('num-init')
-        self.noise = metadata.get('noise', 0)
-        self.min = metadata.get('min', True)
-        self.data.columns = [c.strip().replace(" ", "") for c in self.data.columns]
-        # Input vars are the ones that have bounds in the metadata
-        self.X_names = [c for c in self.data.columns if c in metadata.keys()]
-        # Output vars are the ones that do not have bounds in the metadata, as their [min, max] is used as default
-        self.Y_names = [c for c in self.data.columns if c not in metadata.keys()]
-        self.bounds = np.array([metadata.get(x, None) for x in self.X_names])
-        self.dim = self.bounds.shape[0]
+        self.target_ranges = {}
 
     def _display_input_widgets(
             self, d: int, cur_bounds: np.ndarray = None
@@ -205,45 +132,265 @@ class RunBOSS:
 
         :return: bool
         """
-        if bounds is None:
-            st.error("⚠️ Please choose bounds for all variables.")
-            return False
-        else:
-            if np.isnan(bounds).any():
-                st.error("⚠️ Please set valid bounds for all variables.")
-            if not np.all(bounds[:, 0] < bounds[:, 1]):
-                st.error("⚠️ Lower bound has to be smaller than upper bound.")
-                return False
-            if not np.isnan(bounds).any() and np.all(bounds[:, 0] < bounds[:, 1]):
-                return True
+        error = RunBOSS.bounds_error(bounds)
+        if error is not None:
+            st.error(f"⚠️ {error}")
+        return error is None
 
     def verify_data(self) -> bool:
-        if self.data.isnull().values.any():
-            st.error("⚠️ Please fill in the empty cells or download the data if you want to continue later.")
-            return False
-        else:
-            return True
+        """
+        Check that the data can be used to run BOSS. If pending experiments are allowed, rows may lack
+        output values, but all input values have to be filled in.
 
-    def run_boss(self) -> None:
+        :return: bool
+        """
+        error = self.data_error()
+        if error is not None:
+            if not self.allow_pending:
+                error = error.rstrip(".") + " or download the data if you want to continue later."
+            st.error(f"⚠️ {error}")
+        return error is None
+
+    def set_run_options(self) -> None:
         """
-        Run BOSS with the given parameters.
+        Display the widgets for options that only affect how BOSS is run, not the optimization problem itself.
+        These stay editable after BOSS has been run.
 
         :return: None
         """
-        bo = BOMain(
-            f=dummy_func,
-            bounds=self.bounds,
-            kernel=self.kernel,
-            noise=self.noise,
-            iterpts=0,
+        with st.expander("Run options"):
+            options = ["auto"] + list(KERNELS)
+            kernel = st.selectbox(
+                "Kernel",
+                options=options,
+                index=0 if self.auto_kernel else options.index(self.kernel),
+                format_func=lambda k: "Automatic" if k == "auto" else KERNELS[k],
+                help="Covariance function of the model. 'Automatic' fits all kernels in parallel and keeps the one "
+                     "with the highest marginal likelihood.",
+            )
+            self.auto_kernel = kernel == "auto"
+            if not self.auto_kernel:
+                self.kernel = kernel
+            self.run_in_background = st.checkbox(
+                "Run in background",
+                value=self.run_in_background,
+                help="Fit the model in a separate worker process. The page stays responsive and the fit can be "
+                     "cancelled.",
+            )
+            self.set_target_options()
+            self.batch_size = st.number_input(
+                "Suggestions per iteration",
+                min_value=1,
+                value=self.batch_size,
+                step=1,
+                help="Number of acquisitions to suggest at once, e.g. to run several experiments in parallel. "
+                     "Batches are built with the Kriging Believer strategy.",
+            )
+            self.allow_pending = st.checkbox(
+                "Allow pending experiments",
+                value=self.allow_pending,
+                help="Rows with input values but without an output value are treated as experiments that are "
+                     "still running. New acquisitions are pushed away from them instead of waiting for their "
+                     "results.",
+            )
+            self.warm_start = st.checkbox(
+                "Warm start",
+                value=self.warm_start,
+                help="Start the model fit from the hyperparameters of the previous iteration. If rows were only "
+                     "appended to the data, the previous model is updated instead of refitted from scratch.",
+            )
+            self.fast_iter = st.checkbox(
+                "Fast iterations",
+                value=self.fast_iter,
+                disabled=not self.warm_start,
+                help="If only one row was added since the previous run, keep the hyperparameters fixed and only "
+                     "update the model and the next acquisition. Requires warm start.",
+            )
+            col1, col2 = st.columns(2)
+            with col1:
+                self.large_data = st.checkbox(
+                    "Large-data mode",
+                    value=self.large_data,
+                    help="If there are more rows than the maximum, fit the model to a subset of them: half are the "
+                         "rows nearest to the best observation, half are sampled from the rest. The next "
+                         "acquisitions are restricted to a trust region around the best observation. Keeps the fit "
+                         "time nearly constant as the data grows.",
+                )
+            with col2:
+                self.max_rows = st.number_input(
+                    "Maximum rows to fit",
+                    min_value=50,
+                    value=self.max_rows,
+                    step=100,
+                    disabled=not self.large_data,
+                )
+            col1, col2 = st.columns(2)
+            with col1:
+                self.refit_every = st.number_input(
+                    "Refit hyperparameters every k iterations",
+                    min_value=1,
+                    value=self.refit_every,
+                    step=1,
+                    disabled=not (self.warm_start and self.fast_iter),
+                )
+            with col2:
+                if st.button("Refit on next run", disabled=not (self.warm_start and self.fast_iter)):
+                    self._force_refit = True
+                if self._force_refit:
+                    st.caption("The hyperparameters will be refitted on the next run.")
+
+    def upload_candidates(self) -> None:
+        """
+        Display a file uploader for an optional pool of candidates. If a file is uploaded, the next acquisitions
+        are picked from its rows instead of anywhere within the bounds. The file is saved to the output directory
+        and read in chunks when acquiring, so it can have millions of rows.
+
+        :return: None
+        """
+        file = st.file_uploader(
+            "Candidate pool (optional)",
+            type=UPLOAD_EXTENSIONS,
+            help="A CSV, Parquet or Arrow file with one feasible point per row and a column for each input "
+                 "variable. The next acquisitions are the best candidates that have not been observed yet.",
+            key="candidates",
         )
-        if self.min:
-            self.results = bo.run(self.X_vals, self.Y_vals)
-        else:
-            self.results = bo.run(self.X_vals, -self.Y_vals)
-        # tell BOSS how many of our batches/data points to treat as initial points
-        self.results.set_num_init_batches(self.num_init)
-        self.has_run = True
+        if file is None:
+            self.candidate_pool = None
+            self._candidates_file = None
+            return
+        # the saved file is also written again if it was removed with an expired scratch directory
+        if self._candidates_file != file.file_id or not os.path.isfile(self.candidate_pool.path):
+            from core.candidates import CandidatePool
+
+            extension = os.path.splitext(file.name)[1].lower()
+            path = os.path.join(self.out_dir or tempfile.gettempdir(), f"candidates-{self.run_id}{extension}")
+            file.seek(0)
+            with open(path, "wb") as f:
+                shutil.copyfileobj(file, f)
+            pool = CandidatePool(path, self.X_names)
+            try:
+                # read the first chunk to check that the file has all input variables
+                next(pool.chunks(), None)
+            except ValueError as err:
+                st.error(f"Error: {err} Please check the candidate file and re-upload.")
+                self.candidate_pool = None
+                return
+            self.candidate_pool = pool
+            self._candidates_file = file.file_id
+        st.caption(f"Acquisitions are picked from the candidates in {file.name}.")
+
+    def set_target_options(self) -> None:
+        """
+        Display a table to choose, for each output, whether it is minimized, its weight in the combined
+        objective and the range that scales it. Only shown if there are several outputs.
+
+        :return: None
+        """
+        if self.Y_names is None or len(self.Y_names) < 2:
+            return
+        targets = pd.DataFrame(
+            {
+                "output": self.Y_names,
+                "minimize": self._target_minimize(),
+                "weight": [self.target_settings.get(name, (self.min, 1.0))[1] for name in self.Y_names],
+                "lower": [self.target_ranges.get(name, [np.nan, np.nan])[0] for name in self.Y_names],
+                "upper": [self.target_ranges.get(name, [np.nan, np.nan])[1] for name in self.Y_names],
+            }
+        )
+        targets = st.data_editor(
+            targets,
+            hide_index=True,
+            disabled=["output"],
+            column_config={
+                "weight": st.column_config.NumberColumn(min_value=0.0, step=0.1),
+                "lower": st.column_config.NumberColumn(
+                    help="The lower and upper values map to 0 and 1 when the outputs are combined. If empty, the "
+                         "range of the output in the data at the next run is used and kept from then on."
+                ),
+                "upper": st.column_config.NumberColumn(),
+            },
+            key="targets",
+        )
+        self.target_settings = {
+            row.output: (bool(row.minimize), float(row.weight)) for row in targets.itertuples(index=False)
+        }
+        for row in targets.itertuples(index=False):
+            if row.lower < row.upper:
+                self.target_ranges[row.output] = [float(row.lower), float(row.upper)]
+            else:
+                # an empty or invalid range is taken from the data at the next run
+                self.target_ranges.pop(row.output, None)
+
+    def display_kernel_comparison(self) -> None:
+        """
+        Display the comparison of the kernels of the latest automatic kernel choice, best first.
+
+        :return: None
+        """
+        if self.auto_kernel and self.kernel_comparison is not None:
+            with st.expander(f"Kernel comparison (chosen: {KERNELS[self.kernel]})"):
+                st.dataframe(self.kernel_comparison, hide_index=True, use_container_width=True)
+                st.caption("Fit times are empty for fits that were loaded from the cache or failed.")
+
+    def set_auto_run_options(self, max_concurrency: int) -> None:
+        """
+        Display the widgets for auto-run mode: the objective and how many evaluations to run, and how many at once.
+
+        :param max_concurrency: int
+            Largest number of evaluations that may run at the same time, e.g. the number of job workers.
+
+        :return: None
+        """
+        from core.objective import OBJECTIVE_KINDS
+
+        self.objective = st.text_input(
+            "Objective",
+            value=self.objective,
+            placeholder="python:package.module.function",
+            help="The objective is evaluated on this server, so BOSS can iterate without anyone filling in the "
+                 "outputs. One of:  \n" + "  \n".join(f"- {form}" for form in OBJECTIVE_KINDS.values()),
+        )
+        col1, col2 = st.columns(2)
+        with col1:
+            self.auto_iters = st.number_input("Evaluations", min_value=1, max_value=10000, value=self.auto_iters)
+        with col2:
+            self.auto_concurrency = st.number_input(
+                "Concurrent evaluations",
+                min_value=1,
+                max_value=max_concurrency,
+                value=min(self.auto_concurrency, max_concurrency),
+                help="While evaluations run, the next points are acquired with the running ones as pending "
+                     "experiments.",
+            )
+
+    def predict_points(self, job_queue: JobQueue) -> None:
+        """
+        Display the widgets to predict the model at uploaded points and to download the predictions.
+
+        :param job_queue: JobQueue
+            Queue to run the predictions in, so large files do not block the page.
+
+        :return: None
+        """
+        file = st.file_uploader(
+            "Points to predict",
+            type=UPLOAD_EXTENSIONS,
+            help="A CSV, Parquet or Arrow file with a column for each input variable. The model of the latest "
+                 "iteration predicts the mean and variance of the output at each row.",
+            key="predict_points",
+        )
+        if st.button("Predict", disabled=file is None or self.predict_job_id is not None):
+            self.submit_predictions(file, job_queue)
+        if self.predict_error is not None:
+            st.error(f"The prediction failed: {self.predict_error}")
+        if self.predictions is not None and os.path.isfile(self.predictions):
+            with open(self.predictions, "rb") as f:
+                st.download_button(
+                    label="Download predictions",
+                    data=f,
+                    file_name="boss_predictions.csv",
+                    mime="text/csv",
+                )
 
     def display_result(self) -> None:
         """
@@ -263,86 +410,100 @@ class RunBOSS:
                 glmin[key] = val
             res = ", ".join(str(key) + " = " + str(val) for key, val in glmin.items())
             if self.X_names is not None:
-                if self.min is False:
+                if self.objective_min is False:
                     st.success(
-                        f"Predicted global maximum: {self.Y_names[0]} = {-mu_glmin} at \n {res}.",
+                        f"Predicted global maximum: {self.objective_name} = {-mu_glmin} at \n {res}.",
                         icon="✅",
                     )
                 else:
                     st.success(
-                        f"Predicted global minimum: {self.Y_names[0]} = {mu_glmin} at \n {res}.",
+                        f"Predicted global minimum: {self.objective_name} = {mu_glmin} at \n {res}.",
                         icon="✅",
                     )
+            if self.is_multi_output:
+                self.display_target_results()
+            if self.approximation is not None:
+                st.info(self.approximation, icon="ℹ️")
 
-    def display_next_acq(self) -> None:
+    def display_target_results(self) -> None:
         """
-        Get and display the next acquisition location suggested by BOSS.
+        Display the predicted global optimum of each output, from the fits of the single outputs,
+        and the observed rows that are Pareto optimal.
 
         :return: None
         """
-        if self.results is not None:
-            X_next = np.transpose(np.around(self.results.get_next_acq(-1), decimals=4))
-            next_acq = {}
-            for key, val in zip(self.X_names, X_next):
-                next_acq[key] = val
-            res = ", ".join(str(key) + " = " + str(val[0]) for key, val in next_acq.items())
-            st.success(
-                f"Next acquisition:  \n {res}",
-                icon="✅",
-            )
+        rows = []
+        for name, minimize in zip(self.Y_names, self._target_minimize()):
+            res = self.target_results.get(name)
+            if res is None:
+                continue
+            row = {
+                "output": name,
+                "goal": "minimum" if minimize else "maximum",
+                "predicted optimum": (1 if minimize else -1) * float(res.select("mu_glmin", -1)),
+            }
+            row.update(zip(self.X_names, np.ravel(res.select("x_glmin", -1))))
+            rows.append(row)
+        if rows:
+            st.write("Predicted global optimum of each output:")
+            st.dataframe(pd.DataFrame(rows), hide_index=True, use_container_width=True)
+        for name, error in self.target_errors.items():
+            st.error(f"The fit of {name} failed: {error}")
+
+        from core.multi_output import pareto_mask
+
+        observed = self.data.dropna(subset=self.Y_names)
+        if observed.shape[0] > 0:
+            front = observed[pareto_mask(observed[self.Y_names].to_numpy(dtype=float), self._target_minimize())]
+            with st.expander(f"Pareto-optimal observations ({front.shape[0]})"):
+                st.dataframe(front, use_container_width=True)
 
-    def concat_next_acq(self) -> None:
+    def display_next_acq(self) -> None:
         """
-        Concatenate the next acquisition location to the data table.
+        Get and display the next acquisition location(s) suggested by BOSS.
 
         :return: None
         """
         if self.results is not None:
-            X_next = self.results.get_next_acq(-1)
-            if X_next is not None:
-                XY_next = np.concatenate((X_next, np.ones(shape=(X_next.shape[0], 1)) * np.nan), axis=1)
-                acq = pd.DataFrame(data=XY_next, columns=self.X_names + self.Y_names)
-                self.data = pd.concat([self.data, acq], ignore_index=True)
-
-    def add_metadata(self) -> None:
-        """
-        Add the metadata as comment lines (indicated by a hash '#' at the beginning of a line).
-        Display a download button for data with the metadata.
-
-        :return: None
-        """
-        metadata = {
-            'noise': self.noise,
-            'min': self.min,
-            'num-init': self.num_init,
-        }
-        for d in range(0, self.dim):
-            metadata[self.X_names[d]] = str(self.bounds[d].tolist())
-        metadata_str = tomli_w.dumps(metadata)
-
-        # remove double quotes
-        metadata_str = metadata_str.replace('"', "")
-        # remove any whitespaces (leading, trailing, in-between words)
-        self.strip_white_spaces()
-
-        # add hash at the beginning of each line
-        metadata_str = "\n".join(["#" + line for line in metadata_str[:-1].split("\n")])
-        self.dload_data = metadata_str + "\n" + self.data.to_csv(index=False)
+            X_next = np.around(np.atleast_2d(self.results.get_next_acq(-1)), decimals=4)
+            lines = []
+            for x_next in X_next:
+                lines.append(", ".join(str(key) + " = " + str(val) for key, val in zip(self.X_names, x_next)))
+            if len(lines) == 1:
+                st.success(f"Next acquisition:  \n {lines[0]}", icon="✅")
+            else:
+                res = "  \n ".join(f"{i + 1}. {line}" for i, line in enumerate(lines))
+                st.success(f"Next acquisitions:  \n {res}", icon="✅")
 
     def download_data(self, widget_key: str) -> None:
         """
-        Display a download button for data, with the metadata.
+        Display a download button for data, with the metadata, in the chosen file format.
+        In Parquet and Arrow files, the metadata is stored in the schema and values keep their full precision.
 
         :param widget_key: The key to make the download button widget unique.
 
         :return: None
         """
+        file_format = st.radio(
+            "File format",
+            options=list(FORMATS),
+            horizontal=True,
+            key=f"{widget_key}_format",
+            help="Parquet and Arrow files are smaller and faster to read for large data sets.",
+        )
+        extension, mime = FORMATS[file_format]
+        if file_format == "CSV":
+            data = self.dload_data
+        else:
+            # only rebuilt if the data or metadata changed since the latest download in this format
+            version, data = self._dload_files.get(file_format, (None, None))
+            if version != self.dload_version:
+                data = write_table(self.data, self.get_metadata(), file_format)
+                self._dload_files[file_format] = (self.dload_version, data)
         st.download_button(
             label="Download",
-            data=self.dload_data,
-            file_name="boss_data.csv",
-            mime="text/csv",
+            data=data,
+            file_name=f"boss_data.{extension}",
+            mime=mime,
             key=widget_key,
         )
-
-
@@ -1,9 +1,7 @@
 import numpy as np
 import pandas as pd
 import streamlit as st
-import tomli
-from io import StringIO
-from pandas.errors import ParserError
+from core.data_io import UPLOAD_EXTENSIONS, read_data_file
 from streamlit.runtime.uploaded_file_manager import UploadedFile
 
 
@@ -91,8 +89,8 @@ class SetUp:
             The dataframe of data, without metadata.
         """
         self.file = st.file_uploader(
-            label="The CSV file must use colons or semicolons as separators",
-            type=["csv"],
+            label="Upload a CSV file with commas or semicolons as separators, or a Parquet or Arrow file",
+            type=UPLOAD_EXTENSIONS,
             help="Your file should contain data for input variables and target variable",
             key=f"uploader_{st.session_state.input_key}",
         )
@@ -101,18 +99,12 @@ class SetUp:
             pass
         else:
             try:
-                # convert to str to look for metadata
-                stringio = StringIO(self.file.getvalue().decode("utf-8"))
-                lines = stringio.read().split("\n")
-                # remove hash and empty last line if it exists
-                if lines[-1] == "":
-                    lines = lines[:-1]
-                metadata = [l[1:] for l in lines if l[0] == "#"]
-                self.metadata = tomli.loads("\n".join(metadata))
+                data, self.metadata = read_data_file(self.file, self.file.name)
                 if self.metadata:
                     self.has_metadata = True
-                return pd.read_csv(self.file, sep=";|,", comment="#")  # ignore comments for hyperparams and metadata
-            except ParserError as err:
+                return data
+            # ParserError, TOMLDecodeError and pyarrow's ArrowInvalid are all ValueErrors
+            except ValueError as err:
                 st.error(
                     "Error: "
                     + str(err)
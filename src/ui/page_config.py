@@ -98,3 +98,10 @@ class PageConfig:
         # For cur_iter, min value is 0, max value is number of iterations - 1.
         if "cur_iter" not in st.session_state:
             st.session_state.cur_iter = 0
+
+        # Running jobs that plot all iterations in tab post-processing, see PostprocessingTab.submit_missing,
+        # the number of iterations they plot, and the error of the latest failed job.
+        if "render_jobs" not in st.session_state:
+            st.session_state["render_jobs"] = {}
+            st.session_state["render_total"] = 0
+            st.session_state["render_error"] = None
@@ -0,0 +1,76 @@
+import os
+import streamlit as st
+from core.fit_cache import FitCache
+from core.jobs import JobQueue
+from core.scratch import ScratchSpace
+
+
+@st.cache_resource
+def get_fit_cache() -> FitCache:
+    """
+    Return the cache of fit results that is shared by all sessions of the server.
+    If the environment variable BOSS_WEB_CACHE_DIR is set, the cache is also kept on disk in that directory.
+
+    :return: FitCache
+    """
+    return FitCache(disk_dir=os.environ.get("BOSS_WEB_CACHE_DIR"))
+
+
+@st.cache_resource
+def get_plot_cache() -> FitCache:
+    """
+    Return the cache of rendered post-processing plots that is shared by all sessions of the server.
+    The environment variable BOSS_WEB_PLOT_CACHE_MB sets its size in megabytes (default 256).
+
+    :return: FitCache
+    """
+    return FitCache(max_bytes=int(float(os.environ.get("BOSS_WEB_PLOT_CACHE_MB", 256)) * 2**20))
+
+
+@st.cache_resource
+def get_job_queue() -> JobQueue:
+    """
+    Return the queue of background jobs, e.g. fits, that is shared by all sessions of the server.
+    The environment variable BOSS_WEB_MAX_WORKERS sets how many jobs can run at the same time (default 2).
+    The worker processes are started right away and import the BOSS stack, so the first fit of a new session
+    is as fast as later ones.
+
+    :return: JobQueue
+    """
+    return JobQueue(
+        max_workers=int(os.environ.get("BOSS_WEB_MAX_WORKERS", 2)),
+        initializer="core.boss_fit.warm_up",
+        prestart=True,
+    )
+
+
+@st.cache_resource
+def get_objective_queue() -> JobQueue:
+    """
+    Return the queue in which auto-runs evaluate their objectives, shared by all sessions of the server.
+    It is separate from the queue of fits and plots, so an auto-run never holds the workers that other sessions
+    need. The environment variable BOSS_WEB_OBJECTIVE_WORKERS sets how many evaluations can run at the same time
+    (default 2).
+
+    :return: JobQueue
+    """
+    return JobQueue(max_workers=int(os.environ.get("BOSS_WEB_OBJECTIVE_WORKERS", 2)))
+
+
+@st.cache_resource
+def get_scratch_space() -> ScratchSpace:
+    """
+    Return the scratch space in which each session gets its own directory for the output files of BOSS.
+    The environment variable BOSS_WEB_SCRATCH_DIR sets its location (default: boss-web in the temporary directory).
+    Directories unused for BOSS_WEB_SCRATCH_TTL seconds (default one day) are removed, as are the least recently
+    used ones if all together take more than BOSS_WEB_SCRATCH_MAX_MB megabytes (default 1024). The directories of
+    sessions that were used in the last BOSS_WEB_SCRATCH_LEASE seconds (default one hour) are never removed.
+
+    :return: ScratchSpace
+    """
+    return ScratchSpace(
+        root=os.environ.get("BOSS_WEB_SCRATCH_DIR"),
+        ttl=float(os.environ.get("BOSS_WEB_SCRATCH_TTL", 24 * 3600)),
+        max_bytes=int(float(os.environ.get("BOSS_WEB_SCRATCH_MAX_MB", 1024)) * 2**20),
+        lease=float(os.environ.get("BOSS_WEB_SCRATCH_LEASE", 3600)),
+    )
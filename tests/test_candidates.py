@@ -0,0 +1,67 @@
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+from core.boss_fit import fit_boss
+from core.candidates import CandidatePool
+from tabs.run_boss import RunBOSS
+
+
+class TestCandidatePool(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        cls.X = rng.uniform(0, 1, size=(8, 2))
+        cls.bo = fit_boss(
+            cls.X, np.sin(3 * cls.X).sum(axis=1, keepdims=True), np.array([[0.0, 1.0], [0.0, 1.0]]),
+            out_dir=cls.tmp_dir.name,
+        )
+        # the pool also contains the observed points, which must never be picked
+        cls.candidates = np.vstack((rng.uniform(0, 1, size=(500, 2)), cls.X))
+        cls.path = os.path.join(cls.tmp_dir.name, "pool.parquet")
+        pd.DataFrame(cls.candidates, columns=["x1", "x2"]).to_parquet(cls.path, index=False)
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_best_candidate(self):
+        pool = CandidatePool(self.path, ["x1", "x2"], chunk_size=64)
+        X_next = pool.acquire(self.bo.acq_manager)
+        acq = np.ravel(self.bo.acq_manager.acqfn.evaluate(self.candidates[:500]))
+        np.testing.assert_array_equal(X_next, self.candidates[[np.argmin(acq)]])
+
+    def test_batch(self):
+        pool = CandidatePool(self.path, ["x1", "x2"], chunk_size=64)
+        X_next = pool.acquire(self.bo.acq_manager, batch_size=3)
+        self.assertEqual(np.unique(X_next, axis=0).shape, (3, 2))
+        observed = {tuple(x) for x in self.X}
+        for x in X_next:
+            self.assertIn(x.tolist(), self.candidates.tolist())
+            self.assertNotIn(tuple(x), observed)
+
+    def test_pending_excluded(self):
+        pool = CandidatePool(self.path, ["x1", "x2"])
+        X_first = pool.acquire(self.bo.acq_manager)
+        X_next = pool.acquire(self.bo.acq_manager, X_pending=X_first)
+        self.assertFalse(np.array_equal(X_next, X_first))
+
+    def test_run_boss(self):
+        rng = np.random.default_rng(1)
+        X = rng.uniform(0, 1, size=(10, 2))
+        bo_run = RunBOSS(data=pd.DataFrame({"x1": X[:, 0], "x2": X[:, 1], "y": np.sin(3 * X).sum(axis=1)}))
+        bo_run.X_names = ["x1", "x2"]
+        bo_run.Y_names = ["y"]
+        bo_run.bounds = np.array([[0.0, 1.0], [0.0, 1.0]])
+        bo_run.dim = 2
+        bo_run.num_init = 10
+        bo_run.out_dir = self.tmp_dir.name
+        bo_run.candidate_pool = CandidatePool(self.path, ["x1", "x2"])
+        bo_run.run_boss()
+        self.assertIn(bo_run.results.select("X_next", -1).ravel().tolist(), self.candidates.tolist())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,93 @@
+import contextlib
+import io
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+from cli import main
+from core.data_io import read_csv_with_metadata, read_table, write_table
+
+METADATA = {"noise": 0.0, "min": True, "num-init": 5, "x1": [0.0, 1.0], "x2": [0.0, 1.0]}
+
+
+class TestCli(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 1, size=(6, 2))
+        self.data = pd.DataFrame(X, columns=["x1", "x2"])
+        self.data["y"] = np.sin(3 * X).sum(axis=1)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write_csv(self, name: str) -> str:
+        path = os.path.join(self.tmp_dir.name, name)
+        header = "\n".join(f"#{k} = {str(v).lower() if isinstance(v, bool) else v}" for k, v in METADATA.items())
+        with open(path, "w") as f:
+            f.write(header + "\n" + self.data.to_csv(index=False))
+        return path
+
+    def test_run_csv_in_place(self):
+        path = self.write_csv("data.csv")
+        self.assertEqual(main(["run", path, "--batch-size", "2"]), 0)
+        with open(path, "rb") as f:
+            data, metadata = read_csv_with_metadata(f)
+        self.assertEqual(data.shape[0], 8)
+        self.assertTrue(data["y"].iloc[-2:].isnull().all())
+        self.assertEqual(metadata["num-init"], 5)
+        self.assertEqual(list(metadata["x1"]), [0.0, 1.0])
+
+    def test_run_parquet_to_output_dir(self):
+        path = os.path.join(self.tmp_dir.name, "data.parquet")
+        with open(path, "wb") as f:
+            f.write(write_table(self.data, METADATA, "Parquet"))
+        out_dir = os.path.join(self.tmp_dir.name, "out")
+        self.assertEqual(main(["run", path, "--output-dir", out_dir]), 0)
+        with open(os.path.join(out_dir, "data.parquet"), "rb") as f:
+            data, metadata = read_table(f, "Parquet")
+        self.assertEqual(data.shape[0], 7)
+        self.assertEqual(metadata["x2"], [0.0, 1.0])
+        with open(path, "rb") as f:
+            self.assertEqual(read_table(f, "Parquet")[0].shape[0], 6)
+
+    def test_missing_metadata(self):
+        path = os.path.join(self.tmp_dir.name, "plain.csv")
+        self.data.to_csv(path, index=False)
+        self.assertEqual(main(["run", path]), 1)
+
+    def test_failing_file_does_not_stop_others(self):
+        self.data.loc[2, "y"] = np.nan
+        bad_path = self.write_csv("bad.csv")
+        self.data.loc[2, "y"] = 0.0
+        path = self.write_csv("data.csv")
+        stderr = io.StringIO()
+        with contextlib.redirect_stderr(stderr):
+            self.assertEqual(main(["run", bad_path, path]), 1)
+        self.assertIn("bad.csv has missing values", stderr.getvalue())
+        self.assertIn("--allow-pending", stderr.getvalue())
+        with open(path, "rb") as f:
+            self.assertEqual(read_csv_with_metadata(f)[0].shape[0], 7)
+
+    def test_objective(self):
+        path = self.write_csv("data.csv")
+        args = ["run", path, "--objective", "python:math.fsum", "--iterations", "3", "--concurrency", "2"]
+        self.assertEqual(main(args), 0)
+        with open(path, "rb") as f:
+            data = read_csv_with_metadata(f)[0]
+        self.assertEqual(data.shape[0], 9)
+        self.assertFalse(data["y"].isnull().any())
+        with self.assertRaises(SystemExit):
+            main(["run", path, "--objective", "python:math.fsum", "--workers", "2"])
+
+    def test_parallel_files(self):
+        paths = [self.write_csv("a.csv"), self.write_csv("b.csv")]
+        self.assertEqual(main(["run", *paths, "--workers", "2"]), 0)
+        for path in paths:
+            with open(path, "rb") as f:
+                self.assertEqual(read_csv_with_metadata(f)[0].shape[0], 7)
+
+
+if __name__ == "__main__":
+    unittest.main()
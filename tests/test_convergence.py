@@ -0,0 +1,42 @@
+import numpy as np
+import tempfile
+import unittest
+from core.boss_fit import fit_boss
+from core.convergence import convergence_table, hyperparameter_table
+
+
+class TestConvergenceTables(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        cls.X = rng.uniform(0, 1, size=(10, 2))
+        cls.Y = np.sin(3 * cls.X).sum(axis=1, keepdims=True)
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cls.bo = fit_boss(cls.X, cls.Y, np.array([[0.0, 1.0], [0.0, 1.0]]), out_dir=tmp_dir)
+        # treat the first 7 points as initial points, so there are 4 iterations
+        cls.bo.results.set_num_init_batches(7)
+
+    def test_convergence(self):
+        table = convergence_table(self.bo.results, ["x1", "x2"])
+        self.assertEqual(len(table), 4)
+        np.testing.assert_allclose(
+            table["observed optimum"], [np.minimum.accumulate(self.Y.ravel())[k] for k in range(6, 10)]
+        )
+        self.assertAlmostEqual(table["acquisition distance"].iloc[1], np.linalg.norm(self.X[7] - self.X[6]))
+        # a fit from scratch only records the global minimum of the latest iteration
+        self.assertTrue(table["predicted optimum"].iloc[:-1].isna().all())
+        self.assertAlmostEqual(table["predicted optimum"].iloc[-1], self.bo.results.select("mu_glmin", -1))
+        np.testing.assert_allclose(table[["x1", "x2"]].iloc[-1], self.bo.results.select("x_glmin", -1))
+
+    def test_maximization(self):
+        table = convergence_table(self.bo.results, ["x1", "x2"], minimize=False)
+        self.assertAlmostEqual(table["observed optimum"].iloc[-1], -self.Y.min())
+
+    def test_hyperparameters(self):
+        table = hyperparameter_table(self.bo.results, ["x1", "x2"])
+        self.assertEqual(list(table.columns), ["variance", "lengthscale x1", "lengthscale x2"])
+        np.testing.assert_allclose(table.iloc[-1], self.bo.results.select("model_params", -1))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,116 @@
+import io
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+from core.data_io import (
+    detect_delimiter,
+    iter_table_chunks,
+    read_csv_with_metadata,
+    read_data_file,
+    write_table,
+)
+from tabs.run_boss import RunBOSS
+
+
+class TestDetectDelimiter(unittest.TestCase):
+    def test_delimiters(self):
+        self.assertEqual(detect_delimiter("x1,x2,y"), ",")
+        self.assertEqual(detect_delimiter("x1;x2;y"), ";")
+        self.assertEqual(detect_delimiter("x1\tx2\ty"), "\t")
+        self.assertEqual(detect_delimiter("y"), ",")
+
+
+class TestReadCsvWithMetadata(unittest.TestCase):
+    def test_metadata_and_semicolons(self):
+        file = io.BytesIO(b"#noise = 0.1\n#x1 = [0.0, 1.0]\nx1;y\n0.5;1.0\n0.25;2.0\n")
+        data, metadata = read_csv_with_metadata(file)
+        self.assertEqual(metadata, {"noise": 0.1, "x1": [0.0, 1.0]})
+        self.assertEqual(list(data.columns), ["x1", "y"])
+        np.testing.assert_array_equal(data.to_numpy(), [[0.5, 1.0], [0.25, 2.0]])
+
+    def test_blank_lines_and_no_metadata(self):
+        file = io.BytesIO(b"\nx1,y\r\n0.5,1.0\r\n\r\n0.25,\n\n")
+        data, metadata = read_csv_with_metadata(file)
+        self.assertEqual(metadata, {})
+        self.assertEqual(data.shape, (2, 2))
+        self.assertTrue(np.isnan(data["y"].iloc[1]))
+
+    def test_downloaded_file_round_trip(self):
+        bo_run = RunBOSS(data=pd.DataFrame({"x1": [0.1, 0.2], "x2": [0.3, 0.4], "y": [1.0, np.nan]}))
+        bo_run.X_names = ["x1", "x2"]
+        bo_run.Y_names = ["y"]
+        bo_run.bounds = np.array([[0.0, 1.0], [-1.0, 1.0]])
+        bo_run.dim = 2
+        bo_run.num_init = 2
+        bo_run.add_metadata()
+        data, metadata = read_csv_with_metadata(io.BytesIO(bo_run.dload_data.encode("utf-8")))
+        pd.testing.assert_frame_equal(data, bo_run.data)
+        self.assertEqual(metadata["x2"], [-1.0, 1.0])
+        self.assertEqual(metadata["num-init"], 2)
+
+
+class TestTableFormats(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.data = pd.DataFrame({"x1": rng.uniform(size=5), "y": rng.normal(size=5)})
+        self.data.loc[4, "y"] = np.nan
+        self.metadata = {"noise": 0.0, "min": True, "num-init": np.int64(4), "x1": [0.0, 1.0]}
+
+    def test_round_trip(self):
+        for file_format, file_name in [("Parquet", "data.parquet"), ("Arrow", "data.arrow"), ("Arrow", "data.feather")]:
+            content = write_table(self.data, self.metadata, file_format)
+            data, metadata = read_data_file(io.BytesIO(content), file_name)
+            # binary formats keep the full precision
+            pd.testing.assert_frame_equal(data, self.data, check_exact=True)
+            self.assertEqual(metadata, {"noise": 0.0, "min": True, "num-init": 4, "x1": [0.0, 1.0]})
+
+    def test_file_without_metadata(self):
+        import pyarrow.parquet as pq
+
+        buf = io.BytesIO()
+        pq.write_table(pa_table(self.data), buf)
+        data, metadata = read_data_file(buf, "data.parquet")
+        self.assertEqual(metadata, {})
+        self.assertEqual(data.shape, (5, 2))
+
+
+class TestTableChunks(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.data = pd.DataFrame({"x1": np.arange(10.0), "x2": np.arange(10.0) ** 2, "y": np.ones(10)})
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def write(self, file_format: str) -> str:
+        path = os.path.join(self.tmp_dir.name, "pool." + {"CSV": "csv", "Parquet": "parquet", "Arrow": "arrow"}[file_format])
+        if file_format == "CSV":
+            with open(path, "w") as f:
+                f.write("# num-init = 1\n" + self.data.to_csv(sep=";", index=False))
+        else:
+            with open(path, "wb") as f:
+                f.write(write_table(self.data, {}, file_format))
+        return path
+
+    def test_chunks(self):
+        for file_format in ("CSV", "Parquet", "Arrow"):
+            chunks = list(iter_table_chunks(self.write(file_format), ["x2", "x1"], chunk_size=4))
+            self.assertEqual([c.shape for c in chunks], [(4, 2), (4, 2), (2, 2)], file_format)
+            np.testing.assert_array_equal(np.vstack(chunks), self.data[["x2", "x1"]].to_numpy())
+
+    def test_missing_column(self):
+        for file_format in ("CSV", "Parquet", "Arrow"):
+            with self.assertRaises(ValueError):
+                next(iter_table_chunks(self.write(file_format), ["x1", "x3"]))
+
+
+def pa_table(data: pd.DataFrame):
+    import pyarrow as pa
+
+    return pa.Table.from_pandas(data, preserve_index=False)
+
+
+if __name__ == '__main__':
+    unittest.main()
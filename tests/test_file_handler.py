@@ -1,6 +1,6 @@
 import pandas as pd
 import unittest
-from src.ui.file_handler import find_bounds
+from ui.file_handler import find_bounds
 
 
 class TestFindBounds(unittest.TestCase):
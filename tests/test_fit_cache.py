@@ -0,0 +1,58 @@
+import numpy as np
+import tempfile
+import unittest
+from core.fit_cache import FitCache, fit_key
+
+
+class TestFitKey(unittest.TestCase):
+    def setUp(self):
+        self.X = np.array([[0.1, 0.2], [0.3, 0.4]])
+        self.Y = np.array([[1.0], [2.0]])
+        self.bounds = np.array([[0.0, 1.0], [0.0, 1.0]])
+
+    def test_same_inputs(self):
+        key = fit_key(self.X, self.Y, self.bounds, kernel="rbf", noise=0.0)
+        self.assertEqual(key, fit_key(self.X.copy(), self.Y.copy(), self.bounds, noise=0.0, kernel="rbf"))
+
+    def test_different_data(self):
+        key = fit_key(self.X, self.Y, self.bounds, kernel="rbf")
+        self.assertNotEqual(key, fit_key(self.X, self.Y + 1, self.bounds, kernel="rbf"))
+        self.assertNotEqual(key, fit_key(self.X[:1], self.Y[:1], self.bounds, kernel="rbf"))
+
+    def test_different_settings(self):
+        key = fit_key(self.X, self.Y, self.bounds, kernel="rbf", min=True)
+        self.assertNotEqual(key, fit_key(self.X, self.Y, self.bounds, kernel="rbf", min=False))
+
+
+class TestFitCache(unittest.TestCase):
+    def test_get_returns_copy(self):
+        cache = FitCache()
+        cache.put("a", {"x": [1, 2]})
+        value = cache.get("a")
+        value["x"].append(3)
+        self.assertEqual(cache.get("a"), {"x": [1, 2]})
+        self.assertIsNone(cache.get("b"))
+
+    def test_lru_eviction(self):
+        value = np.zeros(100)
+        cache = FitCache(max_bytes=2500)
+        cache.put("a", value)
+        cache.put("b", value)
+        cache.get("a")
+        cache.put("c", value)
+        self.assertIn("a", cache)
+        self.assertNotIn("b", cache)
+        self.assertIn("c", cache)
+
+    def test_disk_tier(self):
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            FitCache(disk_dir=tmp_dir).put("a", {"x": 1})
+            # a new cache, e.g. after a server restart, finds the value on disk
+            cache = FitCache(disk_dir=tmp_dir)
+            self.assertEqual(len(cache), 0)
+            self.assertEqual(cache.get("a"), {"x": 1})
+            self.assertEqual(len(cache), 1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,53 @@
+import copy
+import numpy as np
+import os
+import tempfile
+import unittest
+from boss.bo.bo_main import BOMain
+from core.gp_update import append_observations, cholesky_append
+
+
+def dummy_func(_):
+    pass
+
+
+class TestCholeskyAppend(unittest.TestCase):
+    def test_matches_full_factorization(self):
+        rng = np.random.default_rng(0)
+        A = rng.normal(size=(6, 6))
+        A = A @ A.T + 6 * np.eye(6)
+        L = np.linalg.cholesky(A[:4, :4])
+        L_new = cholesky_append(L, A[:4, 4:], A[4:, 4:])
+        np.testing.assert_allclose(L_new, np.linalg.cholesky(A))
+
+
+class TestAppendObservations(unittest.TestCase):
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        rng = np.random.default_rng(0)
+        self.X = rng.uniform(0, 1, size=(25, 2))
+        self.Y = np.sin(3 * self.X).sum(axis=1, keepdims=True)
+        self.X_test = rng.uniform(0, 1, size=(5, 2))
+        bo = BOMain(f=dummy_func, bounds=np.array([[0.0, 1.0], [0.0, 1.0]]), kernel="rbf", iterpts=0)
+        bo.run(self.X[:20], self.Y[:20])
+        self.model = bo.model
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+    def test_matches_full_refit(self):
+        full = copy.deepcopy(self.model)
+        full.redefine_data(self.X, self.Y)
+        for i in range(20, 25):
+            append_observations(self.model, self.X[i: i + 1], self.Y[i: i + 1])
+        np.testing.assert_allclose(self.model.Y, self.Y)
+        for fast_pred, full_pred in zip(self.model.predict(self.X_test), full.predict(self.X_test)):
+            np.testing.assert_allclose(fast_pred, full_pred, rtol=1e-5, atol=1e-6)
+        np.testing.assert_allclose(self.model.get_unfixed_params(), full.get_unfixed_params())
+
+
+if __name__ == '__main__':
+    unittest.main()
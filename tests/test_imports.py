@@ -0,0 +1,64 @@
+import os
+import subprocess
+import sys
+import unittest
+
+SRC_DIR = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))), "src")
+# modules imported when the run page is opened
+PAGE_MODULES = [
+    "core.jobs",
+    "tabs.init_manager",
+    "tabs.postprocessing_tab",
+    "tabs.run_boss",
+    "tabs.setup",
+    "ui.page_config",
+    "ui.resources",
+]
+# modules that are only needed once a fit, post-processing or initial points are requested
+HEAVY_MODULES = ["boss.bo.bo_main", "boss.bo.initmanager", "boss.pp.pp_main", "GPy", "matplotlib", "PIL.Image", "scipy.stats"]
+# seconds to import the page modules in a cold process, on top of streamlit and pandas
+IMPORT_BUDGET = 1.0
+
+
+def import_cold(modules: list[str]) -> tuple[float, set[str]]:
+    """
+    Import modules in a new Python process that already has streamlit and pandas imported, like the server.
+    Return the time it took and the names of all modules loaded afterwards.
+    """
+    code = "\n".join([
+        "import sys, time",
+        "import pandas, streamlit",
+        "start = time.perf_counter()",
+        *[f"import {name}" for name in modules],
+        "print(time.perf_counter() - start)",
+        "print(' '.join(sys.modules))",
+    ])
+    out = subprocess.run(
+        [sys.executable, "-c", code], cwd=SRC_DIR, capture_output=True, text=True, check=True
+    ).stdout.splitlines()
+    return float(out[0]), set(out[1].split())
+
+
+class TestPageImports(unittest.TestCase):
+    def test_heavy_modules_are_deferred(self):
+        _, loaded = import_cold(PAGE_MODULES)
+        self.assertEqual(loaded.intersection(HEAVY_MODULES), set())
+
+    def test_import_budget(self):
+        elapsed, _ = import_cold(PAGE_MODULES)
+        self.assertLess(elapsed, IMPORT_BUDGET)
+
+
+class TestHeadlessImports(unittest.TestCase):
+    def test_no_streamlit(self):
+        # the command line and the HTTP server run without the web app
+        loaded = subprocess.run(
+            [sys.executable, "-c", "import sys, cli, server; print(' '.join(sys.modules))"],
+            cwd=SRC_DIR, capture_output=True, text=True, check=True,
+        ).stdout.split()
+        self.assertNotIn("streamlit", loaded)
+        self.assertEqual(set(loaded).intersection(HEAVY_MODULES), set())
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -4,7 +4,7 @@ import pytest
 import unittest
 import streamlit as st
 from unittest.mock import patch
-from src.tabs.init_manager_tab import InitManagerTab, set_names_bounds
+from tabs.init_manager_tab import InitManagerTab, set_names_bounds
 
 
 class TestAddVarNames(unittest.TestCase):
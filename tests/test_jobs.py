@@ -0,0 +1,100 @@
+import math
+import os
+import time
+import unittest
+from core.jobs import CANCELLED, DONE, FAILED, JobQueue, QUEUED, RUNNING
+
+
+def wait_for(queue: JobQueue, job_id: str, timeout: float = 30.0):
+    start = time.time()
+    job = queue.status(job_id)
+    while not job.is_finished and time.time() - start < timeout:
+        time.sleep(0.05)
+        job = queue.status(job_id)
+    return job
+
+
+def mark_warm() -> None:
+    os.environ["JOB_WORKER_WARM"] = "1"
+
+
+def is_warm() -> bool:
+    return os.environ.get("JOB_WORKER_WARM") == "1"
+
+
+def slow_init() -> None:
+    time.sleep(2)
+
+
+class TestJobQueue(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1)
+
+    def test_result(self):
+        job = wait_for(self.queue, self.queue.submit(math.sqrt, 16.0))
+        self.assertEqual(job.state, DONE)
+        self.assertEqual(job.result, 4.0)
+
+    def test_error(self):
+        job = wait_for(self.queue, self.queue.submit(math.sqrt, -1.0))
+        self.assertEqual(job.state, FAILED)
+        self.assertIn("ValueError", job.error)
+
+    def test_concurrency_limit_and_cancel(self):
+        first = self.queue.submit(time.sleep, 30)
+        second = self.queue.submit(time.sleep, 30)
+        time.sleep(0.2)
+        self.assertEqual(self.queue.status(first).state, RUNNING)
+        self.assertEqual(self.queue.status(second).state, QUEUED)
+        self.queue.cancel(second)
+        self.queue.cancel(first)
+        self.assertEqual(self.queue.status(first).state, CANCELLED)
+        self.assertEqual(self.queue.status(second).state, CANCELLED)
+        self.assertFalse(self.queue.status(first).process.is_alive())
+
+
+class TestWorkerPool(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1, initializer=f"{__name__}.mark_warm", prestart=True)
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_workers_are_reused_and_initialized(self):
+        first = wait_for(self.queue, self.queue.submit(os.getpid))
+        second = wait_for(self.queue, self.queue.submit(os.getpid))
+        self.assertEqual(first.result, second.result)
+        self.assertNotEqual(first.result, os.getpid())
+        self.assertTrue(wait_for(self.queue, self.queue.submit(is_warm)).result)
+
+    def test_cancel_replaces_worker(self):
+        pid = wait_for(self.queue, self.queue.submit(os.getpid)).result
+        sleeping = self.queue.submit(time.sleep, 30)
+        time.sleep(0.2)
+        self.assertEqual(self.queue.status(sleeping).state, RUNNING)
+        self.queue.cancel(sleeping)
+        job = wait_for(self.queue, self.queue.submit(os.getpid))
+        self.assertEqual(job.state, DONE)
+        self.assertNotEqual(job.result, pid)
+        self.assertTrue(wait_for(self.queue, self.queue.submit(is_warm)).result)
+
+
+class TestLocking(unittest.TestCase):
+    def setUp(self):
+        self.queue = JobQueue(max_workers=1, initializer=f"{__name__}.slow_init")
+
+    def tearDown(self):
+        self.queue.shutdown()
+
+    def test_large_task_does_not_block_status(self):
+        # the task does not fit into the pipe, and the worker only reads it after its initializer
+        job_id = self.queue.submit(len, b"x" * 2**24)
+        time.sleep(0.5)
+        start = time.time()
+        self.assertEqual(self.queue.status(job_id).state, RUNNING)
+        self.assertLess(time.time() - start, 0.5)
+        self.assertEqual(wait_for(self.queue, job_id).result, 2**24)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,40 @@
+import numpy as np
+import unittest
+from core.multi_output import pareto_mask, scalarize
+
+
+class TestScalarize(unittest.TestCase):
+    def setUp(self):
+        self.Y = np.array([[0.0, 10.0], [1.0, 0.0], [0.5, 5.0], [1.0, 10.0]])
+
+    def test_scaled_targets(self):
+        S = scalarize(self.Y, [True, True], [1.0, 1.0])
+        self.assertEqual(S.shape, (4, 1))
+        # both targets are scaled to [0, 1], so the two extreme rows are equally good
+        self.assertAlmostEqual(S[0, 0], S[1, 0])
+        self.assertEqual(np.argmax(S), 3)
+
+    def test_directions_and_weights(self):
+        S = scalarize(self.Y, [True, False], [1.0, 1.0])
+        self.assertEqual(np.argmin(S), 0)
+        S = scalarize(self.Y, [True, True], [0.0, 1.0])
+        self.assertEqual(np.argmin(S), 1)
+
+    def test_fixed_ranges(self):
+        ranges = np.array([[0.0, 1.0], [0.0, 10.0]])
+        S = scalarize(self.Y, [True, False], [1.0, 1.0], ranges)
+        np.testing.assert_allclose(S, scalarize(self.Y, [True, False], [1.0, 1.0]))
+        # a new extreme does not change the objective of the earlier rows
+        Y = np.vstack([self.Y, [5.0, -20.0]])
+        np.testing.assert_allclose(scalarize(Y, [True, False], [1.0, 1.0], ranges)[:4], S)
+
+
+class TestParetoMask(unittest.TestCase):
+    def test_front(self):
+        Y = np.array([[0.0, 10.0], [1.0, 0.0], [0.5, 5.0], [1.0, 10.0], [0.5, 6.0]])
+        np.testing.assert_array_equal(pareto_mask(Y, [True, True]), [True, True, True, False, False])
+        np.testing.assert_array_equal(pareto_mask(Y, [False, False]), [False, False, False, True, False])
+
+
+if __name__ == '__main__':
+    unittest.main()
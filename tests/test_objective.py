@@ -0,0 +1,58 @@
+import json
+import shlex
+import sys
+import threading
+import unittest
+from http.server import BaseHTTPRequestHandler, HTTPServer
+from core.objective import evaluate_objective, parse_objective
+
+
+class SumHandler(BaseHTTPRequestHandler):
+    def do_POST(self):
+        x = json.loads(self.rfile.read(int(self.headers["Content-Length"])))["x"]
+        body = json.dumps({"y": [sum(x), max(x)]}).encode()
+        self.send_response(200)
+        self.send_header("Content-Type", "application/json")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+class TestObjective(unittest.TestCase):
+    def test_parse(self):
+        self.assertEqual(parse_objective(" python:math.fsum"), ("python", "math.fsum"))
+        self.assertEqual(parse_objective("http://localhost:8000/f"), ("http", "http://localhost:8000/f"))
+        self.assertEqual(parse_objective("command:./simulate --fast"), ("command", "./simulate --fast"))
+        for spec in ("fsum", "python:fsum", "command:", "ftp://host/f"):
+            with self.assertRaises(ValueError):
+                parse_objective(spec)
+
+    def test_python(self):
+        self.assertEqual(evaluate_objective("python:math.fsum", [0.5, 0.25], ["a", "b"]), [0.75])
+        with self.assertRaises(ValueError):
+            evaluate_objective("python:math.fsum", [0.5, 0.25], ["a", "b"], num_outputs=2)
+
+    def test_command(self):
+        script = "import sys; x = [float(v) for v in sys.argv[1:]]; print(sum(x), min(x), sep=',')"
+        spec = f"command:{shlex.quote(sys.executable)} -c {shlex.quote(script)}"
+        self.assertEqual(evaluate_objective(spec, [1.0, 2.0], ["a", "b"], num_outputs=2), [3.0, 1.0])
+        with self.assertRaises(RuntimeError):
+            evaluate_objective(f"command:{shlex.quote(sys.executable)} -c 'raise SystemExit(3)'", [1.0], ["a"])
+
+    def test_http(self):
+        server = HTTPServer(("127.0.0.1", 0), SumHandler)
+        thread = threading.Thread(target=server.serve_forever, daemon=True)
+        thread.start()
+        try:
+            url = f"http://127.0.0.1:{server.server_port}/evaluate"
+            self.assertEqual(evaluate_objective(url, [1.0, 2.0], ["a", "b"], num_outputs=2, timeout=10), [3.0, 2.0])
+        finally:
+            server.shutdown()
+            server.server_close()
+
+
+if __name__ == "__main__":
+    unittest.main()
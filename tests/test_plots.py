@@ -0,0 +1,61 @@
+import numpy as np
+import tempfile
+import unittest
+from core.boss_fit import fit_boss
+from core.plots import predict_slice, render_job, render_model_plots, slice_axes, slice_points
+from core.results_io import snapshot_results
+
+
+class TestSlicePoints(unittest.TestCase):
+    def setUp(self):
+        self.bounds = np.array([[0.0, 1.0], [-1.0, 1.0], [2.0, 3.0]])
+        self.x_fixed = np.array([0.5, 0.0, 2.5])
+
+    def test_1d_slice(self):
+        X = slice_points(self.bounds, [2, 2, 5], self.x_fixed)
+        self.assertEqual(X.shape, (5, 3))
+        np.testing.assert_array_equal(X[:, 1], np.linspace(-1, 1, 5))
+        self.assertTrue((X[:, [0, 2]] == [0.5, 2.5]).all())
+
+    def test_2d_slice(self):
+        X = slice_points(self.bounds, [1, 3, 4], self.x_fixed)
+        self.assertEqual(X.shape, (16, 3))
+        np.testing.assert_array_equal(X[:4, 0], np.linspace(0, 1, 4))
+        self.assertTrue((X[:, 1] == 0.0).all())
+
+    def test_one_variable(self):
+        self.assertEqual(slice_axes([1, 2, 10], dim=1), (0, 0, 10))
+
+
+class TestModelSlices(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 1, size=(8, 2))
+        with tempfile.TemporaryDirectory() as tmp_dir:
+            cls.bo = fit_boss(
+                X, np.sin(3 * X).sum(axis=1, keepdims=True), np.array([[0.0, 1.0], [0.0, 1.0]]), out_dir=tmp_dir
+            )
+
+    def test_predict_slice(self):
+        model = self.bo.results.reconstruct_model(0)
+        X, mu, nu = predict_slice(model, np.array([[0.0, 1.0], [0.0, 1.0]]), [1, 2, 5], np.zeros(2))
+        self.assertEqual(X.shape, (25, 2))
+        mu_3, var_3 = model.predict(X[3:4])
+        self.assertAlmostEqual(mu[3], mu_3.item())
+        self.assertAlmostEqual(nu[3], np.sqrt(var_3.item()))
+
+    def test_png_output(self):
+        for pp_slice in ([1, 2, 10], [2, 2, 10]):
+            model_png, uncert_png = render_model_plots(self.bo.results, 0, pp_slice, ["x1", "x2"])
+            self.assertTrue(model_png.startswith(b"\x89PNG"))
+            self.assertTrue(uncert_png.startswith(b"\x89PNG"))
+
+    def test_render_job(self):
+        plots = render_job(snapshot_results(self.bo.results), [0], [1, 2, 10], ["x1", "x2"])
+        self.assertEqual(list(plots), [0])
+        self.assertEqual(plots[0], render_model_plots(self.bo.results, 0, [1, 2, 10], ["x1", "x2"]))
+
+
+if __name__ == '__main__':
+    unittest.main()
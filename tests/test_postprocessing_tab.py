@@ -0,0 +1,90 @@
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import time
+import unittest
+from core.fit_cache import FitCache
+from core.jobs import JobQueue
+from tabs.postprocessing_tab import PostprocessingTab
+from tabs.run_boss import RunBOSS
+
+
+class TestIncrementalPlots(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 1, size=(13, 2))
+        self.df = pd.DataFrame({"x1": X[:, 0], "x2": X[:, 1], "y": np.sin(3 * X).sum(axis=1)})
+        self.bo_run = RunBOSS(data=self.df.iloc[:12].copy())
+        self.bo_run.X_names = ["x1", "x2"]
+        self.bo_run.Y_names = ["y"]
+        self.bo_run.bounds = np.array([[0.0, 1.0], [0.0, 1.0]])
+        self.bo_run.dim = 2
+        self.bo_run.num_init = 10
+        self.bo_run.out_dir = self.tmp_dir.name
+        self.bo_run.run_boss()
+        self.cache = FitCache()
+        self.queue = JobQueue(max_workers=2)
+        self.pp_slice = [1, 2, 10]
+
+    def tearDown(self):
+        self.queue.shutdown()
+        self.tmp_dir.cleanup()
+
+    def new_tab(self, y_name: str = "y") -> PostprocessingTab:
+        bo_run = self.bo_run
+        return PostprocessingTab(
+            bo_run.results, bo_run.X_names, bo_run.results_id, bo_run.lineage_id, self.cache, y_name=y_name
+        )
+
+    def render_missing(self, pp: PostprocessingTab, pp_slice: list) -> None:
+        jobs = pp.submit_missing(pp_slice, self.queue)
+        while jobs:
+            time.sleep(self.queue.poll_interval)
+            self.assertIsNone(pp.collect_rendered(jobs, self.queue))
+
+    def test_render_missing(self):
+        pp = self.new_tab()
+        self.assertEqual(pp.missing_iters(self.pp_slice), [0, 1, 2])
+        pp.get_plots(0, self.pp_slice)
+        self.assertEqual(pp.missing_iters(self.pp_slice), [1, 2])
+        self.render_missing(pp, self.pp_slice)
+        self.assertEqual(pp.missing_iters(self.pp_slice), [])
+        self.assertEqual(self.queue.num_running, 0)
+
+    def test_results_replaced_while_rendering(self):
+        pp = self.new_tab()
+        jobs = pp.submit_missing(self.pp_slice, self.queue)
+        self.bo_run.data = self.df.iloc[:5].copy()
+        self.bo_run.run_boss()
+        while jobs:
+            time.sleep(self.queue.poll_interval)
+            pp.collect_rendered(jobs, self.queue)
+        # the plots are stored under the keys of the results they were rendered from
+        self.assertEqual(pp.missing_iters(self.pp_slice), [])
+        self.assertEqual(self.new_tab().missing_iters(self.pp_slice), [0])
+
+    def test_cancel_rendering(self):
+        pp = self.new_tab()
+        jobs = pp.submit_missing(self.pp_slice, self.queue)
+        pp.cancel_rendering(jobs, self.queue)
+        self.assertEqual(jobs, {})
+        self.assertEqual(self.queue.num_running, 0)
+
+    def test_appended_iterations(self):
+        self.render_missing(self.new_tab(), self.pp_slice)
+        self.bo_run.data = self.df.copy()
+        self.bo_run.run_boss()
+        # the earlier iterations are reused, the previous and the new latest iteration are plotted again
+        self.assertEqual(self.new_tab().missing_iters(self.pp_slice), [2, 3])
+        self.assertEqual(self.new_tab().missing_iters([2, 1, 10]), [0, 1, 2, 3])
+
+    def test_objective_name(self):
+        self.render_missing(self.new_tab(), self.pp_slice)
+        # plots labelled with another output name are not reused
+        self.assertEqual(self.new_tab("energy").missing_iters(self.pp_slice), [0, 1, 2])
+
+
+if __name__ == '__main__':
+    unittest.main()
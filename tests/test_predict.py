@@ -0,0 +1,45 @@
+import numpy as np
+import os
+import pandas as pd
+import tempfile
+import unittest
+from core.boss_fit import fit_boss
+from core.predict import predict_file
+
+
+class TestPredictFile(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.tmp_dir = tempfile.TemporaryDirectory()
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 1, size=(8, 2))
+        cls.bo = fit_boss(
+            X, np.sin(3 * X).sum(axis=1, keepdims=True), np.array([[0.0, 1.0], [0.0, 1.0]]), out_dir=cls.tmp_dir.name
+        )
+        cls.points = pd.DataFrame(rng.uniform(0, 1, size=(25, 2)), columns=["x1", "x2"])
+        cls.in_path = os.path.join(cls.tmp_dir.name, "points.parquet")
+        cls.points.to_parquet(cls.in_path, index=False)
+        cls.out_path = os.path.join(cls.tmp_dir.name, "predictions.csv")
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.tmp_dir.cleanup()
+
+    def test_chunked_predictions(self):
+        num_rows = predict_file(self.bo.model, self.in_path, ["x1", "x2"], self.out_path, chunk_size=10)
+        self.assertEqual(num_rows, 25)
+        predictions = pd.read_csv(self.out_path)
+        self.assertEqual(list(predictions.columns), ["x1", "x2", "y mean", "y variance"])
+        mu, var = self.bo.model.predict(self.points.to_numpy())
+        np.testing.assert_allclose(predictions["y mean"], mu.ravel())
+        np.testing.assert_allclose(predictions["y variance"], var.ravel(), atol=1e-12)
+
+    def test_maximization(self):
+        predict_file(self.bo.model, self.in_path, ["x1", "x2"], self.out_path, y_name="z", minimize=False)
+        predictions = pd.read_csv(self.out_path)
+        mu, _ = self.bo.model.predict(self.points.to_numpy())
+        np.testing.assert_allclose(predictions["z mean"], -mu.ravel())
+
+
+if __name__ == '__main__':
+    unittest.main()
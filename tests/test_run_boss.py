@@ -1,7 +1,16 @@
+import io
 import numpy as np
+import os
 import pandas as pd
+import shutil
+import tempfile
 import unittest
-from src.tabs.run_boss import RunBOSS
+import time
+from core.data_io import read_csv_with_metadata
+from core.fit_cache import FitCache
+from core.jobs import JobQueue
+from core.subset import select_subset
+from tabs.run_boss import KERNELS, RunBOSS
 
 
 class TestParams(unittest.TestCase):
@@ -66,6 +75,10 @@ class TestParams(unittest.TestCase):
         bounds = np.array([[1, 2], [3, 4]])
         self.assertTrue(self.obj.verify_bounds(bounds))
 
+    def test_bounds_error(self):
+        self.assertIsNone(RunBOSS.bounds_error(np.array([[1, 2], [3, 4]])))
+        self.assertIn("smaller", RunBOSS.bounds_error(np.array([[2, 1], [3, 4]])))
+
 
 class TestDataVerification(unittest.TestCase):
     def test_null_values(self):
@@ -79,5 +92,439 @@ class TestDataVerification(unittest.TestCase):
         self.assertTrue(obj.verify_data())
 
 
+class BossRunTestCase(unittest.TestCase):
+    """
+    Base class for tests that run BOSS on a small 2D data set.
+    """
+
+    def setUp(self):
+        # BOSS writes its output files to the working directory
+        self.cwd = os.getcwd()
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        os.chdir(self.tmp_dir.name)
+        rng = np.random.default_rng(0)
+        X = rng.uniform(0, 1, size=(12, 2))
+        self.df = pd.DataFrame({"x1": X[:, 0], "x2": X[:, 1], "y": np.sin(3 * X).sum(axis=1)})
+        self.obj = self.new_run(num_rows=10)
+
+    def new_run(self, num_rows: int) -> RunBOSS:
+        obj = RunBOSS(data=self.df.iloc[:num_rows].copy())
+        obj.X_names = ["x1", "x2"]
+        obj.Y_names = ["y"]
+        obj.bounds = np.array([[0.0, 1.0], [0.0, 1.0]])
+        obj.dim = 2
+        obj.num_init = num_rows
+        return obj
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp_dir.cleanup()
+
+
+class TestMetadata(BossRunTestCase):
+    def test_missing_num_init(self):
+        obj = RunBOSS(data=self.df.iloc[:10].copy())
+        obj.parse_params({"x1": [0.0, 1.0], "x2": [0.0, 1.0]})
+        self.assertEqual(obj.num_init, 10)
+        obj.run_boss()
+        self.assertEqual(obj.results.select("X").shape, (10, 2))
+
+    def test_target_settings(self):
+        self.obj.data["z"] = np.cos(3 * self.obj.data["x1"])
+        self.obj.Y_names = ["y", "z"]
+        self.obj.target_settings = {"z": (False, 2.0)}
+        self.obj.target_ranges = {"y": [-1.0, 3.0]}
+        self.obj.add_metadata()
+        data, metadata = read_csv_with_metadata(io.BytesIO(self.obj.dload_data.encode()))
+        obj = RunBOSS(data=data)
+        obj.parse_params(metadata)
+        self.assertEqual(obj.X_names, ["x1", "x2"])
+        self.assertEqual(obj.Y_names, ["y", "z"])
+        self.assertEqual(obj.target_settings, {"y": (True, 1.0), "z": (False, 2.0)})
+        self.assertEqual(obj.target_ranges, {"y": [-1.0, 3.0]})
+
+
+class TestWarmStart(BossRunTestCase):
+    def test_appended_rows_reuse_model(self):
+        self.obj.run_boss()
+        bo = self.obj._bo
+        self.obj.data = self.df.iloc[:12].copy()
+        self.obj.run_boss()
+        self.assertIs(self.obj._bo, bo)
+        self.assertEqual(self.obj.results.num_iters, 3)
+        self.assertEqual(self.obj.results.select("X").shape, (12, 2))
+
+    def test_appended_rows_recorded(self):
+        self.obj.run_boss()
+        restarts = self.obj._bo.settings["updaterestarts"]
+        self.obj.data = self.df.iloc[:12].copy()
+        self.obj.run_boss()
+        # the warm update does not change the settings of later refits
+        self.assertEqual(self.obj._bo.settings["updaterestarts"], restarts)
+        with open("boss.rst") as f:
+            rst = f.read()
+        for x1 in self.df["x1"].iloc[10:]:
+            self.assertIn(f"{x1:.15E}", rst)
+        with open("boss.out") as f:
+            self.assertIn("Total ensemble size: 12", f.read())
+
+    def test_edited_rows_refit(self):
+        self.obj.run_boss()
+        bo = self.obj._bo
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.data.iloc[0, 2] = 10.0
+        self.obj.run_boss()
+        self.assertIsNot(self.obj._bo, bo)
+        self.assertEqual(self.obj.results.num_iters, 2)
+
+    def test_warm_start_off(self):
+        self.obj.warm_start = False
+        self.obj.run_boss()
+        bo = self.obj._bo
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.run_boss()
+        self.assertIsNot(self.obj._bo, bo)
+
+    def test_fast_iterations(self):
+        self.obj.fast_iter = True
+        self.obj.refit_every = 2
+        self.obj.run_boss()
+        params = self.obj.results.select("model_params", -1)
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.run_boss()
+        np.testing.assert_array_equal(self.obj.results.select("model_params", -1), params)
+        self.assertEqual(self.obj._fast_iters, 1)
+        # the second iteration is due for a hyperparameter refit
+        self.obj.data = self.df.iloc[:12].copy()
+        self.obj.run_boss()
+        self.assertEqual(self.obj._fast_iters, 0)
+        self.assertEqual(self.obj.results.num_iters, 3)
+
+    def test_lineage(self):
+        self.obj.run_boss()
+        lineage_id, results_id = self.obj.lineage_id, self.obj.results_id
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.run_boss()
+        # appended rows only add iterations, so the earlier plots stay valid
+        self.assertEqual(self.obj.lineage_id, lineage_id)
+        self.assertNotEqual(self.obj.results_id, results_id)
+        self.obj.data.iloc[0, 2] = 10.0
+        self.obj.run_boss()
+        self.assertNotEqual(self.obj.lineage_id, lineage_id)
+
+    def test_output_dir(self):
+        self.obj.out_dir = os.path.join(self.tmp_dir.name, "session")
+        os.makedirs(self.obj.out_dir)
+        self.obj.run_boss()
+        self.assertTrue(os.path.isfile(os.path.join(self.obj.out_dir, "boss.out")))
+        self.assertFalse(os.path.exists("boss.out"))
+
+
+class TestLargeData(BossRunTestCase):
+    def test_subset_fit(self):
+        self.obj.max_rows = 8
+        self.obj.run_boss()
+        self.assertEqual(self.obj.results.select("X").shape, (8, 2))
+        self.assertIn("8 of 10 rows", self.obj.approximation)
+        self.assertIsNone(self.obj._bo)
+        X, Y, _ = self.obj._split_pending()
+        tr_bounds = select_subset(X, Y, self.obj.bounds, 8)[1]
+        X_next = self.obj.results.get_next_acq(-1)
+        self.assertTrue(np.all(tr_bounds[:, 0] <= X_next) and np.all(X_next <= tr_bounds[:, 1]))
+        # more rows are fitted from scratch on a new subset of the same size
+        self.obj.data = self.df.iloc[:12].copy()
+        self.obj.run_boss()
+        self.assertEqual(self.obj.results.select("X").shape, (8, 2))
+        self.assertIn("8 of 12 rows", self.obj.approximation)
+
+    def test_exact_fit_below_threshold(self):
+        self.obj.run_boss()
+        self.assertIsNone(self.obj.approximation)
+        self.assertEqual(self.obj.results.select("X").shape, (10, 2))
+
+
+class TestBatchAcquisition(BossRunTestCase):
+    def test_concat_batch(self):
+        self.obj.batch_size = 3
+        self.obj.run_boss()
+        self.obj.concat_next_acq()
+        self.assertEqual(self.obj.data.shape, (13, 3))
+        self.assertTrue(self.obj.data["y"].iloc[-3:].isnull().all())
+
+    def test_batch_size_change_with_warm_start(self):
+        self.obj.run_boss()
+        self.assertEqual(self.obj.results.get_next_acq(-1).shape, (1, 2))
+        self.obj.batch_size = 2
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.run_boss()
+        self.assertEqual(self.obj.results.get_next_acq(-1).shape, (2, 2))
+
+
+class TestFitCache(BossRunTestCase):
+    def test_identical_fit_is_cached(self):
+        cache = FitCache()
+        self.obj.fit_cache = cache
+        self.obj.run_boss()
+        self.assertEqual(len(cache), 1)
+
+        other = self.new_run(num_rows=10)
+        other.fit_cache = cache
+        other.run_boss()
+        self.assertIsNone(other._bo)
+        np.testing.assert_array_equal(other.results.get_next_acq(-1), self.obj.results.get_next_acq(-1))
+        np.testing.assert_array_equal(other.results.select("x_glmin", -1), self.obj.results.select("x_glmin", -1))
+
+        # a changed setting is a different problem
+        other.noise = 0.1
+        other.run_boss()
+        self.assertIsNotNone(other._bo)
+        self.assertEqual(len(cache), 2)
+
+
+class TestPendingExperiments(BossRunTestCase):
+    def setUp(self):
+        super().setUp()
+        self.obj.allow_pending = True
+        self.obj.data = self.df.copy()
+        self.obj.data.loc[10:, "y"] = np.nan
+
+    def test_verify_data(self):
+        self.assertTrue(self.obj.verify_data())
+        self.obj.data.loc[10, "x1"] = np.nan
+        self.assertFalse(self.obj.verify_data())
+
+    def test_pending_rows_not_fitted(self):
+        self.obj.run_boss()
+        self.assertEqual(self.obj.results.select("X").shape, (10, 2))
+        self.assertEqual(self.obj.results.get_next_acq(-1).shape, (1, 2))
+
+    def test_new_acquisition_without_new_observations(self):
+        self.obj.run_boss()
+        bo = self.obj._bo
+        self.obj.concat_next_acq()
+        self.obj.run_boss()
+        self.assertIs(self.obj._bo, bo)
+        self.assertEqual(self.obj.results.num_iters, 1)
+
+
+class TestDownloadPayload(BossRunTestCase):
+    def expected(self, obj: RunBOSS) -> str:
+        fresh = self.new_run(num_rows=obj.num_init)
+        fresh.data = obj.data.copy()
+        fresh.add_metadata()
+        return fresh.dload_data
+
+    def test_unchanged_data_is_not_rebuilt(self):
+        self.obj.add_metadata()
+        version = self.obj.dload_version
+        self.obj.data = self.obj.data.copy()
+        self.obj.add_metadata()
+        self.assertEqual(self.obj.dload_version, version)
+
+    def test_appended_and_edited_rows(self):
+        self.obj.add_metadata()
+        self.obj.data = self.df.iloc[:12].copy()
+        self.obj.add_metadata()
+        self.assertEqual(self.obj.dload_data, self.expected(self.obj))
+        self.obj.data.iloc[0, 0] = 0.5
+        self.obj.add_metadata()
+        self.assertEqual(self.obj.dload_data, self.expected(self.obj))
+
+    def test_metadata_change(self):
+        self.obj.add_metadata()
+        version = self.obj.dload_version
+        self.obj.noise = 0.1
+        self.obj.add_metadata()
+        self.assertGreater(self.obj.dload_version, version)
+        self.assertIn("#noise = 0.1", self.obj.dload_data)
+
+
+class TestBackgroundRun(BossRunTestCase):
+    def setUp(self):
+        super().setUp()
+        self.queue = JobQueue(max_workers=1)
+
+    def tearDown(self):
+        # stop the workers before their working directory is removed
+        self.queue.shutdown()
+        super().tearDown()
+
+    def wait(self, queue: JobQueue, obj: RunBOSS | None = None) -> str | None:
+        obj = obj or self.obj
+        while obj.poll_run(queue) is not None:
+            time.sleep(0.1)
+        return obj.run_error
+
+    def test_background_fit_matches_run_boss(self):
+        queue = self.queue
+        self.obj.submit_run(queue)
+        self.assertIsNotNone(self.obj.job_id)
+        self.assertIsNone(self.wait(queue))
+        self.assertIsNone(self.obj.job_id)
+        self.assertTrue(self.obj.has_run)
+
+        other = self.new_run(num_rows=10)
+        other.run_boss()
+        np.testing.assert_allclose(self.obj.results.get_next_acq(-1), other.results.get_next_acq(-1), atol=1e-3)
+
+        # appended rows are fitted in the background too, starting from the previous hyperparameters
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.submit_run(queue)
+        self.assertIsNone(self.wait(queue))
+        self.assertEqual(self.obj.results.select("X").shape, (11, 2))
+
+    def test_fast_iteration_after_background_fit(self):
+        self.obj.fast_iter = True
+        self.obj.submit_run(self.queue)
+        self.assertIsNone(self.wait(self.queue))
+        params = self.obj.results.select("model_params", -1)
+        # the model is rebuilt from the results of the job, so an appended row is added to it right away
+        self.obj.data = self.df.iloc[:11].copy()
+        self.obj.submit_run(self.queue)
+        self.assertIsNone(self.obj.job_id)
+        self.assertEqual(self.obj._fast_iters, 1)
+        self.assertEqual(self.obj.results.select("X").shape, (11, 2))
+        np.testing.assert_array_equal(self.obj.results.select("model_params", -1), params)
+
+        other = self.new_run(num_rows=10)
+        other.fast_iter = True
+        other.run_boss()
+        other.data = self.df.iloc[:11].copy()
+        other.run_boss()
+        np.testing.assert_allclose(self.obj.results.get_next_acq(-1), other.results.get_next_acq(-1), atol=1e-3)
+
+    def test_cancel(self):
+        queue = self.queue
+        self.obj.submit_run(queue)
+        self.obj.cancel_run(queue)
+        self.assertIsNone(self.obj.job_id)
+        self.assertFalse(self.obj.has_run)
+
+    def test_cancel_auto_kernel(self):
+        self.obj.submit_auto_kernel(self.queue)
+        self.obj.cancel_run(self.queue)
+        self.assertFalse(self.obj.is_running)
+        self.assertIsNone(self.obj.poll_run(self.queue))
+        self.assertFalse(self.obj.has_run)
+        self.assertEqual(self.queue.num_running, 0)
+
+    def test_multi_output(self):
+        self.obj.data["z"] = np.cos(3 * self.obj.data["x1"])
+        self.obj.Y_names = ["y", "z"]
+        self.obj.target_settings = {"z": (False, 2.0)}
+        self.obj.submit_target_fits(self.queue)
+        self.obj.run_boss()
+        # the fits of the single outputs run in the background
+        self.assertTrue(self.obj.is_running)
+        self.assertIsNone(self.wait(self.queue))
+        self.assertFalse(self.obj.is_running)
+        self.assertEqual(self.obj.results.select("Y").shape, (10, 1))
+        self.assertEqual(set(self.obj.target_results), {"y", "z"})
+        self.assertEqual(self.obj.target_results["z"].select("Y").shape, (10, 1))
+        # z is maximized, so its model is fitted to -z
+        self.assertAlmostEqual(self.obj.target_results["z"].select("Y").min(), -self.obj.data["z"].max())
+        self.obj.concat_next_acq()
+        self.assertTrue(self.obj.data[["y", "z"]].iloc[-1].isna().all())
+
+    def test_multi_output_new_extreme(self):
+        self.obj.data["z"] = np.cos(3 * self.obj.data["x1"])
+        self.obj.Y_names = ["y", "z"]
+        self.obj.run_boss()
+        bo = self.obj._bo
+        ranges = dict(self.obj.target_ranges)
+        # a row beyond the range of both outputs keeps the scaling, so the fit is extended
+        row = {"x1": 0.5, "x2": 0.5, "y": self.obj.data["y"].max() + 1.0, "z": self.obj.data["z"].min() - 1.0}
+        self.obj.data = pd.concat([self.obj.data, pd.DataFrame([row])], ignore_index=True)
+        self.obj.run_boss()
+        self.assertIs(self.obj._bo, bo)
+        self.assertEqual(self.obj.target_ranges, ranges)
+        self.assertEqual(self.obj.results.select("Y").shape, (11, 1))
+
+    def test_auto_kernel(self):
+        self.obj.fit_cache = FitCache()
+        self.obj.auto_kernel = True
+        self.obj.submit_auto_kernel(self.queue)
+        # the fits run in the background
+        self.assertTrue(self.obj.is_running)
+        self.assertFalse(self.obj.has_run)
+        self.assertIsNone(self.wait(self.queue))
+        self.assertTrue(self.obj.has_run)
+        comparison = self.obj.kernel_comparison
+        self.assertEqual(len(comparison), 4)
+        self.assertEqual(comparison["log marginal likelihood"].idxmax(), 0)
+        self.assertEqual(comparison["kernel"].iloc[0], KERNELS[self.obj.kernel])
+        # the losing fits are cached, so another kernel can be chosen without refitting
+        self.assertEqual(len(self.obj.fit_cache), 4)
+        self.obj.submit_auto_kernel(self.queue)
+        self.assertFalse(self.obj.is_running)
+        self.assertTrue(comparison.drop(columns="fit time (s)").equals(
+            self.obj.kernel_comparison.drop(columns="fit time (s)")
+        ))
+        self.assertTrue(self.obj.kernel_comparison["fit time (s)"].isna().all())
+
+    def test_auto_kernel_fits_of_another_session(self):
+        cache = FitCache()
+        other = self.new_run(num_rows=10)
+        other.fit_cache = cache
+        other.out_dir = os.path.join(self.tmp_dir.name, "other")
+        os.makedirs(other.out_dir)
+        other.auto_kernel = True
+        other.submit_auto_kernel(self.queue)
+        self.assertIsNone(self.wait(self.queue, other))
+        # the other session ends and its scratch directory is removed
+        shutil.rmtree(other.out_dir)
+        self.obj.fit_cache = cache
+        self.obj.out_dir = os.path.join(self.tmp_dir.name, "session")
+        os.makedirs(self.obj.out_dir)
+        self.obj.auto_kernel = True
+        self.obj.submit_auto_kernel(self.queue)
+        self.assertFalse(self.obj.is_running)
+        self.assertEqual(self.obj.kernel, other.kernel)
+        # appended rows are added to the model of the cached fit, in the output files of this session
+        self.obj.data = self.df.iloc[:12].copy()
+        self.obj.run_boss()
+        self.assertIsNotNone(self.obj._bo)
+        self.assertEqual(self.obj.results.select("X").shape, (12, 2))
+        self.assertTrue(os.path.isfile(os.path.join(self.obj.out_dir, "boss.rst")))
+        self.assertFalse(os.path.exists(other.out_dir))
+
+    def test_auto_run(self):
+        self.obj.objective = "python:math.fsum"
+        self.obj.auto_iters = 4
+        self.obj.auto_concurrency = 2
+        rows = []
+        self.assertEqual(self.obj.auto_run(self.queue, on_row=rows.append), 4)
+        self.assertIsNone(self.obj.auto_run_error)
+        self.assertEqual(rows, [1, 2, 3, 4])
+        self.assertEqual(len(self.obj.data), 14)
+        new = self.obj.data.iloc[10:]
+        np.testing.assert_allclose(new["y"], new["x1"] + new["x2"])
+        self.assertFalse(self.obj.allow_pending)
+        self.assertEqual(self.obj.results.select("X").shape, (14, 2))
+
+    def test_auto_run_failure(self):
+        # math.sqrt fails on the array of input values
+        self.obj.objective = "python:math.sqrt"
+        self.obj.auto_iters = 3
+        self.assertEqual(self.obj.auto_run(self.queue), 0)
+        self.assertIn("TypeError", self.obj.auto_run_error)
+        self.assertEqual(len(self.obj.data), 10)
+
+    def test_predictions(self):
+        self.obj.run_boss()
+        file = io.BytesIO(self.df[["x2", "x1"]].to_csv(index=False).encode())
+        file.name = "points.csv"
+        self.obj.submit_predictions(file, self.queue)
+        while not self.obj.poll_predictions(self.queue).is_finished:
+            time.sleep(0.1)
+        self.assertIsNone(self.obj.predict_error)
+        predictions = pd.read_csv(self.obj.predictions)
+        self.assertEqual(list(predictions.columns), ["x1", "x2", "y mean", "y variance"])
+        self.assertEqual(len(predictions), 12)
+        # new results make the predictions out of date
+        self.obj.run_boss()
+        self.assertIsNone(self.obj.predictions)
+
+
 if __name__ == '__main__':
     unittest.main()
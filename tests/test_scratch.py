@@ -0,0 +1,62 @@
+import os
+import tempfile
+import time
+import unittest
+from core.scratch import ScratchSpace
+
+
+class TestScratchSpace(unittest.TestCase):
+    def setUp(self):
+        self.tmp_dir = tempfile.TemporaryDirectory()
+        self.scratch = ScratchSpace(root=self.tmp_dir.name, ttl=3600, max_bytes=1000)
+
+    def tearDown(self):
+        self.tmp_dir.cleanup()
+
+    def make_dir(self, session_id: str, num_bytes: int, age: float) -> None:
+        # a directory left by an earlier session
+        path = os.path.join(self.tmp_dir.name, session_id)
+        os.makedirs(path)
+        with open(os.path.join(path, "boss.out"), "wb") as f:
+            f.write(b"x" * num_bytes)
+        mtime = time.time() - age
+        os.utime(path, (mtime, mtime))
+
+    def test_sessions_get_own_dirs(self):
+        a = self.scratch.session_dir("a")
+        b = self.scratch.session_dir("b")
+        self.assertNotEqual(a, b)
+        self.assertTrue(os.path.isdir(a) and os.path.isdir(b))
+
+    def test_expired_dirs_are_removed(self):
+        self.make_dir("old", 10, age=7200)
+        self.make_dir("new", 10, age=60)
+        self.assertEqual(self.scratch.collect_garbage(), ["old"])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["new"])
+
+    def test_quota(self):
+        self.make_dir("a", 400, age=300)
+        self.make_dir("b", 400, age=200)
+        self.make_dir("c", 400, age=100)
+        # the least recently used directory goes first, the requested one is kept
+        self.assertEqual(self.scratch.collect_garbage(keep="a"), ["b"])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["a", "c"])
+
+    def test_active_sessions_are_kept(self):
+        self.make_dir("a", 400, age=300)
+        self.make_dir("b", 400, age=200)
+        self.make_dir("c", 400, age=100)
+        # the least recently used directory belongs to a session that is still in use
+        self.scratch.renew("a")
+        self.assertEqual(self.scratch.collect_garbage(), ["b"])
+        self.scratch.session_dir("c")
+        self.assertEqual(self.scratch.collect_garbage(), [])
+        self.assertEqual(sorted(os.listdir(self.tmp_dir.name)), ["a", "c"])
+        # after the lease, the directory can expire
+        self.scratch.lease = -1
+        self.scratch.ttl = 250
+        self.assertEqual(self.scratch.collect_garbage(keep="c"), ["a"])
+
+
+if __name__ == '__main__':
+    unittest.main()
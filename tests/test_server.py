@@ -0,0 +1,103 @@
+import http.client
+import json
+import numpy as np
+import threading
+import unittest
+from server import ApiServer
+
+
+def objective(point: dict) -> float:
+    return float(np.sin(3 * point["x1"]) + np.cos(3 * point["x2"]))
+
+
+class TestServer(unittest.TestCase):
+    @classmethod
+    def setUpClass(cls):
+        cls.server = ApiServer(("127.0.0.1", 0))
+        cls.thread = threading.Thread(target=cls.server.serve_forever, daemon=True)
+        cls.thread.start()
+
+    @classmethod
+    def tearDownClass(cls):
+        cls.server.shutdown()
+        cls.server.server_close()
+
+    def setUp(self):
+        # one connection for all requests of a test, as a client with keep-alive would
+        self.conn = http.client.HTTPConnection("127.0.0.1", self.server.server_port, timeout=120)
+
+    def tearDown(self):
+        self.conn.close()
+
+    def request(self, method: str, path: str, body=None, content_type: str = "application/json"):
+        payload = body if isinstance(body, str) or body is None else json.dumps(body)
+        self.conn.request(method, path, payload, {"Content-Type": content_type})
+        response = self.conn.getresponse()
+        data = response.read().decode()
+        return response.status, json.loads(data) if response.getheader("Content-Type") == "application/json" else data
+
+    def test_suggest_observe_predict(self):
+        spec = {"inputs": {"x1": [0, 1], "x2": [0, 1]}, "outputs": ["y"], "batch_size": 2}
+        status, body = self.request("POST", "/campaigns", spec)
+        self.assertEqual(status, 201)
+        path = f"/campaigns/{body['id']}"
+
+        # initial points come from a Sobol sequence, and are pending until observed
+        _, body = self.request("POST", path + "/suggest", {"batch_size": 4})
+        self.assertEqual(len(body["points"]), 4)
+        _, body = self.request("POST", path + "/suggest")
+        self.assertEqual(len(body["points"]), 2)
+        _, state = self.request("GET", path)
+        self.assertEqual((state["observed"], len(state["pending"])), (0, 6))
+
+        observations = [{**p, "y": objective(p)} for p in state["pending"]]
+        _, body = self.request("POST", path + "/observe", {"points": observations})
+        self.assertEqual(body["observed"], 6)
+
+        _, body = self.request("POST", path + "/suggest", {"batch_size": 1})
+        point = body["points"][0]
+        self.assertTrue(0 <= point["x1"] <= 1 and 0 <= point["x2"] <= 1)
+        _, state = self.request("GET", path)
+        self.assertEqual(state["pending"], [point])
+        self.assertIn("y", state["predicted_optimum"])
+
+        _, body = self.request("POST", path + "/predict", {"points": observations[:2]})
+        for prediction, observation in zip(body["predictions"], observations):
+            self.assertAlmostEqual(prediction["mean"], observation["y"], places=2)
+            self.assertGreaterEqual(prediction["variance"], 0)
+
+        # observing an unsuggested point appends it
+        _, body = self.request("POST", path + "/observe", {"points": [{"x1": 0.3, "x2": 0.3, "y": 1.0}]})
+        self.assertEqual(body["observed"], 7)
+        status, csv = self.request("GET", path + "/data")
+        self.assertEqual(status, 200)
+        self.assertTrue(csv.startswith("#"))
+        # metadata of noise, min, num-init and the two inputs, the header and 8 rows
+        self.assertEqual(len(csv.strip().splitlines()), 5 + 1 + 8)
+
+    def test_csv_campaign(self):
+        csv = "#noise = 0.0\n#min = false\n#num-init = 3\n#x = [0.0, 1.0]\nx,y\n0.1,1.0\n0.5,2.0\n0.9,1.5\n"
+        status, body = self.request("POST", "/campaigns", csv, "text/csv")
+        self.assertEqual(status, 201)
+        _, body = self.request("POST", f"/campaigns/{body['id']}/suggest")
+        self.assertEqual(len(body["points"]), 1)
+
+    def test_errors(self):
+        status, body = self.request("POST", "/campaigns/unknown/suggest", {"batch_size": 1})
+        self.assertEqual(status, 404)
+        status, body = self.request("POST", "/campaigns", {"inputs": {"x": [1, 0]}})
+        self.assertEqual(status, 400)
+        status, body = self.request("POST", "/campaigns", {"outputs": ["y"]})
+        self.assertEqual((status, body["error"]), (400, "Missing key 'inputs'."))
+        _, body = self.request("POST", "/campaigns", {"inputs": {"x": [0, 1]}})
+        path = f"/campaigns/{body['id']}"
+        status, body = self.request("POST", path + "/predict", {"points": [{"x": 0.5}]})
+        self.assertEqual(status, 400)
+        status, body = self.request("POST", path + "/observe", {"points": [{"x": 0.5}]})
+        self.assertEqual(status, 400)
+        self.assertEqual(self.request("DELETE", path)[0], 200)
+        self.assertEqual(self.request("GET", path)[0], 404)
+
+
+if __name__ == "__main__":
+    unittest.main()
@@ -0,0 +1,34 @@
+import numpy as np
+import unittest
+from core.subset import select_subset
+
+
+class TestSelectSubset(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(0)
+        self.bounds = np.array([[0.0, 1.0], [0.0, 10.0]])
+        self.X = rng.uniform(0, 1, size=(400, 2)) * [1.0, 10.0]
+        self.Y = ((self.X - [0.3, 7.0]) ** 2 / [1.0, 100.0]).sum(axis=1, keepdims=True)
+
+    def test_small_data_is_kept(self):
+        idx, tr_bounds, num_local = select_subset(self.X[:50], self.Y[:50], self.bounds, max_rows=100)
+        np.testing.assert_array_equal(idx, np.arange(50))
+        np.testing.assert_array_equal(tr_bounds, self.bounds)
+        self.assertEqual(num_local, 50)
+
+    def test_subset(self):
+        idx, tr_bounds, num_local = select_subset(self.X, self.Y, self.bounds, max_rows=100)
+        self.assertEqual(len(np.unique(idx)), 100)
+        self.assertEqual(num_local, 50)
+        best = self.X[np.argmin(self.Y)]
+        self.assertIn(np.argmin(self.Y), idx)
+        # the trust region surrounds the best observation and lies within the bounds
+        self.assertTrue(np.all(tr_bounds[:, 0] <= best) and np.all(best <= tr_bounds[:, 1]))
+        self.assertTrue(np.all(tr_bounds[:, 0] >= self.bounds[:, 0]) and np.all(tr_bounds[:, 1] <= self.bounds[:, 1]))
+        self.assertTrue(np.all(tr_bounds[:, 1] - tr_bounds[:, 0] < self.bounds[:, 1] - self.bounds[:, 0]))
+        # the same data gives the same subset
+        np.testing.assert_array_equal(select_subset(self.X, self.Y, self.bounds, max_rows=100)[0], idx)
+
+
+if __name__ == '__main__':
+    unittest.main()